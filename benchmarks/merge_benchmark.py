@@ -0,0 +1,217 @@
+"""
+Merge benchmark over synthetic corpora.
+
+Run from the repository root:
+
+    python -m benchmarks.merge_benchmark --scale 1 --output results.jsonl
+
+Every case (corpus x backend) runs in a fresh process, so peak RSS belongs to that case only. Results are printed
+as JSON lines.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional, Callable
+
+import fitz
+
+from managers.document_pool_manager import DocumentPoolManager
+from models.merge_backends.merge_backend_selector import MergeBackendSelector
+from models.merge_engine import MergeEngine
+from models.merge_job import MergeJob, MergeSource
+
+try:
+    import resource
+except ImportError:     # Windows
+    resource = None
+
+
+FONT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                         "assets", "fonts", "roboto", "Roboto-Medium.ttf")
+
+
+# <editor-fold desc="[+] Corpora">
+
+def write_text_document(document_path: str, number_of_pages: int, title: str, lines_per_page: int = 40):
+    with fitz.open() as pdf_document:
+        for page_index in range(number_of_pages):
+            page = pdf_document.new_page()
+            text = "\n".join(f"{title}, page {page_index + 1}, line {line}: lorem ipsum dolor sit amet"
+                             for line in range(lines_per_page))
+            page.insert_text((36, 36), text, fontsize=9)
+
+        pdf_document.save(document_path, deflate=True)
+
+
+def generate_many_small(corpus_directory: str, scale: float, random_generator: random.Random):
+    for document_index in range(int(500 * scale)):
+        write_text_document(os.path.join(corpus_directory, f"small_{document_index:05d}.pdf"),
+                            random_generator.randint(1, 2), f"Small {document_index}", lines_per_page=10)
+
+
+def generate_few_huge(corpus_directory: str, scale: float, random_generator: random.Random):
+    for document_index in range(3):
+        write_text_document(os.path.join(corpus_directory, f"huge_{document_index:02d}.pdf"),
+                            max(1, int(400 * scale)), f"Huge {document_index}")
+
+
+def generate_image_heavy(corpus_directory: str, scale: float, random_generator: random.Random):
+    # Noise does not compress, like real scans
+    noise = bytes(random_generator.getrandbits(8) for _ in range(850 * 1100))
+    pixmap = fitz.Pixmap(fitz.csGRAY, 850, 1100, noise, False)
+    scan = pixmap.tobytes("png")
+
+    for document_index in range(max(1, int(20 * scale))):
+        with fitz.open() as pdf_document:
+            for page_index in range(5):
+                page = pdf_document.new_page()
+                page.insert_image(page.rect, stream=scan)
+
+            pdf_document.save(os.path.join(corpus_directory, f"scan_{document_index:03d}.pdf"))
+
+
+def generate_shared_font(corpus_directory: str, scale: float, random_generator: random.Random):
+    logo = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 256, 256), False)
+    logo.set_rect(logo.irect, (178, 34, 34))
+    logo_bytes = logo.tobytes("png")
+
+    for document_index in range(int(100 * scale)):
+        with fitz.open() as pdf_document:
+            page = pdf_document.new_page()
+            page.insert_font(fontname="F0", fontfile=FONT_PATH)
+            page.insert_text((72, 72), f"Invoice {document_index}", fontname="F0", fontsize=24)
+            page.insert_text((72, 120), f"Total: {random_generator.randint(1, 10000)}.00", fontname="F0")
+            page.insert_image(fitz.Rect(400, 40, 520, 160), stream=logo_bytes)
+
+            pdf_document.save(os.path.join(corpus_directory, f"invoice_{document_index:04d}.pdf"))
+
+
+CORPORA: Dict[str, Callable[[str, float, random.Random], None]] = {
+    "many_small": generate_many_small,
+    "few_huge": generate_few_huge,
+    "image_heavy": generate_image_heavy,
+    "shared_font": generate_shared_font,
+}
+
+
+def prepare_corpus(corpus_name: str, corpora_directory: str, scale: float) -> List[str]:
+    """
+    Generate a corpus once, later runs with the same scale reuse it.
+    """
+
+    corpus_directory = os.path.join(corpora_directory, f"{corpus_name}_x{scale:g}")
+    marker_path = os.path.join(corpus_directory, ".complete")
+
+    if not os.path.isfile(marker_path):
+        os.makedirs(corpus_directory, exist_ok=True)
+        CORPORA[corpus_name](corpus_directory, scale, random.Random(corpus_name))
+        open(marker_path, "w").close()
+
+    return sorted(os.path.join(corpus_directory, file_name)
+                  for file_name in os.listdir(corpus_directory) if file_name.endswith(".pdf"))
+
+# </editor-fold>
+
+
+# <editor-fold desc="[+] Measurement">
+
+def peak_rss_bytes() -> Optional[int]:
+    if resource is None:
+        return None
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Kilobytes on Linux, bytes on macOS
+    return peak_rss if sys.platform == "darwin" else peak_rss * 1024
+
+
+def run_case(corpus_name: str, document_paths: List[str], backend_name: str, is_compacted: bool,
+             output_directory: str) -> Dict:
+    """
+    Merge one corpus the way `MergeViewModel.merge_documents` does, in the calling process.
+    """
+
+    output_path = os.path.join(output_directory, f"{corpus_name}_{backend_name}.pdf")
+    merge_job = MergeJob([MergeSource(document_path) for document_path in document_paths], output_path,
+                         is_streaming=MergeBackendSelector.is_streaming_supported(backend_name),
+                         is_compacted=is_compacted, backend_name=backend_name)
+
+    copied_pages = [0]
+
+    def on_progress(merge_progress):
+        copied_pages[0] += 1
+
+    input_bytes = sum(os.path.getsize(document_path) for document_path in document_paths)
+
+    start_time = time.perf_counter()
+    MergeEngine(on_progress, document_pool=DocumentPoolManager).run(merge_job)
+    wall_seconds = time.perf_counter() - start_time
+
+    output_bytes = os.path.getsize(output_path)
+    os.remove(output_path)
+
+    return {
+        "corpus": corpus_name,
+        "backend": backend_name,
+        "compacted": is_compacted,
+        "documents": len(document_paths),
+        "pages": copied_pages[0],
+        "input_bytes": input_bytes,
+        "output_bytes": output_bytes,
+        "wall_seconds": round(wall_seconds, 4),
+        "pages_per_second": round(copied_pages[0] / wall_seconds, 2) if wall_seconds > 0 else None,
+        "bytes_per_second": round(input_bytes / wall_seconds, 2) if wall_seconds > 0 else None,
+        "peak_rss_bytes": peak_rss_bytes(),
+    }
+
+
+def run_case_in_process(arguments) -> Dict:
+    # Calibration is not part of the measurement, nor is it kept
+    MergeBackendSelector.set_calibration_path(None)
+
+    return run_case(*arguments)
+
+# </editor-fold>
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark merging of synthetic PDF corpora.")
+    parser.add_argument("--corpora", nargs="+", choices=list(CORPORA.keys()), default=list(CORPORA.keys()))
+    parser.add_argument("--backends", nargs="+", default=["fitz", "pypdf2"],
+                        choices=MergeBackendSelector.backend_names())
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplier of corpus sizes")
+    parser.add_argument("--compact", action="store_true", help="merge in compact mode")
+    parser.add_argument("--corpora-directory", default=os.path.join(tempfile.gettempdir(), "pdf_merger_benchmark"),
+                        help="where generated corpora are kept between runs")
+    parser.add_argument("--output", default=None, help="append JSON lines to this file as well")
+    arguments = parser.parse_args()
+
+    # Fresh interpreter per case, forked children would inherit the parent's peak RSS
+    context = multiprocessing.get_context("spawn")
+
+    with tempfile.TemporaryDirectory() as output_directory:
+        for corpus_name in arguments.corpora:
+            document_paths = prepare_corpus(corpus_name, arguments.corpora_directory, arguments.scale)
+
+            for backend_name in arguments.backends:
+                with context.Pool(1, maxtasksperchild=1) as pool:
+                    result = pool.apply(run_case_in_process, ((corpus_name, document_paths, backend_name,
+                                                               arguments.compact, output_directory),))
+
+                result["scale"] = arguments.scale
+                line = json.dumps(result)
+                print(line, flush=True)
+
+                if arguments.output is not None:
+                    with open(arguments.output, "a") as f:
+                        f.write(line + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import argparse
+import multiprocessing
+import sys
+
+from models.batch_merge_runner import BatchMergeRunner, BatchMergeResult
+from models.merge_backends.merge_backend_selector import MergeBackendSelector
+
+
+def print_result(result: BatchMergeResult):
+    if result.is_successful:
+        print(f"[+] Job {result.job_index}: {result.output_path} ({result.elapsed_seconds:.2f} s)")
+    else:
+        print(f"[!] Job {result.job_index}: {result.output_path}: {result.error_message}")
+
+
+def main():
+    # Parallel merges spawn worker processes, required for frozen executables
+    multiprocessing.freeze_support()
+
+    parser = argparse.ArgumentParser(description="Merge PDF documents without the GUI.")
+    parser.add_argument("manifest", help="JSON manifest with merge jobs")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="number of worker processes (default: number of cores)")
+    parser.add_argument("--overwrite", action="store_true", help="replace existing output files")
+    parser.add_argument("--compact", action="store_true",
+                        help="write shared fonts, images and other resources once and compress the output")
+    parser.add_argument("--backend", choices=MergeBackendSelector.backend_names(), default="auto",
+                        help="merge backend for jobs that do not name one (default: calibrated per input profile), "
+                             "pypdf2 merges in memory")
+    parser.add_argument("--calibration", default=None, metavar="PATH",
+                        help="file that keeps calibration results of the auto backend, an empty value keeps them "
+                             "in memory only (default: in the user cache directory)")
+    arguments = parser.parse_args()
+
+    if arguments.calibration is not None:
+        MergeBackendSelector.set_calibration_path(arguments.calibration)
+
+    merge_jobs = BatchMergeRunner.load_manifest(arguments.manifest, arguments.compact, arguments.backend)
+    runner = BatchMergeRunner(arguments.workers, arguments.overwrite)
+    results = runner.run(merge_jobs, print_result)
+
+    number_of_failed = sum(1 for result in results if not result.is_successful)
+    print(f"Jobs: {len(results)}, failed: {number_of_failed}")
+
+    sys.exit(1 if number_of_failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
-from typing import List
+from typing import Dict, List, Optional, Tuple
 
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QDragEnterEvent, QDropEvent, \
     QDragMoveEvent, QDragLeaveEvent
 from PyQt5.QtWidgets import QSizePolicy, QFrame, QVBoxLayout, QGridLayout, QScrollArea, QWidget
@@ -42,6 +42,8 @@ class AdaptivePanelComponent(QFrame, IAdaptiveComponent, metaclass=IAdaptiveComp
 
         # References to inner components
         self.inner_components: List[inner_component_type] = list()
+        # Cells of attached inner components, QGridLayout can only look them up by a linear search
+        self.inner_component_cells: Dict[inner_component_type, Tuple[int, int]] = dict()
 
         # Scroll area
         self.scroll_area = QScrollArea()
@@ -63,6 +65,12 @@ class AdaptivePanelComponent(QFrame, IAdaptiveComponent, metaclass=IAdaptiveComp
         self.grid_preferred_column_width = 168
         self.setAcceptDrops(True)
         self.last_reached_inner_component: inner_component_type = None
+
+        # Resizes are coalesced into one reflow once the size settles, the old arrangement is shown until then
+        self.reflow_delay = 100
+        self.reflow_timer = QTimer(self)
+        self.reflow_timer.setSingleShot(True)
+        self.reflow_timer.timeout.connect(self.reflow)
         self.inner_component_type = inner_component_type
 
     # <editor-fold desc="[+] Properties">
@@ -87,29 +95,55 @@ class AdaptivePanelComponent(QFrame, IAdaptiveComponent, metaclass=IAdaptiveComp
     # <editor-fold desc="[+] Layout manipulation">
 
     def rearrange_content(self, should_rearrange_inner_components: bool = True):
-        #
-        self.detach_all_inner_components()
         #
         if should_rearrange_inner_components:
             for component in self.inner_components:
                 if isinstance(component, IAdaptiveComponent):
                     component.display_mode = self.display_mode
         #
-        self.attach_all_inner_components()
+        self.relayout_inner_components()
+
+    def relayout_inner_components(self, starting_index: int = 0, ending_index: Optional[int] = None) -> None:
+        """
+        Move inner components of the given range whose cell changed, the others are not touched.
+        """
+
+        if ending_index is None:
+            ending_index = self.number_of_inner_components
+
+        for index, inner_component in enumerate(self.inner_components[starting_index:ending_index], starting_index):
+            self.move_inner_component(inner_component, index)
+
+    def inner_component_cell(self, index: int) -> Tuple[int, int]:
+        column_count = self.grid_column_count if self.display_mode == DisplayMode.GRID else self.list_column_count
+
+        return divmod(index, max(1, column_count))
 
     def attach_inner_component(self, inner_component: QWidget, index: int = None) -> None:
         if index is None:
             index = self.number_of_inner_components - 1
 
-        row = index // (self.grid_column_count if self.display_mode == DisplayMode.GRID else self.list_column_count)
-        column = index % (self.grid_column_count if self.display_mode == DisplayMode.GRID else self.list_column_count)
+        row, column = self.inner_component_cell(index)
 
         self.container_layout.addWidget(inner_component, row, column, 1, 1)
+        self.inner_component_cells[inner_component] = (row, column)
         inner_component.setParent(self.component_container)
         inner_component.setVisible(True)
 
+    def move_inner_component(self, inner_component: QWidget, index: int) -> None:
+        cell = self.inner_component_cell(index)
+
+        if self.inner_component_cells.get(inner_component, None) == cell:
+            return
+
+        # Stays parented and visible, only its cell changes
+        self.container_layout.removeWidget(inner_component)
+        self.container_layout.addWidget(inner_component, cell[0], cell[1], 1, 1)
+        self.inner_component_cells[inner_component] = cell
+
     def detach_inner_component(self, inner_component: QWidget) -> None:
         self.container_layout.removeWidget(inner_component)
+        self.inner_component_cells.pop(inner_component, None)
         inner_component.setParent(None)
         inner_component.setVisible(False)
 
@@ -142,6 +176,9 @@ class AdaptivePanelComponent(QFrame, IAdaptiveComponent, metaclass=IAdaptiveComp
     def resizeEvent(self, event):
         super().resizeEvent(event)
 
+        self.reflow_timer.start(self.reflow_delay)
+
+    def reflow(self):
         work_width = self.width()
         possible_grid_column_count = work_width // (self.grid_preferred_column_width + 8)
 
@@ -208,27 +245,56 @@ class AdaptivePanelComponent(QFrame, IAdaptiveComponent, metaclass=IAdaptiveComp
 
     def dropEvent(self, event: QDropEvent) -> None:
         # Assign indexes
-        source_component = event.source()
-        destination_component = self.last_reached_inner_component
+        source_indexes = self.dragged_inner_component_indexes(event.source())
+        reached_index = self.inner_components.index(self.last_reached_inner_component)
 
-        if source_component == destination_component:
-            self.on_drop_event_competed(-1, -1)
+        if reached_index in source_indexes:
+            self.on_drop_event_competed([], -1)
             return
 
-        # Swap
-        destination_index = self.inner_components.index(destination_component)
-        source_index = self.inner_components.index(source_component)
+        # Dropped before the reached component when moved up, after it when moved down
+        destination_index = reached_index - sum(1 for source_index in source_indexes if source_index < reached_index)
 
-        self.inner_components.remove(source_component)
-        self.inner_components.insert(destination_index, source_component)
+        if reached_index > source_indexes[0]:
+            destination_index += 1
 
-        # Swap
-        self.detach_all_inner_components()
-        self.attach_all_inner_components()
+        self.move_inner_components(source_indexes, destination_index)
 
         event.accept()
 
-        self.on_drop_event_competed(source_index, destination_index)
+        self.on_drop_event_competed(source_indexes, destination_index)
+
+    def dragged_inner_component_indexes(self, source_component: QWidget) -> List[int]:
+        """
+        Sorted indexes of the inner components moved by a drag of `source_component`.
+        """
+
+        return [self.inner_components.index(source_component)]
+
+    def move_inner_components(self, source_indexes: List[int], destination_index: int) -> None:
+        """
+        Move inner components together, in their order, so the first ends up at `destination_index`.
+        """
+
+        moved_components = [self.inner_components[index] for index in source_indexes]
+        moved_indexes = set(source_indexes)
+
+        remaining_components = [component for index, component in enumerate(self.inner_components)
+                                if index not in moved_indexes]
+        remaining_components[destination_index:destination_index] = moved_components
+        self.inner_components[:] = remaining_components
+
+        # Only components between the first and the last changed index change their cells
+        self.relayout_inner_components(*self.moved_index_range(source_indexes, destination_index))
+
+    @staticmethod
+    def moved_index_range(source_indexes: List[int], destination_index: int) -> Tuple[int, int]:
+        """
+        Indexes (end excluded) whose inner components changed by a move.
+        """
+
+        return (min(source_indexes[0], destination_index),
+                max(source_indexes[-1] + 1, destination_index + len(source_indexes)))
 
     def on_drag_enter_event_competed(self):
         pass
@@ -239,7 +305,7 @@ class AdaptivePanelComponent(QFrame, IAdaptiveComponent, metaclass=IAdaptiveComp
     def on_drag_move_event_competed(self, previous_component):
         pass
 
-    def on_drop_event_competed(self, source_index: int, destination_index: int):
+    def on_drop_event_competed(self, source_indexes: List[int], destination_index: int):
         pass
 
     # </editor-fold>
@@ -0,0 +1,352 @@
+from typing import Dict, List, Sequence, Tuple, Type
+
+from PyQt5.QtCore import Qt, QEvent, QPoint, QTimer
+from PyQt5.QtGui import QDragEnterEvent, QDropEvent, QDragMoveEvent, QDragLeaveEvent
+from PyQt5.QtWidgets import QSizePolicy, QFrame, QVBoxLayout, QScrollArea, QWidget
+
+from enums.display_mode import DisplayMode
+from interfaces.i_adaptive_component import IAdaptiveComponent, IAdaptiveComponentMeta
+
+
+class VirtualPanelComponent(QFrame, IAdaptiveComponent, metaclass=IAdaptiveComponentMeta):
+    """
+    Panel of items laid out as a list or a grid, like `AdaptivePanelComponent`, that only has components for the
+    rows around the viewport.
+
+    Rows have a fixed height per display mode, so the geometry of every item is computed instead of laid out.
+    Components that scroll out of view are bound to the items that scroll in (see `bind_inner_component`), so the
+    number of widgets and the cost of scrolling do not depend on the number of items. Items are owned by the caller,
+    who calls `refresh_items` after changing them.
+    """
+
+    def __init__(self, inner_component_type: Type[QWidget], display_mode: DisplayMode = DisplayMode.LIST):
+        super().__init__()
+
+        # Base layout of component
+        base_layout = QVBoxLayout()
+        base_layout.setContentsMargins(0, 0, 0, 0)
+        base_layout.setSpacing(0)
+        base_layout.setAlignment(Qt.AlignTop)
+
+        # Container for inner components, placed by hand
+        self.component_container = QFrame()
+        self.component_container.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+        self.component_container.installEventFilter(self)
+
+        # Items, and components bound to the items around the viewport
+        self.items: Sequence = list()
+        self.bound_components: Dict[int, inner_component_type] = dict()
+        self.free_components: List[inner_component_type] = list()
+
+        # Scroll area
+        self.scroll_area = QScrollArea()
+        self.scroll_area.setWidget(self.component_container)
+        self.scroll_area.setWidgetResizable(True)
+        self.scroll_area.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
+        self.scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.scroll_area.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.scroll_area.verticalScrollBar().valueChanged.connect(self.update_bound_components)
+
+        # Settings
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        base_layout.addWidget(self.scroll_area)
+        self.setLayout(base_layout)
+
+        #
+        self._display_mode = display_mode
+        self.grid_column_count = 4
+        self.list_column_count = 1
+        self.grid_preferred_column_width = 168
+        self.margin = 8
+        self.spacing = 8
+        self.grid_row_height = 168
+        self.list_row_height = 48
+        # Rows above and below the viewport that keep their components, so short scrolls do not rebind
+        self.overscan_rows = 1
+        self.setAcceptDrops(True)
+        self.last_reached_index = -1
+        # Item of the dragged component, the component itself may be rebound while the drag scrolls
+        self.dragged_item = None
+
+        # Resizes are coalesced into one reflow once the size settles, the old arrangement is shown until then
+        self.reflow_delay = 100
+        self.reflow_timer = QTimer(self)
+        self.reflow_timer.setSingleShot(True)
+        self.reflow_timer.timeout.connect(self.reflow)
+        self.inner_component_type = inner_component_type
+
+    # <editor-fold desc="[+] Properties">
+
+    @property
+    def number_of_inner_components(self) -> int:
+        # Items, not components, the panel stands for all of them
+        return len(self.items)
+
+    @property
+    def display_mode(self) -> DisplayMode:
+        return self._display_mode
+
+    @display_mode.setter
+    def display_mode(self, value: DisplayMode) -> None:
+        if self._display_mode != value:
+            self._display_mode = value
+            self.rearrange_content()
+
+    @property
+    def column_count(self) -> int:
+        return max(1, self.grid_column_count) if self.display_mode == DisplayMode.GRID else self.list_column_count
+
+    @property
+    def row_height(self) -> int:
+        return self.grid_row_height if self.display_mode == DisplayMode.GRID else self.list_row_height
+
+    # </editor-fold>
+
+    # <editor-fold desc="[+] Items">
+
+    def refresh_items(self, starting_index: int = 0) -> None:
+        """
+        Follow a change of the items from `starting_index` on, components of earlier items are kept.
+        """
+
+        # Components of the following items would show the wrong item until the next rebind
+        self.unbind_inner_components(starting_index)
+        self.update_content_height()
+        self.update_bound_components()
+
+    def item_index(self, item) -> int:
+        return self.items.index(item)
+
+    def find_component(self, item):
+        for component in self.bound_components.values():
+            if self.component_item(component) is item:
+                return component
+
+        return None
+
+    # </editor-fold>
+
+    # <editor-fold desc="[+] Layout manipulation">
+
+    def rearrange_content(self, should_rearrange_inner_components: bool = True):
+        if should_rearrange_inner_components:
+            for component in list(self.bound_components.values()) + self.free_components:
+                if isinstance(component, IAdaptiveComponent):
+                    component.display_mode = self.display_mode
+
+        # Every item moves when the shape of the grid changes
+        for index, component in self.bound_components.items():
+            component.setGeometry(*self.item_geometry(index))
+
+        self.update_content_height()
+        self.update_bound_components()
+
+    def update_content_height(self):
+        row_count = (len(self.items) + self.column_count - 1) // self.column_count
+        content_height = 2 * self.margin + max(0, row_count * (self.row_height + self.spacing) - self.spacing)
+
+        self.component_container.setFixedHeight(content_height)
+
+    def visible_index_range(self, number_of_rows: int = 0) -> Tuple[int, int]:
+        """
+        Indexes (end excluded) of items in rows that intersect the viewport, widened by `number_of_rows`.
+        """
+
+        row_pitch = self.row_height + self.spacing
+        scroll_value = self.scroll_area.verticalScrollBar().value()
+        viewport_height = self.scroll_area.viewport().height()
+
+        first_row = max(0, (scroll_value - self.margin) // row_pitch - number_of_rows)
+        last_row = max(0, (scroll_value + viewport_height - self.margin) // row_pitch + number_of_rows)
+
+        return (min(len(self.items), first_row * self.column_count),
+                min(len(self.items), (last_row + 1) * self.column_count))
+
+    def item_geometry(self, index: int) -> Tuple[int, int, int, int]:
+        row, column = divmod(index, self.column_count)
+        column_width = self.column_width()
+
+        return (self.margin + column * (column_width + self.spacing),
+                self.margin + row * (self.row_height + self.spacing),
+                column_width, self.row_height)
+
+    def column_width(self) -> int:
+        available_width = self.component_container.width() - 2 * self.margin - (self.column_count - 1) * self.spacing
+
+        return max(1, available_width // self.column_count)
+
+    def update_bound_components(self):
+        """
+        Release components of items that left the viewport and bind free components to items that entered it.
+        """
+
+        first_index, last_index = self.visible_index_range(self.overscan_rows)
+
+        for index in [index for index in self.bound_components if not first_index <= index < last_index]:
+            self.release_inner_component(index)
+
+        for index in range(first_index, last_index):
+            component = self.bound_components.get(index, None)
+
+            if component is None:
+                component = self.free_components.pop() if self.free_components \
+                    else self.make_inner_component(self.items[index])
+                self.bound_components[index] = component
+                self.bind_inner_component(component, self.items[index], index)
+
+            component.setGeometry(*self.item_geometry(index))
+            component.setVisible(True)
+
+    def unbind_inner_components(self, starting_index: int = 0):
+        for index in [index for index in self.bound_components if index >= starting_index]:
+            self.release_inner_component(index)
+
+    def release_inner_component(self, index: int):
+        component = self.bound_components.pop(index)
+        component.setVisible(False)
+        self.free_components.append(component)
+
+        self.on_inner_component_released(component)
+
+    def make_inner_component(self, item) -> QWidget:
+        component = self.create_inner_component(item)
+        component.setParent(self.component_container)
+
+        if isinstance(component, IAdaptiveComponent):
+            component.display_mode = self.display_mode
+
+        return component
+
+    def reshape_grid(self):
+        self.rearrange_content(False)
+
+    def display_as_grid(self):
+        self.display_mode = DisplayMode.GRID
+
+    def display_as_list(self):
+        self.display_mode = DisplayMode.LIST
+
+    def eventFilter(self, watched, event) -> bool:
+        # Width of the container follows the viewport, also when the scroll bar shows up
+        if watched is self.component_container and event.type() == QEvent.Resize:
+            self.reflow_timer.start(self.reflow_delay)
+
+        return super().eventFilter(watched, event)
+
+    def reflow(self):
+        possible_grid_column_count = self.component_container.width() // (self.grid_preferred_column_width + 8)
+
+        if self.grid_column_count != possible_grid_column_count:
+            self.grid_column_count = possible_grid_column_count
+            self.reshape_grid()
+        else:
+            for index, component in self.bound_components.items():
+                component.setGeometry(*self.item_geometry(index))
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.update_bound_components()
+
+    # </editor-fold>
+
+    # <editor-fold desc="[+] Binding">
+
+    def create_inner_component(self, item) -> QWidget:
+        return self.inner_component_type(item)
+
+    def bind_inner_component(self, component: QWidget, item, index: int):
+        pass
+
+    def component_item(self, component: QWidget):
+        pass
+
+    def on_inner_component_released(self, component: QWidget):
+        pass
+
+    # </editor-fold>
+
+    # <editor-fold desc="[+] Drag and drop">
+
+    def check_reached_index(self, position: QPoint) -> int:
+        position = self.component_container.mapFrom(self, position)
+        column_count = self.column_count
+        column_width = self.column_width()
+
+        reached_column = min(max(0, (position.x() - self.margin) // (column_width + self.spacing)), column_count - 1)
+        reached_row = max(0, (position.y() - self.margin) // (self.row_height + self.spacing))
+
+        return min(reached_row * column_count + reached_column, len(self.items) - 1)
+
+    def dragEnterEvent(self, event: QDragEnterEvent) -> None:
+        # Source
+        event_source = event.source()
+
+        # Check type
+        if not isinstance(event_source, self.inner_component_type) \
+                or event_source not in self.bound_components.values():
+            return
+
+        # Remember the dragged item and where it is
+        self.dragged_item = self.component_item(event_source)
+        self.last_reached_index = self.item_index(self.dragged_item)
+
+        event.accept()
+
+        self.on_drag_enter_event_competed()
+
+    def dragLeaveEvent(self, event: QDragLeaveEvent) -> None:
+        event.accept()
+
+        self.on_drag_leave_event_competed()
+
+    def dragMoveEvent(self, event: QDragMoveEvent) -> None:
+        # Check type
+        if not isinstance(event.source(), self.inner_component_type):
+            return
+
+        previous_index = self.last_reached_index
+        self.last_reached_index = self.check_reached_index(event.pos())
+
+        event.accept()
+
+        self.on_drag_move_event_competed(previous_index)
+
+    def dropEvent(self, event: QDropEvent) -> None:
+        # Assign indexes, the owner of the items moves them
+        source_indexes = self.dragged_item_indexes(self.dragged_item)
+        reached_index = self.last_reached_index
+
+        if reached_index in source_indexes:
+            self.on_drop_event_competed([], -1)
+            return
+
+        # Dropped before the reached item when moved up, after it when moved down
+        destination_index = reached_index - sum(1 for source_index in source_indexes if source_index < reached_index)
+
+        if reached_index > source_indexes[0]:
+            destination_index += 1
+
+        event.accept()
+
+        self.on_drop_event_competed(source_indexes, destination_index)
+
+    def dragged_item_indexes(self, dragged_item) -> List[int]:
+        """
+        Sorted indexes of the items moved by a drag of `dragged_item`.
+        """
+
+        return [self.item_index(dragged_item)]
+
+    def on_drag_enter_event_competed(self):
+        pass
+
+    def on_drag_leave_event_competed(self):
+        pass
+
+    def on_drag_move_event_competed(self, previous_index: int):
+        pass
+
+    def on_drop_event_competed(self, source_indexes: List[int], destination_index: int):
+        pass
+
+    # </editor-fold>
@@ -1,26 +1,34 @@
 from PyQt5.QtGui import QPalette, QColor
 from PyQt5.QtWidgets import QSizePolicy, QFrame, QLabel, \
-    QLineEdit, QGridLayout
+    QLineEdit, QGridLayout, QProgressBar
 
+from components.core.checkbox_component import CheckboxComponent
 from components.core.icon_button_component import IconButtonComponent
 from enums.message_type import MessageType
 from enums.svg_icon import SVGIcon
 from managers.message_manager import MessageManager
+from models.merge_engine import MergeProgress
 
 
 class ActionPanelComponent(QFrame):
     def __init__(self):
         super().__init__()
 
-        button = IconButtonComponent("Merge", SVGIcon.LIGHTNING)
+        self.button_merge = IconButtonComponent("Merge", SVGIcon.LIGHTNING)
         label = QLabel("Merged PDF name")
         self.input_line = QLineEdit()
         self.input_line.setPlaceholderText("Input new filename here")
+        self.checkbox_is_compacted = CheckboxComponent("Compact", initial_state=False)
+        self.progress_bar = QProgressBar()
+        self.button_cancel = IconButtonComponent("Cancel", SVGIcon.CIRCLE_REMOVE)
 
         self.setProperty("class", "action_panel")
         self.input_line.setProperty("class", "action_panel__input")
         label.setProperty("class", "action_panel__label")
-        button.setProperty("class", "action_panel__button")
+        self.button_merge.setProperty("class", "action_panel__button")
+        self.checkbox_is_compacted.setProperty("class", "action_panel__checkbox")
+        self.progress_bar.setProperty("class", "action_panel__progress")
+        self.button_cancel.setProperty("class", "action_panel__button_cancel")
 
         palette = self.input_line.palette()
         palette.setColor(QPalette.PlaceholderText, QColor("#A9A9A9"))
@@ -35,14 +43,74 @@ class ActionPanelComponent(QFrame):
         self.layout().setContentsMargins(8, 8, 8, 8)
 
         self.layout().addWidget(label, 0, 0, 1, 1)
-        self.layout().addWidget(self.input_line, 0, 1, 1, 2)
-        self.layout().addWidget(button, 0, 3, 1, 1)
+        self.layout().addWidget(self.input_line, 0, 1, 1, 1)
+        self.layout().addWidget(self.checkbox_is_compacted, 0, 2, 1, 1)
+        self.layout().addWidget(self.button_merge, 0, 3, 1, 1)
+        self.layout().addWidget(self.progress_bar, 1, 0, 1, 3)
+        self.layout().addWidget(self.button_cancel, 1, 3, 1, 1)
 
-        button.setSizePolicy(QSizePolicy.Preferred , QSizePolicy.Maximum)
+        self.button_merge.setSizePolicy(QSizePolicy.Preferred , QSizePolicy.Maximum)
         self.input_line.setSizePolicy(QSizePolicy.MinimumExpanding, QSizePolicy.Maximum)
         label.setSizePolicy(QSizePolicy.Preferred , QSizePolicy.Maximum)
+        self.checkbox_is_compacted.setSizePolicy(QSizePolicy.Maximum, QSizePolicy.Maximum)
+        self.progress_bar.setSizePolicy(QSizePolicy.MinimumExpanding, QSizePolicy.Maximum)
+        self.button_cancel.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Maximum)
 
-        button.clicked.connect(self.on_button_merge_clicked)
+        # Progress is shown only while merging
+        self.progress_bar.setMinimumHeight(32)
+        self.progress_bar.setRange(0, 1000)
+        self.progress_bar.setTextVisible(True)
+        self.progress_bar.setVisible(False)
+        self.button_cancel.setVisible(False)
+
+        self.button_merge.clicked.connect(self.on_button_merge_clicked)
+        self.button_cancel.clicked.connect(self.on_button_cancel_clicked)
 
     def on_button_merge_clicked(self):
-        MessageManager.send(MessageType.ACTION_MERGE_CLICKED, pdf_filename=self.input_line.text())
\ No newline at end of file
+        MessageManager.send(MessageType.ACTION_MERGE_CLICKED, pdf_filename=self.input_line.text(),
+                            is_compacted=self.checkbox_is_compacted.isChecked())
+
+    def on_button_cancel_clicked(self):
+        MessageManager.send(MessageType.ACTION_CANCEL_CLICKED)
+
+    # <editor-fold desc="[+] Merge progress">
+
+    def on_merge_started(self, number_of_documents: int):
+        self.button_merge.setEnabled(False)
+        self.input_line.setEnabled(False)
+        self.checkbox_is_compacted.setEnabled(False)
+
+        self.progress_bar.setValue(0)
+        self.progress_bar.setFormat(f"Merging 0 / {number_of_documents}")
+        self.progress_bar.setVisible(True)
+        self.button_cancel.setEnabled(True)
+        self.button_cancel.setVisible(True)
+
+    def on_merge_progress(self, merge_progress: MergeProgress):
+        self.progress_bar.setValue(int(merge_progress.fraction * self.progress_bar.maximum()))
+        self.progress_bar.setFormat(f"Merging {merge_progress.document_index + 1} / "
+                                    f"{merge_progress.number_of_documents}: {merge_progress.document_name} "
+                                    f"(page {merge_progress.page_index + 1} / {merge_progress.number_of_pages})")
+
+    def on_merge_cancel_requested(self):
+        self.button_cancel.setEnabled(False)
+        self.progress_bar.setFormat("Cancelling...")
+
+    def on_merge_finished(self, pdf_filename: str):
+        self.reset_merge_state()
+
+    def on_merge_failed(self, error_message: str):
+        self.reset_merge_state()
+
+    def on_merge_cancelled(self):
+        self.reset_merge_state()
+
+    def reset_merge_state(self):
+        self.button_merge.setEnabled(True)
+        self.input_line.setEnabled(True)
+        self.checkbox_is_compacted.setEnabled(True)
+
+        self.progress_bar.setVisible(False)
+        self.button_cancel.setVisible(False)
+
+    # </editor-fold>
\ No newline at end of file
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from PyQt5.QtWidgets import QSizePolicy, QFrame, QHBoxLayout, QLabel
 
 from components.core.icon_button_component import IconButtonComponent
@@ -10,6 +12,9 @@ class ControlPanelComponent(QFrame):
     def __init__(self):
         super().__init__()
 
+        self.number_of_documents = 0
+        self.memory_warning_message: Optional[str] = None
+
         self.button_add_file = IconButtonComponent("Add File", SVGIcon.FILE_PLUS)
         self.label_document_number = QLabel("Documents: 0")
         button_list_view = IconButtonComponent("List View", SVGIcon.LIST)
@@ -44,4 +49,16 @@ class ControlPanelComponent(QFrame):
         self.setLayout(layout)
 
     def set_number_of_documents(self, number_of_documents: int):
-        self.label_document_number.setText(f"Documents: {number_of_documents}")
+        self.number_of_documents = number_of_documents
+
+        if self.memory_warning_message is None:
+            self.label_document_number.setText(f"Documents: {number_of_documents}")
+        else:
+            self.label_document_number.setText(f"Documents: {number_of_documents} (!)")
+
+    def set_memory_warning(self, warning_message: Optional[str]):
+        # Shown until the document data fits its envelope again
+        self.memory_warning_message = warning_message
+        self.label_document_number.setToolTip(warning_message if warning_message is not None else "")
+
+        self.set_number_of_documents(self.number_of_documents)
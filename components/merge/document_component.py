@@ -1,10 +1,8 @@
-import io
+from typing import Dict, Optional, Tuple
 
-import fitz
-from PIL import Image
-from PyQt5.QtCore import Qt, QMimeData
+from PyQt5.QtCore import Qt, QMimeData, QPoint, QRect
 from PyQt5.QtGui import QPainter, QDrag, QPixmap, QBitmap, QImage
-from PyQt5.QtWidgets import QFrame, QLabel, QSizePolicy, QGridLayout, QVBoxLayout
+from PyQt5.QtWidgets import QApplication, QFrame, QLabel, QSizePolicy, QGridLayout, QVBoxLayout, QLineEdit
 
 from components.core.checkbox_component import CheckboxComponent
 from components.core.icon_button_component import IconButtonComponent
@@ -12,34 +10,55 @@ from enums.component_state import ComponentState
 from enums.display_mode import DisplayMode
 from enums.message_type import MessageType
 from enums.svg_icon import SVGIcon
+from enums.thumbnail_tier import ThumbnailTier
 from interfaces.i_adaptive_component import IAdaptiveComponent, IAdaptiveComponentMeta
 from managers.message_manager import MessageManager
 from managers.style_manager import StyleManager
+from models.page_selection import PageSelection
 from viewmodels.merge_viewmodel import DocumentItem
 
 
 class DocumentComponent(QFrame, IAdaptiveComponent, metaclass=IAdaptiveComponentMeta):
 
-    def __init__(self, document_item: DocumentItem, display_mode: DisplayMode = DisplayMode.LIST):
+    # Rounded masks of drag images, per size
+    drag_masks: Dict[Tuple[int, int], QBitmap] = dict()
+
+    def __init__(self, document_item: DocumentItem, display_mode: DisplayMode = DisplayMode.LIST,
+                 document_index: int = 0):
         super().__init__()
 
         # Assigned DocumentItem
         self.document_item = document_item
 
         # Inner components
-        self.label_document_index = QLabel(str(self.document_item.document_index+1))
+        self.label_document_index = QLabel(str(document_index+1))
         self.label_document_name = QLabel(self.document_item.document_name)
         self.checkbox_is_included = CheckboxComponent()
+        self.input_page_selection = QLineEdit(self.document_item.document_page_selection)
         self.icon_button_remove = IconButtonComponent("Remove", SVGIcon.CIRCLE_REMOVE)
         self.frame_preview = QFrame()
+        self.label_preview = QLabel("PDF")
+        # Side of the box in device pixels the shown or requested preview was made for
+        self.preview_box = None
+        # Page shown while the preview is scrubbed by hovering
+        self.preview_page_index = 0
+        # Where the left button was pressed, a drag starts once the cursor moved far enough from it
+        self.drag_start_position: Optional[QPoint] = None
+        # Documents moved by a drag of this component, set by the panel from its selection
+        self.number_of_dragged_documents = 1
+        # Drag image, rendered again only when what it shows changed
+        self.drag_pixmap: Optional[QPixmap] = None
+        self.drag_pixmap_key = None
 
         # Style classes
         self.setProperty("class", "document")
         self.label_document_index.setProperty("class", "document__index")
         self.label_document_name.setProperty("class", "document__name")
         self.checkbox_is_included.setProperty("class", "document__checkbox")
+        self.input_page_selection.setProperty("class", "document__pages")
         self.icon_button_remove.setProperty("class", "document__button")
         self.frame_preview.setProperty("class", "document__frame")
+        self.label_preview.setProperty("class", "document__preview")
 
         # Layout
         layout = QGridLayout()
@@ -60,16 +79,31 @@ class DocumentComponent(QFrame, IAdaptiveComponent, metaclass=IAdaptiveComponent
         self.label_document_index.setContentsMargins(4, 4, 4, 4)
         self.label_document_name.setContentsMargins(4, 4, 4, 4)
 
+        self.input_page_selection.setPlaceholderText("All pages")
+        self.input_page_selection.setToolTip("Pages to merge, for example: 1-2, 5, 10-")
+        self.input_page_selection.setMinimumHeight(32)
+        self.input_page_selection.setMaximumWidth(112)
+
         self.label_document_index.setSizePolicy(QSizePolicy.Maximum, QSizePolicy.Maximum)
         self.label_document_name.setSizePolicy(QSizePolicy.MinimumExpanding, QSizePolicy.Maximum)
         self.checkbox_is_included.setSizePolicy(QSizePolicy.Maximum, QSizePolicy.Maximum)
+        self.input_page_selection.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Maximum)
         self.icon_button_remove.setSizePolicy(QSizePolicy.Maximum, QSizePolicy.Maximum)
         self.setSizePolicy(QSizePolicy.MinimumExpanding, QSizePolicy.Maximum)
 
         self.icon_button_remove.clicked.connect(self.on_button_remove_clicked)
         self.checkbox_is_included.stateChanged.connect(self.on_checkbox_is_included_clicked)
+        self.input_page_selection.textChanged.connect(self.on_input_page_selection_changed)
+
+        # Placeholder until the preview arrives from `PreviewManager`
+        preview_layout = QVBoxLayout()
+        preview_layout.setContentsMargins(0, 0, 0, 0)
+        preview_layout.addWidget(self.label_preview)
+        preview_layout.setAlignment(Qt.AlignVCenter | Qt.AlignHCenter)
+        self.frame_preview.setLayout(preview_layout)
+
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Preferred)
 
-        self.generate_preview()
         self._display_mode = display_mode
         self.attach_all_inner_components()
 
@@ -77,68 +111,49 @@ class DocumentComponent(QFrame, IAdaptiveComponent, metaclass=IAdaptiveComponent
         self.label_document_name.setCursor(Qt.PointingHandCursor)
         self.frame_preview.setCursor(Qt.PointingHandCursor)
 
-    def generate_preview(self):
-        pdf_document = fitz.open(self.document_item.document_path)
-        first_page = pdf_document[0]
-        width, height = first_page.rect.width, first_page.rect.height
-
-        # Render the first page to a pixmap
-        pix = first_page.get_pixmap(dpi=72)  # 72 DPI is generally sufficient for thumbnails
-
-        # Convert the pixmap to bytes and open with PIL
-        img = Image.open(io.BytesIO(pix.tobytes("jpg")))
-
-        limit_w = 112
-        limit_h = 112
-
-        scale_w = limit_w / width
-        scale_h = limit_h / height
+        # Hovering the preview scrubs through pages, moves without a pressed button are needed for that
+        self.setMouseTracking(True)
+        self.frame_preview.setMouseTracking(True)
+        self.label_preview.setMouseTracking(True)
 
-        scale = min(scale_h, scale_w)
+    def set_preview(self, pixmap: QPixmap, device_pixel_ratio: float):
+        # Shared with `ThumbnailMemoryCacheManager`, only copied if it was made for another display scale
+        if pixmap.devicePixelRatio() != device_pixel_ratio:
+            pixmap = QPixmap(pixmap)
+            pixmap.setDevicePixelRatio(device_pixel_ratio)
 
-        good_w = min(limit_w, int(round(scale * width)))
-        good_h = min(limit_w, int(round(scale * height)))
+        self.label_preview.setPixmap(pixmap)
 
-        # Resize the image to 128x128
-        img = img.resize((int(good_w), int(good_h)))
+    def preview_tier(self) -> ThumbnailTier:
+        # Smallest tier that fills the frame without its border
+        side = min(self.frame_preview.width(), self.frame_preview.height()) - 4
 
-        print(">>>", good_w, good_h, scale*height)
+        if not self.frame_preview.isVisible() or side <= 0:
+            return ThumbnailTier.MEDIUM
 
-        # Convert the PIL image to QImage
-        img_data = img.convert("RGBA")
-        qimage = QImage(img_data.tobytes(), int(img_data.width), int(img_data.height), QImage.Format_RGBA8888)
+        for thumbnail_tier in ThumbnailTier:
+            if side <= thumbnail_tier.value:
+                return thumbnail_tier
 
-        label = QLabel()
-        pixmap = QPixmap.fromImage(qimage)
-        label.setPixmap(pixmap)
+        return ThumbnailTier.LARGE
 
-        # preview
-       # self.frame_preview.setStyleSheet("background: #6F4E37; border: 2px solid #4D3120; border-radius: 4px;")
-        label.setProperty("class", "document__preview")
-      #  label.setStyleSheet("background: #FFDEAD; border: 0px solid #4D3120; border-radius: 4px;")
-
-        layout = QVBoxLayout()
-        layout.setContentsMargins(0, 0, 0, 0)
-        layout.addWidget(label)
-        layout.setAlignment(Qt.AlignVCenter | Qt.AlignHCenter)
-
-        self.frame_preview.setLayout(layout)
-
-        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Preferred)
-
-       # self.setAcceptDrops(True)
+    def clear_preview(self):
+        # Back to the placeholder, the pixmap is freed right away
+        self.preview_box = None
+        self.preview_page_index = 0
+        self.label_preview.clear()
+        self.label_preview.setText("PDF")
+        self.label_preview.setToolTip("")
+        StyleManager.change_component_state(self.label_preview, ComponentState.DEFAULT)
 
+    def set_preview_failed(self, error_message: str):
+        # Broken documents are reported by preflight, the row is kept without a preview
+        self.label_preview.setText("N/A")
+        self.label_preview.setToolTip(error_message)
+        StyleManager.change_component_state(self.label_preview, ComponentState.INVALID)
 
     # <editor-fold desc="[+] Properties">
 
-    @property
-    def document_index(self) -> int:
-        return self.document_item.document_index
-
-    @document_index.setter
-    def document_index(self, value: int) -> None:
-        self.document_item.document_index = value
-
     @property
     def document_name(self) -> str:
         return self.document_item.document_name
@@ -151,6 +166,14 @@ class DocumentComponent(QFrame, IAdaptiveComponent, metaclass=IAdaptiveComponent
     def document_is_included(self, value: bool) -> None:
         self.document_item.document_is_included = value
 
+    @property
+    def document_page_selection(self) -> str:
+        return self.document_item.document_page_selection
+
+    @document_page_selection.setter
+    def document_page_selection(self, value: str) -> None:
+        self.document_item.document_page_selection = value
+
     @property
     def display_mode(self) -> DisplayMode:
         return self._display_mode
@@ -181,14 +204,21 @@ class DocumentComponent(QFrame, IAdaptiveComponent, metaclass=IAdaptiveComponent
             # Place components
             self.layout().addWidget(self.label_document_index, 0, 0)
             self.layout().addWidget(self.label_document_name, 0, 1)
-            self.layout().addWidget(self.checkbox_is_included, 0, 2)
-            self.layout().addWidget(self.icon_button_remove, 0, 3)
+            self.layout().addWidget(self.input_page_selection, 0, 2)
+            self.layout().addWidget(self.checkbox_is_included, 0, 3)
+            self.layout().addWidget(self.icon_button_remove, 0, 4)
+
+            # Show page selection
+            self.input_page_selection.setVisible(True)
 
             # Adjust self
             self.setMinimumSize(96, 48)
             self.setMaximumHeight(48)
 
         elif self.display_mode == DisplayMode.GRID:
+            # Hide page selection
+            self.input_page_selection.setVisible(False)
+
             # Place components
             self.icon_button_remove.is_minimized = True
             self.checkbox_is_included.is_minimized = True
@@ -215,14 +245,56 @@ class DocumentComponent(QFrame, IAdaptiveComponent, metaclass=IAdaptiveComponent
         self.layout().removeWidget(self.label_document_index)
         self.layout().removeWidget(self.label_document_name)
         self.layout().removeWidget(self.checkbox_is_included)
+        self.layout().removeWidget(self.input_page_selection)
         self.layout().removeWidget(self.icon_button_remove)
         self.layout().removeWidget(self.frame_preview)
 
     # </editor-fold>
 
+    def apply_preflight(self):
+        preflight_report = self.document_item.document_preflight
+
+        if preflight_report is None:
+            return
+
+        self.label_document_name.setToolTip(preflight_report.summary)
+        self.frame_preview.setToolTip(preflight_report.summary)
+
+        if not preflight_report.is_mergeable:
+            self.checkbox_is_included.setChecked(self.document_is_included)
+            StyleManager.change_component_state(self.label_document_name, ComponentState.INVALID)
+
+    def bind(self, document_item: DocumentItem, document_index: int):
+        """
+        Show another item, components of `VirtualDocumentPanelComponent` are reused while scrolling.
+        """
+
+        self.document_item = document_item
+
+        self.label_document_index.setText(str(document_index+1))
+        self.label_document_name.setText(document_item.document_name)
+        self.label_document_name.setToolTip("")
+        self.frame_preview.setToolTip("")
+        self.checkbox_is_included.setChecked(document_item.document_is_included)
+        self.input_page_selection.setText(document_item.document_page_selection)
+        self.clear_preview()
+
+        # Polishing is not free, states are only reset when they were changed
+        if StyleManager.get_component_state(self) != ComponentState.DEFAULT:
+            StyleManager.change_component_state(self, ComponentState.DEFAULT)
+
+        if StyleManager.get_component_state(self.label_document_name) != ComponentState.DEFAULT:
+            StyleManager.change_component_state(self.label_document_name, ComponentState.DEFAULT)
+
+        self.apply_preflight()
+
     def update_document_index(self, new_document_index: int):
-        self.document_index = new_document_index
-        self.label_document_index.setText(str(new_document_index+1))
+        # Positions are kept by `DocumentCollection`, only the label follows them
+        document_index_text = str(new_document_index+1)
+
+        # Labels on screen are renumbered after every scroll, most of them did not change
+        if self.label_document_index.text() != document_index_text:
+            self.label_document_index.setText(document_index_text)
 
     def on_button_remove_clicked(self):
         MessageManager.send(MessageType.DOCUMENT_REMOVE_CLICKED, document_component=self)
@@ -239,41 +311,135 @@ class DocumentComponent(QFrame, IAdaptiveComponent, metaclass=IAdaptiveComponent
         new_state_as_bool: bool = (new_state != 0)
         self.document_is_included = new_state_as_bool
 
+    def on_input_page_selection_changed(self, new_text: str):
+        # Keep the last valid selection, mark the input while the text does not parse
+        if PageSelection.is_valid(new_text):
+            self.document_page_selection = new_text
+            StyleManager.change_component_state(self.input_page_selection, ComponentState.DEFAULT)
+        else:
+            StyleManager.change_component_state(self.input_page_selection, ComponentState.INVALID)
+
+    def scrub_preview(self, x: int):
+        """
+        Pick the page under the cursor, the width of the preview is split evenly between pages.
+        """
+
+        # Called on every mouse move, only the page count is read
+        page_count = self.document_item.document_page_count
+
+        if self.display_mode != DisplayMode.GRID or page_count is None or page_count < 2:
+            return
+
+        fraction = (x - self.frame_preview.x()) / max(1, self.frame_preview.width())
+        page_index = min(max(0, int(fraction * page_count)), page_count - 1)
+
+        if page_index != self.preview_page_index:
+            MessageManager.send(MessageType.DOCUMENT_PREVIEW_SCRUBBED, document_component=self, page_index=page_index)
+
+    def leaveEvent(self, e):
+        super().leaveEvent(e)
+
+        if self.preview_page_index != 0:
+            MessageManager.send(MessageType.DOCUMENT_PREVIEW_SCRUBBED, document_component=self, page_index=0)
+
+    def mousePressEvent(self, e):
+        if e.button() != Qt.LeftButton:
+            super().mousePressEvent(e)
+            return
+
+        self.drag_start_position = e.pos()
+        e.accept()
+
+        MessageManager.send(MessageType.DOCUMENT_PRESSED, document_component=self, modifiers=e.modifiers())
+
+    def mouseReleaseEvent(self, e):
+        if e.button() != Qt.LeftButton or self.drag_start_position is None:
+            super().mouseReleaseEvent(e)
+            return
+
+        # Released without a drag
+        self.drag_start_position = None
+        e.accept()
+
+        MessageManager.send(MessageType.DOCUMENT_CLICKED, document_component=self, modifiers=e.modifiers())
+
     def mouseMoveEvent(self, e):
-        if e.buttons() == Qt.LeftButton:
-            # QDrag object to manage the drag-and-drop operation
+        if e.buttons() == Qt.NoButton:
+            if self.frame_preview.geometry().contains(e.pos()):
+                self.scrub_preview(e.pos().x())
+
+        elif e.buttons() == Qt.LeftButton and self.drag_start_position is not None:
+            if (e.pos() - self.drag_start_position).manhattanLength() < QApplication.startDragDistance():
+                return
+
+            # One drag per press, the following moves belong to it
+            hot_spot = self.drag_start_position
+            self.drag_start_position = None
+
             drag = QDrag(self)
-            mime = QMimeData()
-            drag.setMimeData(mime)
+            drag.setMimeData(QMimeData())
+            drag.setPixmap(self.render_drag_pixmap(self.number_of_dragged_documents))
+            drag.setHotSpot(hot_spot)
+            drag.exec_(Qt.MoveAction)
 
-            # Create an empty pixmap with the same dimensions as the widget
-            pixmap = QPixmap(self.size())
-            pixmap.fill(Qt.transparent)  # Fill with transparency
+    def render_drag_pixmap(self, number_of_documents: int = 1) -> QPixmap:
+        """
+        Translucent image of the component with rounded corners, and the number of documents when several are dragged.
+        """
 
-            # Set up a painter to draw the widget's content with opacity
-            painter = QPainter(pixmap)
-            painter.setOpacity(0.5)  # Adjust opacity
-            self.render(painter)  # Draw the widget's content
-            painter.end()
+        preview_pixmap = self.label_preview.pixmap()
+        drag_pixmap_key = (self.width(), self.height(), self.display_mode, StyleManager.get_component_state(self),
+                           self.label_document_index.text(), self.label_document_name.text(),
+                           self.checkbox_is_included.isChecked(), self.input_page_selection.text(),
+                           self.label_preview.text(), preview_pixmap.cacheKey() if preview_pixmap is not None else 0)
 
-            # Create a mask with rounded corners
-            mask = QBitmap(pixmap.size())
-            mask.fill(Qt.color0)  # Fill the mask with transparent color
-            painter = QPainter(mask)
-            painter.setRenderHint(QPainter.Antialiasing)  # Smooth edges
-            radius = 4  # Adjust radius for rounded corners
-            painter.setBrush(Qt.color1)  # Set brush to solid for visible area
-            painter.drawRoundedRect(pixmap.rect(), radius, radius)
+        if self.drag_pixmap is None or self.drag_pixmap_key != drag_pixmap_key:
+            self.drag_pixmap = QPixmap(self.size())
+            self.drag_pixmap.fill(Qt.transparent)
+
+            painter = QPainter(self.drag_pixmap)
+            painter.setOpacity(0.5)
+            self.render(painter)
             painter.end()
 
-            # Apply the rounded mask to the pixmap
-            pixmap.setMask(mask)
+            self.drag_pixmap.setMask(self.drag_mask(self.width(), self.height()))
+            self.drag_pixmap_key = drag_pixmap_key
 
-            # Set the modified pixmap as the drag image
-            drag.setPixmap(pixmap)
-            drag.exec_(Qt.MoveAction)
+        if number_of_documents < 2:
+            return self.drag_pixmap
+
+        # Drawn on a copy, the cached image stays without a number
+        pixmap = QPixmap(self.drag_pixmap)
+        badge = QRect(pixmap.width() - 32, 4, 28, 20)
+
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(self.palette().highlight())
+        painter.drawRoundedRect(badge, 10, 10)
+        painter.setPen(self.palette().highlightedText().color())
+        painter.drawText(badge, Qt.AlignCenter, str(number_of_documents))
+        painter.end()
+
+        return pixmap
+
+    @classmethod
+    def drag_mask(cls, width: int, height: int) -> QBitmap:
+        mask = cls.drag_masks.get((width, height), None)
+
+        if mask is None:
+            mask = QBitmap(width, height)
+            mask.fill(Qt.color0)
+
+            painter = QPainter(mask)
+            painter.setRenderHint(QPainter.Antialiasing)
+            painter.setBrush(Qt.color1)
+            painter.drawRoundedRect(mask.rect(), 4, 4)
+            painter.end()
 
+            cls.drag_masks[(width, height)] = mask
 
+        return mask
 
 
    # def enterEvent(self, e):
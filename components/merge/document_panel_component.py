@@ -1,7 +1,7 @@
-from typing import List
+from typing import Iterator, List, Dict, Optional, Set, Tuple
 
-from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QDragEnterEvent, QDropEvent, \
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtGui import QImage, QPixmap, QDragEnterEvent, QDropEvent, \
     QDragMoveEvent, QDragLeaveEvent
 from PyQt5.QtWidgets import QSizePolicy, QFrame, QVBoxLayout, QGridLayout, QScrollArea
 
@@ -11,57 +11,409 @@ from enums.component_state import ComponentState
 from enums.display_mode import DisplayMode
 from enums.message_type import MessageType
 from managers.message_manager import MessageManager
+from managers.preview_manager import PreviewManager
 from managers.style_manager import StyleManager
+from managers.thumbnail_memory_cache_manager import ThumbnailMemoryCacheManager
+from models.document_collection import DocumentCollection
+from models.document_selection import DocumentSelection
 from viewmodels.merge_viewmodel import DocumentItem
 
 
+class DocumentComponentSequence:
+    """
+    Read-only view of the components of a panel in the order of its document collection.
+
+    The collection owns the order, so a move or a remove changes nothing here and no position is searched linearly.
+    """
+
+    def __init__(self, document_collection: DocumentCollection, document_components: Dict[int, DocumentComponent]):
+        self.document_collection = document_collection
+        self.document_components = document_components
+
+    def __len__(self) -> int:
+        return len(self.document_collection)
+
+    def __iter__(self) -> Iterator[DocumentComponent]:
+        for document_item in self.document_collection:
+            yield self.document_components[document_item.document_id]
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self.document_components[document_item.document_id]
+                    for document_item in self.document_collection[position]]
+
+        return self.document_components[self.document_collection[position].document_id]
+
+    def index(self, document_component: DocumentComponent) -> int:
+        return self.document_collection.index(document_component.document_item.document_id)
+
+
 class DocumentPanelComponent(AdaptivePanelComponent):
-    def __init__(self):
+    def __init__(self, document_collection: DocumentCollection):
         super().__init__(DocumentComponent)
 
+        # Order of documents, owned by the viewmodel, components follow it
+        self.document_collection = document_collection
+
         self.setProperty("class", "document__panel")
         self.component_container.setProperty("class", "document_panel__container")
         self.scroll_area.setProperty("class", "document_panel__scroll_area")
 
+        # Lookup of components by the ids of their documents, their order is the one of the collection
+        self.document_components: Dict[int, DocumentComponent] = dict()
+        self.inner_components = DocumentComponentSequence(document_collection, self.document_components)
+
         MessageManager.subscribe(MessageType.MERGE_VIEWMODEL__DOCUMENT_REMOVED, self, self.update_document_indexes)
+        MessageManager.subscribe(MessageType.MERGE_VIEWMODEL__DOCUMENT_PREFLIGHTED, self, self.on_document_preflighted)
+        MessageManager.subscribe(MessageType.DOCUMENT_PREVIEW_SCRUBBED, self, self.on_document_preview_scrubbed)
+        MessageManager.subscribe(MessageType.DOCUMENT_PRESSED, self, self.on_document_pressed)
+        MessageManager.subscribe(MessageType.DOCUMENT_CLICKED, self, self.on_document_clicked)
+
+        # Selected documents are dragged together
+        self.document_selection = DocumentSelection(document_collection)
+
+        # Previews are rendered in the background, only in grid mode and only near the viewport
+        self.previewed_components: Set[DocumentComponent] = set()
+        PreviewManager.preview_signals().rendered.connect(self.on_preview_rendered)
+        PreviewManager.preview_signals().failed.connect(self.on_preview_failed)
+        self.scroll_area.verticalScrollBar().valueChanged.connect(self.schedule_preview_update)
+
+        # Geometry of new components is known once the layout has run, a batch of changes is handled once
+        self.preview_update_timer = QTimer(self)
+        self.preview_update_timer.setSingleShot(True)
+        self.preview_update_timer.timeout.connect(self.update_previews)
+
+        # Viewport heights above and below the viewport where previews are prepared, and where they are kept
+        self.preview_prefetch_screens = 1
+        self.preview_release_screens = 3
+        self.is_screen_connected = False
+        # Pages before and after a scrubbed page that are rendered ahead
+        self.preview_scrub_prefetch_pages = 2
+
+        # Labels from this index on may show old positions, they are renumbered once they are on screen
+        self.stale_label_index: Optional[int] = None
 
     def add_document_component(self, document_item: DocumentItem):
-        document_component = DocumentComponent(document_item, self.display_mode)
-        self.inner_components.append(document_component)
-        self.attach_inner_component(document_component)
+        self.add_document_components([document_item])
+
+    def add_document_components(self, document_items: List[DocumentItem]):
+        """
+        Add a batch of documents. Painting is suspended while the batch is built, layout runs once for all of it.
+        """
+
+        # Showing a component activates the layout of its visible parents, so the container is shown once at the end
+        is_container_hidden = self.component_container.isHidden()
+        # Already at the end of the collection
+        first_index = len(self.document_collection) - len(document_items)
+
+        self.setUpdatesEnabled(False)
+        self.component_container.setVisible(False)
+
+        try:
+            for index, document_item in enumerate(document_items, first_index):
+                document_component = DocumentComponent(document_item, self.display_mode, index)
+                self.document_components[document_item.document_id] = document_component
+                self.attach_inner_component(document_component, index)
+        finally:
+            self.component_container.setVisible(not is_container_hidden)
+            self.setUpdatesEnabled(True)
+
+        self.schedule_preview_update()
 
     def remove_document_component(self, document_component: DocumentComponent):
-        self.inner_components.remove(document_component)
-        MessageManager.send(MessageType.MERGE_VIEW__DOCUMENT_REMOVED, document_index=document_component.document_index)
-        self.rearrange_content(False)
+        document_id = document_component.document_item.document_id
+        index = self.document_collection.index(document_id)
+
+        self.document_selection.discard(document_id)
+        self.release_preview(document_component)
+        # The viewmodel removes the document from the collection, so it is no longer among the inner components
+        MessageManager.send(MessageType.MERGE_VIEW__DOCUMENT_REMOVED, document_id=document_id)
+        self.document_components.pop(document_id, None)
+
+        # Components before the removed one keep their cells
+        self.detach_inner_component(document_component)
+        self.relayout_inner_components(index)
+        self.schedule_preview_update()
         document_component.deleteLater()
 
     def update_document_indexes(self, starting_index: int = 0):
-        for index in range(starting_index, self.number_of_inner_components):
-            w: DocumentComponent = self.inner_components[index]
-            w.update_document_index(index)
+        """
+        Positions changed from `starting_index` on. Labels on screen are renumbered, the others once they are shown.
+        """
+
+        self.stale_label_index = starting_index if self.stale_label_index is None \
+            else min(self.stale_label_index, starting_index)
+        self.schedule_preview_update()
+
+    def update_visible_labels(self):
+        if self.stale_label_index is None or not self.inner_components:
+            return
+
+        first_index, last_index = self.preview_index_range(0)
+        first_stale_index = max(first_index, self.stale_label_index)
+
+        for index, document_component in enumerate(self.inner_components[first_stale_index:last_index],
+                                                   first_stale_index):
+            document_component.update_document_index(index)
+
+        # Renumbered up to the last document
+        if first_index <= self.stale_label_index and last_index == self.number_of_inner_components:
+            self.stale_label_index = None
+
+    def on_document_preflighted(self, document_item: DocumentItem):
+        document_component = self.document_components.get(document_item.document_id, None)
+
+        if document_component is not None:
+            document_component.apply_preflight()
+
+    # <editor-fold desc="[+] Previews">
+
+    def rearrange_content(self, should_rearrange_inner_components: bool = True):
+        super().rearrange_content(should_rearrange_inner_components)
+        self.schedule_preview_update()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.schedule_preview_update()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+
+        # Display scale changes when the window moves to another screen
+        if not self.is_screen_connected and self.window().windowHandle() is not None:
+            self.window().windowHandle().screenChanged.connect(self.schedule_preview_update)
+            self.is_screen_connected = True
+
+    def schedule_preview_update(self):
+        self.preview_update_timer.start(0)
+
+    def update_previews(self):
+        """
+        Request previews of components near the viewport and release previews that went far off-screen.
+
+        Work is bounded by the number of components around the viewport, not by the number of documents.
+        """
+
+        self.update_visible_labels()
+
+        if self.display_mode != DisplayMode.GRID or not self.inner_components:
+            for document_component in list(self.previewed_components):
+                self.release_preview(document_component)
+
+            return
+
+        visible_first, visible_last = self.preview_index_range(0)
+        near_first, near_last = self.preview_index_range(self.preview_prefetch_screens)
+        kept_first, kept_last = self.preview_index_range(self.preview_release_screens)
+
+        kept_components = set(self.inner_components[kept_first:kept_last])
+
+        for document_component in list(self.previewed_components):
+            if document_component not in kept_components:
+                self.release_preview(document_component)
+
+        device_pixel_ratio = self.devicePixelRatioF()
+
+        for index, document_component in enumerate(self.inner_components[near_first:near_last], near_first):
+            preview_box = round(document_component.preview_tier().value * device_pixel_ratio)
+
+            # Shown or requested for the current tile size and display scale
+            if document_component.preview_box == preview_box:
+                continue
+
+            document_component.preview_box = preview_box
+            self.previewed_components.add(document_component)
+
+            is_visible = visible_first <= index < visible_last
+            self.show_preview_page(document_component, document_component.preview_page_index,
+                                   PreviewManager.visible_priority if is_visible else PreviewManager.default_priority)
+
+        # Requested earlier as near, now on screen
+        PreviewManager.prioritize(document_component.document_item
+                                  for document_component in self.inner_components[visible_first:visible_last])
+
+    def preview_index_range(self, number_of_screens: float) -> Tuple[int, int]:
+        """
+        Indexes (end excluded) of components within `number_of_screens` viewport heights around the viewport.
+        """
+
+        column_count = max(1, self.grid_column_count if self.display_mode == DisplayMode.GRID
+                           else self.list_column_count)
+        viewport_height = self.scroll_area.viewport().height()
+        scroll_value = self.scroll_area.verticalScrollBar().value()
+
+        # All rows have the height of the first one, before the first layout pass it is the minimal height
+        first_component = self.inner_components[0]
+        row_height = max(first_component.height(), first_component.minimumHeight(), 1) \
+            + self.container_layout.verticalSpacing()
+        top_margin = self.container_layout.contentsMargins().top()
+
+        top = scroll_value - number_of_screens * viewport_height - top_margin
+        bottom = scroll_value + (1 + number_of_screens) * viewport_height - top_margin
+
+        first_row = max(0, int(top) // row_height)
+        last_row = max(0, int(bottom) // row_height)
+
+        return (min(self.number_of_inner_components, first_row * column_count),
+                min(self.number_of_inner_components, (last_row + 1) * column_count))
+
+    def show_preview_page(self, document_component: DocumentComponent, page_index: int, priority: int):
+        """
+        Show a page from the memory cache, or request it. The current preview is shown until the page arrives.
+        """
+
+        device_pixel_ratio = self.devicePixelRatioF()
+        document_path = document_component.document_item.document_path
+        preview_box = document_component.preview_box
+
+        pixmap = ThumbnailMemoryCacheManager.get(document_path, preview_box, preview_box, page_index) \
+            or self.derive_preview(document_path, preview_box, page_index, device_pixel_ratio)
+
+        if pixmap is not None:
+            document_component.set_preview(pixmap, device_pixel_ratio)
+        else:
+            PreviewManager.request(document_component.document_item, preview_box, preview_box, priority, page_index)
+
+    @staticmethod
+    def derive_preview(document_path: str, preview_box: int, page_index: int,
+                       device_pixel_ratio: float) -> Optional[QPixmap]:
+        """
+        Downsample a cached preview of a larger tier, so a smaller tile or display scale needs no render.
+        """
+
+        larger_pixmap = ThumbnailMemoryCacheManager.get_larger(document_path, preview_box, preview_box, page_index)
+
+        if larger_pixmap is None:
+            return None
+
+        pixmap = larger_pixmap.scaled(preview_box, preview_box, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        pixmap.setDevicePixelRatio(device_pixel_ratio)
+        ThumbnailMemoryCacheManager.put(document_path, preview_box, preview_box, pixmap, page_index)
+
+        return pixmap
+
+    def on_document_preview_scrubbed(self, document_component: DocumentComponent, page_index: int):
+        """
+        Show another page of a hovered tile and prefetch its neighbours, requests of pages left behind are dropped.
+        """
+
+        if document_component not in self.previewed_components or document_component.preview_box is None:
+            return
+
+        document_component.preview_page_index = page_index
+        self.show_preview_page(document_component, page_index, PreviewManager.visible_priority)
+
+        preview_box = document_component.preview_box
+        document_path = document_component.document_item.document_path
+        number_of_pages = document_component.document_item.document_page_count
+
+        neighbour_page_indexes = [neighbour_page_index
+                                  for neighbour_page_index in range(page_index - self.preview_scrub_prefetch_pages,
+                                                                    page_index + self.preview_scrub_prefetch_pages + 1)
+                                  if 0 <= neighbour_page_index < number_of_pages]
+
+        PreviewManager.cancel(document_component.document_item, [0] + neighbour_page_indexes)
+
+        for neighbour_page_index in neighbour_page_indexes:
+            if neighbour_page_index != page_index and not ThumbnailMemoryCacheManager.contains(
+                    document_path, preview_box, preview_box, neighbour_page_index):
+                PreviewManager.request(document_component.document_item, preview_box, preview_box,
+                                       PreviewManager.default_priority, neighbour_page_index)
+
+    def release_preview(self, document_component: DocumentComponent):
+        PreviewManager.cancel(document_component.document_item)
+        document_component.clear_preview()
+        self.previewed_components.discard(document_component)
+
+    def on_preview_rendered(self, document_item: DocumentItem, qimage: QImage, page_index: int,
+                            limit_width: int, limit_height: int):
+        device_pixel_ratio = self.devicePixelRatioF()
+
+        pixmap = QPixmap.fromImage(qimage)
+        pixmap.setDevicePixelRatio(device_pixel_ratio)
+        ThumbnailMemoryCacheManager.put(document_item.document_path, limit_width, limit_height, pixmap, page_index)
+
+        document_component = self.document_components.get(document_item.document_id, None)
+
+        # Released, asked for another tier or scrubbed to another page while it was rendered
+        if document_component in self.previewed_components and document_component.preview_box == limit_width \
+                and document_component.preview_page_index == page_index:
+            document_component.set_preview(pixmap, device_pixel_ratio)
+
+    def on_preview_failed(self, document_item: DocumentItem, page_index: int, error_message: str):
+        document_component = self.document_components.get(document_item.document_id, None)
+
+        if document_component in self.previewed_components and document_component.preview_page_index == page_index:
+            document_component.set_preview_failed(error_message)
+
+    # </editor-fold>
+
+    # <editor-fold desc="[+] Selection">
+
+    def on_document_pressed(self, document_component: DocumentComponent, modifiers: Qt.KeyboardModifiers):
+        document_id = document_component.document_item.document_id
+
+        self.restyle_selection(self.document_selection.press(document_id, bool(modifiers & Qt.ControlModifier),
+                                                             bool(modifiers & Qt.ShiftModifier)))
+
+        document_component.number_of_dragged_documents = len(self.document_selection) \
+            if document_id in self.document_selection else 1
+
+    def on_document_clicked(self, document_component: DocumentComponent, modifiers: Qt.KeyboardModifiers):
+        self.restyle_selection(self.document_selection.click(document_component.document_item.document_id,
+                                                             bool(modifiers & Qt.ControlModifier),
+                                                             bool(modifiers & Qt.ShiftModifier)))
+
+    def restyle_selection(self, document_ids: Set[int]):
+        for document_id in document_ids:
+            document_component = self.document_components.get(document_id, None)
+
+            if document_component is not None:
+                StyleManager.change_component_state(document_component, self.resting_state(document_component))
+
+    def resting_state(self, document_component: DocumentComponent) -> ComponentState:
+        return ComponentState.SELECTED if document_component.document_item.document_id in self.document_selection \
+            else ComponentState.DEFAULT
+
+    # </editor-fold>
+
+    # <editor-fold desc="[+] Drag and drop">
+
+    def dragged_inner_component_indexes(self, source_component: DocumentComponent) -> List[int]:
+        # A selected document takes the whole selection along
+        if source_component.document_item.document_id not in self.document_selection:
+            return super().dragged_inner_component_indexes(source_component)
+
+        return sorted(map(self.document_collection.index, self.document_selection.selected_ids))
 
     def on_drag_enter_event_competed(self):
         StyleManager.change_component_state(self.last_reached_inner_component, ComponentState.HOVERED)
 
     def on_drag_leave_event_competed(self):
-        StyleManager.change_component_state(self.last_reached_inner_component, ComponentState.DEFAULT)
+        StyleManager.change_component_state(self.last_reached_inner_component,
+                                            self.resting_state(self.last_reached_inner_component))
 
     def on_drag_move_event_competed(self, previous_component):
-        StyleManager.change_component_state(previous_component, ComponentState.DEFAULT)
+        StyleManager.change_component_state(previous_component, self.resting_state(previous_component))
         StyleManager.change_component_state(self.last_reached_inner_component, ComponentState.HOVERED)
 
-    def on_drop_event_competed(self, source_index: int, destination_index: int):
-        StyleManager.change_component_state(self.last_reached_inner_component, ComponentState.DEFAULT)
+    def move_inner_components(self, source_indexes: List[int], destination_index: int) -> None:
+        # The viewmodel moves the documents in the collection, components only change their cells
+        document_ids = [self.document_collection[index].document_id for index in source_indexes]
 
-        if destination_index == source_index:
-            return
+        MessageManager.send(MessageType.MERGE_VIEW__DOCUMENTS_REORDERED, document_ids=document_ids,
+                            destination_index=destination_index)
 
-        if destination_index < source_index:
-            destination_index, source_index = source_index, destination_index
+        self.relayout_inner_components(*self.moved_index_range(source_indexes, destination_index))
+
+    def on_drop_event_competed(self, source_indexes: List[int], destination_index: int):
+        StyleManager.change_component_state(self.last_reached_inner_component,
+                                            self.resting_state(self.last_reached_inner_component))
+
+        if not source_indexes:
+            return
 
-        for i in range(source_index, destination_index + 1):
-            w: DocumentComponent = self.inner_components[i]
-            w.update_document_index(i)
+        self.update_document_indexes(self.moved_index_range(source_indexes, destination_index)[0])
+        self.schedule_preview_update()
 
-        MessageManager.send(MessageType.MERGE_VIEW__DOCUMENTS_REORDERED, source_index, destination_index)
\ No newline at end of file
+    # </editor-fold>
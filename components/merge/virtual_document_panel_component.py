@@ -0,0 +1,353 @@
+from typing import Dict, List, Optional, Set, Tuple
+
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtGui import QImage, QPixmap
+
+from components.core.virtual_panel_component import VirtualPanelComponent
+from components.merge.document_component import DocumentComponent
+from components.merge.document_panel_component import DocumentPanelComponent
+from enums.component_state import ComponentState
+from enums.display_mode import DisplayMode
+from enums.message_type import MessageType
+from enums.thumbnail_tier import ThumbnailTier
+from managers.message_manager import MessageManager
+from managers.preview_manager import PreviewManager
+from managers.style_manager import StyleManager
+from managers.thumbnail_memory_cache_manager import ThumbnailMemoryCacheManager
+from models.document_collection import DocumentCollection
+from models.document_selection import DocumentSelection
+from viewmodels.merge_viewmodel import DocumentItem
+
+
+class VirtualDocumentPanelComponent(VirtualPanelComponent):
+    """
+    Drop-in replacement of `DocumentPanelComponent` for large batches, components exist only around the viewport.
+
+    Previews are tracked per item rather than per component, so they are requested ahead for items that have no
+    component yet and shown from the memory cache once a component is bound.
+    """
+
+    def __init__(self, document_collection: DocumentCollection):
+        super().__init__(DocumentComponent)
+
+        # Order of documents, owned by the viewmodel
+        self.items = document_collection
+
+        self.setProperty("class", "document__panel")
+        self.component_container.setProperty("class", "document_panel__container")
+        self.scroll_area.setProperty("class", "document_panel__scroll_area")
+
+        MessageManager.subscribe(MessageType.MERGE_VIEWMODEL__DOCUMENT_REMOVED, self, self.update_document_indexes)
+        MessageManager.subscribe(MessageType.MERGE_VIEWMODEL__DOCUMENT_PREFLIGHTED, self, self.on_document_preflighted)
+        MessageManager.subscribe(MessageType.DOCUMENT_PREVIEW_SCRUBBED, self, self.on_document_preview_scrubbed)
+        MessageManager.subscribe(MessageType.DOCUMENT_PRESSED, self, self.on_document_pressed)
+        MessageManager.subscribe(MessageType.DOCUMENT_CLICKED, self, self.on_document_clicked)
+
+        # Selected documents are dragged together, also those without a component
+        self.document_selection = DocumentSelection(document_collection)
+
+        # Items whose preview is shown or requested, with the box in device pixels it was made for
+        self.preview_boxes: Dict[DocumentItem, int] = dict()
+        PreviewManager.preview_signals().rendered.connect(self.on_preview_rendered)
+        PreviewManager.preview_signals().failed.connect(self.on_preview_failed)
+        self.scroll_area.verticalScrollBar().valueChanged.connect(self.schedule_preview_update)
+
+        # A batch of changes is handled once
+        self.preview_update_timer = QTimer(self)
+        self.preview_update_timer.setSingleShot(True)
+        self.preview_update_timer.timeout.connect(self.update_previews)
+
+        # Viewport heights above and below the viewport where previews are prepared, and where they are kept
+        self.preview_prefetch_screens = 1
+        self.preview_release_screens = 3
+        self.is_screen_connected = False
+        # Pages before and after a scrubbed page that are rendered ahead
+        self.preview_scrub_prefetch_pages = 2
+
+    def add_document_component(self, document_item: DocumentItem):
+        self.add_document_components([document_item])
+
+    def add_document_components(self, document_items: List[DocumentItem]):
+        # Already in the collection
+        self.refresh_items(self.number_of_inner_components - len(document_items))
+        self.schedule_preview_update()
+
+    def remove_document_component(self, document_component: DocumentComponent):
+        self.release_preview(document_component.document_item)
+        self.document_selection.discard(document_component.document_item.document_id)
+        MessageManager.send(MessageType.MERGE_VIEW__DOCUMENT_REMOVED,
+                            document_id=document_component.document_item.document_id)
+        self.schedule_preview_update()
+
+    def update_document_indexes(self, starting_index: int = 0):
+        # Labels exist only for bound items, they are bound again
+        self.refresh_items(starting_index)
+
+    def on_document_preflighted(self, document_item: DocumentItem):
+        document_component = self.find_component(document_item)
+
+        if document_component is not None:
+            document_component.apply_preflight()
+
+    # <editor-fold desc="[+] Binding">
+
+    def bind_inner_component(self, document_component: DocumentComponent, document_item: DocumentItem, index: int):
+        document_component.bind(document_item, index)
+
+        if document_item.document_id in self.document_selection:
+            StyleManager.change_component_state(document_component, ComponentState.SELECTED)
+
+        preview_box = self.preview_boxes.get(document_item, None)
+
+        if preview_box is not None:
+            document_component.preview_box = preview_box
+            self.show_preview_page(document_component, 0, PreviewManager.visible_priority)
+
+    def component_item(self, document_component: DocumentComponent) -> DocumentItem:
+        return document_component.document_item
+
+    def item_index(self, document_item: DocumentItem) -> int:
+        return self.items.index(document_item.document_id)
+
+    def on_inner_component_released(self, document_component: DocumentComponent):
+        # Requests of scrubbed pages are dropped, the first page is still wanted while the item is near
+        PreviewManager.cancel(document_component.document_item, [0])
+        document_component.clear_preview()
+
+    # </editor-fold>
+
+    # <editor-fold desc="[+] Previews">
+
+    def rearrange_content(self, should_rearrange_inner_components: bool = True):
+        super().rearrange_content(should_rearrange_inner_components)
+        self.schedule_preview_update()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.schedule_preview_update()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+
+        # Display scale changes when the window moves to another screen
+        if not self.is_screen_connected and self.window().windowHandle() is not None:
+            self.window().windowHandle().screenChanged.connect(self.schedule_preview_update)
+            self.is_screen_connected = True
+
+    def schedule_preview_update(self):
+        self.preview_update_timer.start(0)
+
+    def update_previews(self):
+        """
+        Request previews of items near the viewport and release previews of items that went far off-screen.
+        """
+
+        if self.display_mode != DisplayMode.GRID or not self.items:
+            for document_item in list(self.preview_boxes):
+                self.release_preview(document_item)
+
+            return
+
+        visible_first, visible_last = self.preview_index_range(0)
+        near_first, near_last = self.preview_index_range(self.preview_prefetch_screens)
+        kept_first, kept_last = self.preview_index_range(self.preview_release_screens)
+
+        kept_items = set(self.items[kept_first:kept_last])
+
+        for document_item in list(self.preview_boxes):
+            if document_item not in kept_items:
+                self.release_preview(document_item)
+
+        preview_box = round(self.preview_tier().value * self.devicePixelRatioF())
+
+        for index, document_item in enumerate(self.items[near_first:near_last], start=near_first):
+            # Shown or requested for the current tile size and display scale
+            if self.preview_boxes.get(document_item, None) == preview_box:
+                continue
+
+            self.preview_boxes[document_item] = preview_box
+
+            is_visible = visible_first <= index < visible_last
+            priority = PreviewManager.visible_priority if is_visible else PreviewManager.default_priority
+            document_component = self.bound_components.get(index, None)
+
+            if document_component is not None:
+                document_component.preview_box = preview_box
+                self.show_preview_page(document_component, document_component.preview_page_index, priority)
+            elif not ThumbnailMemoryCacheManager.contains(document_item.document_path, preview_box, preview_box):
+                PreviewManager.request(document_item, preview_box, preview_box, priority)
+
+        # Requested earlier as near, now on screen
+        PreviewManager.prioritize(self.items[visible_first:visible_last])
+
+    def preview_index_range(self, number_of_screens: float) -> Tuple[int, int]:
+        """
+        Indexes (end excluded) of items within `number_of_screens` viewport heights around the viewport.
+        """
+
+        row_pitch = self.row_height + self.spacing
+        number_of_rows = -int(-number_of_screens * self.scroll_area.viewport().height() // row_pitch)
+
+        return self.visible_index_range(number_of_rows)
+
+    def preview_tier(self) -> ThumbnailTier:
+        # All tiles have the same size
+        for document_component in self.bound_components.values():
+            return document_component.preview_tier()
+
+        return ThumbnailTier.MEDIUM
+
+    def show_preview_page(self, document_component: DocumentComponent, page_index: int, priority: int):
+        """
+        Show a page from the memory cache, or request it. The current preview is shown until the page arrives.
+        """
+
+        device_pixel_ratio = self.devicePixelRatioF()
+        document_path = document_component.document_item.document_path
+        preview_box = document_component.preview_box
+
+        pixmap = ThumbnailMemoryCacheManager.get(document_path, preview_box, preview_box, page_index) \
+            or DocumentPanelComponent.derive_preview(document_path, preview_box, page_index, device_pixel_ratio)
+
+        if pixmap is not None:
+            document_component.set_preview(pixmap, device_pixel_ratio)
+        else:
+            PreviewManager.request(document_component.document_item, preview_box, preview_box, priority, page_index)
+
+    def on_document_preview_scrubbed(self, document_component: DocumentComponent, page_index: int):
+        """
+        Show another page of a hovered tile and prefetch its neighbours, requests of pages left behind are dropped.
+        """
+
+        if document_component not in self.bound_components.values() or document_component.preview_box is None:
+            return
+
+        document_component.preview_page_index = page_index
+        self.show_preview_page(document_component, page_index, PreviewManager.visible_priority)
+
+        preview_box = document_component.preview_box
+        document_path = document_component.document_item.document_path
+        number_of_pages = document_component.document_item.document_page_count
+
+        neighbour_page_indexes = [neighbour_page_index
+                                  for neighbour_page_index in range(page_index - self.preview_scrub_prefetch_pages,
+                                                                    page_index + self.preview_scrub_prefetch_pages + 1)
+                                  if 0 <= neighbour_page_index < number_of_pages]
+
+        PreviewManager.cancel(document_component.document_item, [0] + neighbour_page_indexes)
+
+        for neighbour_page_index in neighbour_page_indexes:
+            if neighbour_page_index != page_index and not ThumbnailMemoryCacheManager.contains(
+                    document_path, preview_box, preview_box, neighbour_page_index):
+                PreviewManager.request(document_component.document_item, preview_box, preview_box,
+                                       PreviewManager.default_priority, neighbour_page_index)
+
+    def release_preview(self, document_item: DocumentItem):
+        PreviewManager.cancel(document_item)
+        self.preview_boxes.pop(document_item, None)
+
+        document_component = self.find_component(document_item)
+
+        if document_component is not None:
+            document_component.clear_preview()
+
+    def on_preview_rendered(self, document_item: DocumentItem, qimage: QImage, page_index: int,
+                            limit_width: int, limit_height: int):
+        device_pixel_ratio = self.devicePixelRatioF()
+
+        pixmap = QPixmap.fromImage(qimage)
+        pixmap.setDevicePixelRatio(device_pixel_ratio)
+        ThumbnailMemoryCacheManager.put(document_item.document_path, limit_width, limit_height, pixmap, page_index)
+
+        document_component = self.find_component(document_item)
+
+        # Scrolled away, asked for another tier or scrubbed to another page while it was rendered
+        if document_component is not None and document_component.preview_box == limit_width \
+                and document_component.preview_page_index == page_index:
+            document_component.set_preview(pixmap, device_pixel_ratio)
+
+    def on_preview_failed(self, document_item: DocumentItem, page_index: int, error_message: str):
+        document_component = self.find_component(document_item)
+
+        if document_component is not None and document_component.preview_box is not None \
+                and document_component.preview_page_index == page_index:
+            document_component.set_preview_failed(error_message)
+
+    # </editor-fold>
+
+    # <editor-fold desc="[+] Selection">
+
+    def on_document_pressed(self, document_component: DocumentComponent, modifiers: Qt.KeyboardModifiers):
+        document_id = document_component.document_item.document_id
+
+        self.restyle_selection(self.document_selection.press(document_id, bool(modifiers & Qt.ControlModifier),
+                                                             bool(modifiers & Qt.ShiftModifier)))
+
+        document_component.number_of_dragged_documents = len(self.document_selection) \
+            if document_id in self.document_selection else 1
+
+    def on_document_clicked(self, document_component: DocumentComponent, modifiers: Qt.KeyboardModifiers):
+        self.restyle_selection(self.document_selection.click(document_component.document_item.document_id,
+                                                             bool(modifiers & Qt.ControlModifier),
+                                                             bool(modifiers & Qt.ShiftModifier)))
+
+    def restyle_selection(self, document_ids: Set[int]):
+        # Only bound components show a state, the others get it when they are bound
+        for document_component in self.bound_components.values():
+            if document_component.document_item.document_id in document_ids:
+                StyleManager.change_component_state(document_component, self.resting_state(document_component))
+
+    def resting_state(self, document_component: DocumentComponent) -> ComponentState:
+        return ComponentState.SELECTED if document_component.document_item.document_id in self.document_selection \
+            else ComponentState.DEFAULT
+
+    # </editor-fold>
+
+    # <editor-fold desc="[+] Drag and drop">
+
+    def dragged_item_indexes(self, document_item: DocumentItem) -> List[int]:
+        # A selected document takes the whole selection along
+        if document_item.document_id not in self.document_selection:
+            return super().dragged_item_indexes(document_item)
+
+        return sorted(map(self.items.index, self.document_selection.selected_ids))
+
+    def change_component_state(self, index: int, component_state: Optional[ComponentState] = None):
+        document_component = self.bound_components.get(index, None)
+
+        if document_component is None:
+            return
+
+        if component_state is None:
+            component_state = self.resting_state(document_component)
+
+        StyleManager.change_component_state(document_component, component_state)
+
+    def on_drag_enter_event_competed(self):
+        self.change_component_state(self.last_reached_index, ComponentState.HOVERED)
+
+    def on_drag_leave_event_competed(self):
+        self.change_component_state(self.last_reached_index)
+
+    def on_drag_move_event_competed(self, previous_index: int):
+        self.change_component_state(previous_index)
+        self.change_component_state(self.last_reached_index, ComponentState.HOVERED)
+
+    def on_drop_event_competed(self, source_indexes: List[int], destination_index: int):
+        self.change_component_state(self.last_reached_index)
+
+        if not source_indexes:
+            return
+
+        if self.dragged_item.document_id in self.document_selection:
+            document_ids = self.document_selection.ordered_ids()
+        else:
+            document_ids = [self.dragged_item.document_id]
+
+        MessageManager.send(MessageType.MERGE_VIEW__DOCUMENTS_REORDERED, document_ids=document_ids,
+                            destination_index=destination_index)
+
+        self.refresh_items(min(source_indexes[0], destination_index))
+        self.schedule_preview_update()
+
+    # </editor-fold>
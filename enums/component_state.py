@@ -7,5 +7,7 @@ class ComponentState(Enum):
     PRESSED = 2
     CHECKED = 3
     UNCHECKED = 4
+    INVALID = 5
+    SELECTED = 6
     CHECKED_DEFAULT = 11
     CHECKED_HOVERED = 11
\ No newline at end of file
@@ -16,5 +16,16 @@ class MessageType(Enum):
     DOCUMENT_REMOVE_CLICKED = 9
     ACTION_MERGE_CLICKED = 10
     MERGE_VIEW__DOCUMENTS_REORDERED = 11
+    ACTION_CANCEL_CLICKED = 12
+    MERGE_VIEWMODEL__MERGE_STARTED = 13
+    MERGE_VIEWMODEL__MERGE_PROGRESS = 14
+    MERGE_VIEWMODEL__MERGE_FINISHED = 15
+    MERGE_VIEWMODEL__MERGE_FAILED = 16
+    MERGE_VIEWMODEL__MERGE_CANCELLED = 17
+    MERGE_VIEWMODEL__DOCUMENT_PREFLIGHTED = 18
+    DOCUMENT_PREVIEW_SCRUBBED = 19
+    DOCUMENT_PRESSED = 20
+    DOCUMENT_CLICKED = 21
+    MERGE_VIEWMODEL__MEMORY_CHECKED = 22
 
 
@@ -0,0 +1,8 @@
+from enum import Enum
+
+
+class ThumbnailTier(Enum):
+    # Side of the square box in logical pixels, multiplied by the device pixel ratio when rendered
+    SMALL = 64
+    MEDIUM = 112
+    LARGE = 224
@@ -0,0 +1,35 @@
+from abc import abstractmethod, ABCMeta
+
+
+class IMergeBackend(metaclass=ABCMeta):
+    """
+    An interface for PDF libraries that do the actual copying for `MergeEngine`.
+
+    Unlike other interfaces it does not combine with a Qt metaclass, so backends can be used without Qt.
+    """
+
+    @property
+    @abstractmethod
+    def backend_name(self) -> str:
+        """
+        Name used to pick the backend in jobs and manifests.
+        """
+        pass
+
+    @property
+    @abstractmethod
+    def is_streaming_supported(self) -> bool:
+        """
+        Whether the backend keeps only one window of a streaming job in memory.
+        """
+        pass
+
+    @abstractmethod
+    def merge(self, merge_engine, merge_job, part_path: str) -> None:
+        """
+        Write the merged output of `merge_job` to `part_path`.
+
+        Implementations call `merge_engine.check_cancelled()` and `merge_engine.report_page(...)` while copying
+        and may borrow inputs from `merge_engine.document_pool`.
+        """
+        pass
@@ -1,17 +1,28 @@
+import multiprocessing
 import sys
 
 from PyQt5.QtWidgets import QApplication
 
 from components.windows.main_window import MainWindow
+from managers.preview_manager import PreviewManager
+from managers.rasterizer_pool_manager import RasterizerPoolManager
 
 
 def main():
+    # Parallel merges and preview rasterizers spawn worker processes, required for frozen executables
+    multiprocessing.freeze_support()
+
     application = QApplication(sys.argv)
 
     main_window = MainWindow()
     main_window.show()
 
-    sys.exit(application.exec_())
+    exit_code = application.exec_()
+
+    PreviewManager.shutdown()
+    RasterizerPoolManager.shutdown()
+
+    sys.exit(exit_code)
 
 
 if __name__ == "__main__":
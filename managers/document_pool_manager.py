@@ -0,0 +1,148 @@
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+
+import fitz
+
+
+# Path, modification time and size of the file
+DocumentKey = Tuple[str, int, int]
+
+
+class PooledDocument:
+    def __init__(self, document_key: DocumentKey):
+        self.document_key = document_key
+        # Opened by the first lease, under `lock`
+        self.document: Optional[fitz.Document] = None
+        self.lease_count = 0
+        # Held while the document is opened or used, a handle is used by one thread at a time
+        self.lock = threading.RLock()
+
+
+class DocumentPoolManager:
+    """
+    Process-wide pool of open `fitz.Document` handles shared by previews, metadata readers and the merge engine.
+
+    Handles are keyed by path, modification time and size, so a file changed on disk is parsed again. Least recently
+    used handles are closed once more than `max_open_documents` are open.
+
+    The pool lock only guards the bookkeeping. A lease holds the lock of its document, so a handle is used by one
+    thread at a time while other documents are opened and used in parallel. PyMuPDF calls keep the GIL, so calls
+    on different documents never overlap.
+    """
+
+    # Cap on open handles, leased handles are never closed
+    max_open_documents: int = 32
+
+    lock = threading.RLock()
+    documents: Dict[DocumentKey, PooledDocument] = OrderedDict()
+
+    # Counters
+    number_of_hits: int = 0
+    number_of_misses: int = 0
+    number_of_evictions: int = 0
+
+    @classmethod
+    @contextmanager
+    def lease(cls, document_path: str) -> Iterator[fitz.Document]:
+        """
+        Borrow an open document, opening it on first use.
+
+        The document must not be closed or kept after the `with` block.
+        """
+
+        with cls.lock:
+            pooled_document = cls.acquire(document_path)
+
+        try:
+            with pooled_document.lock:
+                # Parsed outside of the pool lock, other documents are not held up
+                if pooled_document.document is None:
+                    pooled_document.document = fitz.open(document_path)
+
+                yield pooled_document.document
+        finally:
+            with cls.lock:
+                pooled_document.lease_count -= 1
+
+                # Could not be opened, the next lease tries again
+                if pooled_document.document is None and pooled_document.lease_count == 0 \
+                        and cls.documents.get(pooled_document.document_key, None) is pooled_document:
+                    del cls.documents[pooled_document.document_key]
+
+                cls.evict()
+
+    @classmethod
+    def acquire(cls, document_path: str) -> PooledDocument:
+        document_key = cls.make_key(document_path)
+        pooled_document = cls.documents.get(document_key, None)
+
+        if pooled_document is not None:
+            cls.number_of_hits += 1
+            cls.documents.move_to_end(document_key)
+        else:
+            cls.number_of_misses += 1
+
+            # Drop outdated versions of the file
+            cls.discard(document_path)
+
+            pooled_document = PooledDocument(document_key)
+            cls.documents[document_key] = pooled_document
+
+        pooled_document.lease_count += 1
+
+        return pooled_document
+
+    @staticmethod
+    def make_key(document_path: str) -> DocumentKey:
+        absolute_path = os.path.abspath(document_path)
+        stat_result = os.stat(absolute_path)
+
+        return absolute_path, stat_result.st_mtime_ns, stat_result.st_size
+
+    @classmethod
+    def evict(cls) -> None:
+        """
+        Close least recently used handles that are not leased until the pool fits the cap.
+        """
+
+        with cls.lock:
+            for document_key in list(cls.documents.keys()):
+                if len(cls.documents) <= cls.max_open_documents:
+                    break
+
+                if cls.documents[document_key].lease_count == 0:
+                    cls.close(cls.documents.pop(document_key))
+                    cls.number_of_evictions += 1
+
+    @classmethod
+    def discard(cls, document_path: str) -> None:
+        """
+        Close all idle handles of a path, for example after the document has been removed.
+        """
+
+        absolute_path = os.path.abspath(document_path)
+
+        with cls.lock:
+            for document_key in [key for key in cls.documents.keys() if key[0] == absolute_path]:
+                if cls.documents[document_key].lease_count == 0:
+                    cls.close(cls.documents.pop(document_key))
+
+    @classmethod
+    def clear(cls) -> None:
+        with cls.lock:
+            for document_key in list(cls.documents.keys()):
+                if cls.documents[document_key].lease_count == 0:
+                    cls.close(cls.documents.pop(document_key))
+
+    @staticmethod
+    def close(pooled_document: PooledDocument) -> None:
+        # Idle, so no lease holds its lock
+        if pooled_document.document is not None:
+            pooled_document.document.close()
+
+    @classmethod
+    def number_of_open_documents(cls) -> int:
+        return len(cls.documents)
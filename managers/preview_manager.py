@@ -0,0 +1,156 @@
+import heapq
+import itertools
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from PyQt5.QtCore import QThreadPool
+
+from managers.rasterizer_pool_manager import RasterizerPoolManager
+from workers.preview_worker import PreviewSignals, PreviewTask
+
+
+# Document item, page index, limit width, limit height
+PreviewRequest = Tuple[object, int, int, int]
+# Document item, page index
+PageKey = Tuple[object, int]
+
+
+class PreviewManager:
+    """
+    Renders document previews on a background `QThreadPool`, most urgent first.
+
+    Every request has a priority (lower is sooner), requests of documents on screen are raised with `prioritize`
+    while they wait. Results arrive through `preview_signals()` on the GUI thread.
+    """
+
+    visible_priority: int = 0
+    default_priority: int = 1
+
+    # In process, PyMuPDF calls keep the GIL and a second thread only overlaps scaling and conversion.
+    # With rasterizer processes, a thread waits for each of them.
+    max_thread_count: int = 2
+
+    lock = threading.Lock()
+    thread_pool: Optional[QThreadPool] = None
+    signals: Optional[PreviewSignals] = None
+
+    # Heap of (priority, sequence, request), entries replaced by a newer priority are skipped when taken
+    queue: List[Tuple[int, int, PreviewRequest]] = list()
+    # Priority, sequence, limit width and limit height of the latest request of each page, by document item, so
+    # cancelling a document does not scan the requests of all others
+    pending: Dict[object, Dict[int, Tuple[int, int, int, int]]] = dict()
+    sequence = itertools.count()
+
+    @classmethod
+    def preview_signals(cls) -> PreviewSignals:
+        """
+        Emitter of finished previews, created on first use. Must be first called from the GUI thread.
+        """
+
+        if cls.signals is None:
+            cls.signals = PreviewSignals()
+
+        return cls.signals
+
+    @classmethod
+    def request(cls, document_item, limit_width: int = 112, limit_height: int = 112,
+                priority: int = default_priority, page_index: int = 0) -> None:
+        """
+        Queue a preview of a page of a document, a pending request of the same page is replaced.
+        """
+
+        with cls.lock:
+            is_pending = page_index in cls.pending.get(document_item, ())
+            cls.push((document_item, page_index), limit_width, limit_height, priority)
+
+        if not is_pending:
+            cls.get_thread_pool().start(PreviewTask(cls, cls.preview_signals()))
+
+    @classmethod
+    def prioritize(cls, document_items: Iterable, priority: int = visible_priority) -> None:
+        """
+        Raise pending requests of the first pages of `document_items` to `priority`, other requests keep theirs.
+        """
+
+        with cls.lock:
+            for document_item in document_items:
+                pending_request = cls.pending.get(document_item, {}).get(0, None)
+
+                if pending_request is not None and pending_request[0] > priority:
+                    cls.push((document_item, 0), pending_request[2], pending_request[3], priority)
+
+    @classmethod
+    def cancel(cls, document_item, kept_page_indexes: Iterable[int] = ()) -> None:
+        """
+        Drop pending requests of all pages of a document but `kept_page_indexes`.
+        """
+
+        kept_page_indexes = set(kept_page_indexes)
+
+        with cls.lock:
+            pending_pages = cls.pending.pop(document_item, None)
+
+            if pending_pages is None:
+                return
+
+            # Usually only a few pages are kept, rebuilt rather than deleted from
+            kept_pages = {page_index: pending_request for page_index, pending_request in pending_pages.items()
+                          if page_index in kept_page_indexes}
+
+            if kept_pages:
+                cls.pending[document_item] = kept_pages
+
+    @classmethod
+    def clear(cls) -> None:
+        with cls.lock:
+            cls.pending.clear()
+            cls.queue.clear()
+
+    @classmethod
+    def shutdown(cls) -> None:
+        """
+        Drop pending requests and wait for renders in progress, their signals must not outlive the application.
+        """
+
+        cls.clear()
+
+        if cls.thread_pool is not None:
+            cls.thread_pool.waitForDone()
+
+    @classmethod
+    def take_next_request(cls) -> Optional[PreviewRequest]:
+        """
+        Remove and return the most urgent pending request, called by tasks on pool threads.
+        """
+
+        with cls.lock:
+            while cls.queue:
+                priority, sequence, preview_request = heapq.heappop(cls.queue)
+                document_item, page_index = preview_request[:2]
+                pending_pages = cls.pending.get(document_item, None)
+                pending_request = pending_pages.get(page_index, None) if pending_pages is not None else None
+
+                if pending_request is not None and pending_request[1] == sequence:
+                    del pending_pages[page_index]
+
+                    if not pending_pages:
+                        del cls.pending[document_item]
+
+                    return preview_request
+
+        return None
+
+    @classmethod
+    def push(cls, page_key: PageKey, limit_width: int, limit_height: int, priority: int) -> None:
+        sequence = next(cls.sequence)
+        cls.pending.setdefault(page_key[0], dict())[page_key[1]] = (priority, sequence, limit_width, limit_height)
+        heapq.heappush(cls.queue, (priority, sequence, page_key + (limit_width, limit_height)))
+
+    @classmethod
+    def get_thread_pool(cls) -> QThreadPool:
+        if cls.thread_pool is None:
+            cls.thread_pool = QThreadPool()
+            cls.thread_pool.setMaxThreadCount(max(cls.max_thread_count, RasterizerPoolManager.number_of_processes
+                                                  if RasterizerPoolManager.is_enabled else 0))
+
+        return cls.thread_pool
@@ -0,0 +1,127 @@
+import multiprocessing
+import os
+import threading
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, List, Optional
+
+from managers.document_pool_manager import DocumentPoolManager
+from models.thumbnail_renderer import Thumbnail, render_thumbnail, render_thumbnail_to_shared_memory
+
+
+class RasterizerPoolManager:
+    """
+    Renders thumbnails in worker processes, so heavy pages use all cores and do not hold the GIL of the GUI process.
+
+    Pixels come back through shared memory blocks, only their names are pickled, and are wrapped by the calling process
+    without a copy. A block is reused once its thumbnail is gone, a new block costs more in page faults than the
+    pixels do to copy. Every worker process keeps its own `DocumentPoolManager`, so scrubbing a document does not
+    parse it again. Thumbnails are rendered in the calling process while the pool is disabled, on platforms without
+    POSIX shared memory and after the pool broke.
+    """
+
+    is_enabled: bool = os.name == "posix"
+    number_of_processes: int = max(1, min(4, (os.cpu_count() or 1) - 1))
+
+    lock = threading.Lock()
+    executor: Optional[ProcessPoolExecutor] = None
+
+    # Shared memory blocks by name, and those not used by a thumbnail by capacity
+    blocks: Dict[str, SharedMemory] = dict()
+    free_blocks: Dict[int, List[SharedMemory]] = dict()
+
+    @classmethod
+    def render(cls, document_path: str, limit_width: int, limit_height: int, page_index: int = 0) -> Thumbnail:
+        """
+        Render a thumbnail, blocking the calling thread (not the GIL) until a worker process is done.
+        """
+
+        executor = cls.get_executor()
+
+        if executor is None:
+            return render_thumbnail(document_path, limit_width, limit_height, page_index,
+                                    document_pool=DocumentPoolManager)
+
+        capacity = cls.block_capacity(limit_width, limit_height)
+        shared_memory = cls.take_block(capacity)
+
+        try:
+            width, height, stride = executor.submit(render_thumbnail_to_shared_memory, document_path,
+                                                    shared_memory.name, limit_width, limit_height, page_index,
+                                                    DocumentPoolManager).result()
+        except BrokenProcessPool as e:
+            cls.give_back_block(capacity, shared_memory)
+            print(f"[!] Rasterizer processes stopped, rendering in process: {e}")
+            cls.is_enabled = False
+
+            return render_thumbnail(document_path, limit_width, limit_height, page_index,
+                                    document_pool=DocumentPoolManager)
+        except BaseException:
+            cls.give_back_block(capacity, shared_memory)
+            raise
+
+        thumbnail = Thumbnail(width, height, stride, shared_memory.buf, shared_memory)
+        # A QImage wrapping the samples keeps the thumbnail, the block is written again only after both are gone
+        weakref.finalize(thumbnail, cls.give_back_block, capacity, shared_memory)
+
+        return thumbnail
+
+    @classmethod
+    def get_executor(cls) -> Optional[ProcessPoolExecutor]:
+        with cls.lock:
+            if not cls.is_enabled:
+                return None
+
+            if cls.executor is None:
+                # Spawned, forking a process with Qt threads is not safe
+                cls.executor = ProcessPoolExecutor(cls.number_of_processes,
+                                                   mp_context=multiprocessing.get_context("spawn"))
+
+            return cls.executor
+
+    @classmethod
+    def shutdown(cls) -> None:
+        with cls.lock:
+            if cls.executor is not None:
+                cls.executor.shutdown(wait=True, cancel_futures=True)
+                cls.executor = None
+
+            # Mappings of thumbnails still alive stay valid, only the names are removed
+            for shared_memory in cls.blocks.values():
+                shared_memory.unlink()
+
+            cls.blocks.clear()
+            cls.free_blocks.clear()
+
+    # <editor-fold desc="[+] Blocks">
+
+    @staticmethod
+    def block_capacity(limit_width: int, limit_height: int) -> int:
+        # A pixel of rounding on each side, in powers of two so the boxes of a tier share blocks
+        return 1 << ((limit_width + 1) * (limit_height + 1) * 3 - 1).bit_length()
+
+    @classmethod
+    def take_block(cls, capacity: int) -> SharedMemory:
+        with cls.lock:
+            free_blocks = cls.free_blocks.get(capacity, None)
+
+            if free_blocks:
+                return free_blocks.pop()
+
+        shared_memory = SharedMemory(create=True, size=capacity)
+
+        with cls.lock:
+            cls.blocks[shared_memory.name] = shared_memory
+
+        return shared_memory
+
+    @classmethod
+    def give_back_block(cls, capacity: int, shared_memory: SharedMemory) -> None:
+        with cls.lock:
+            # Blocks unlinked by a shutdown in the meantime are not reused
+            if shared_memory.name in cls.blocks:
+                cls.free_blocks.setdefault(capacity, list()).append(shared_memory)
+
+    # </editor-fold>
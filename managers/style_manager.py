@@ -1,5 +1,5 @@
 import json
-from typing import Dict
+from typing import Dict, Tuple
 from xml.etree import ElementTree
 
 from PyQt5.QtCore import QByteArray
@@ -12,6 +12,9 @@ from managers.path_manager import PathManager
 
 class StyleManager:
     themes: Dict[str, Dict[str, str]] = {}
+    # Recolored icons by path and state, every checkbox and icon button of every document needs them
+    modified_svgs: Dict[Tuple[str, ComponentState], QByteArray] = {}
+
     @classmethod
     def load_themes(cls):
         with open("assets/json/themes.json", 'r') as f:
@@ -21,6 +24,8 @@ class StyleManager:
             #print(colors["example"])
             cls.themes = colors
 
+        cls.modified_svgs.clear()
+
     @classmethod
     def load_styles(cls, component: QWidget) -> None:
         styles = open(PathManager.path_to_stylesheet(), "r").read()
@@ -52,6 +57,16 @@ class StyleManager:
 
     @classmethod
     def modify_svg(cls, svg_path, component_state: ComponentState = ComponentState.DEFAULT) -> QByteArray:
+        svg_key = (str(svg_path), component_state)
+
+        if svg_key not in cls.modified_svgs:
+            cls.modified_svgs[svg_key] = cls.recolor_svg(svg_path, component_state)
+
+        # Implicitly shared, the copy costs nothing until it is modified
+        return QByteArray(cls.modified_svgs[svg_key])
+
+    @classmethod
+    def recolor_svg(cls, svg_path, component_state: ComponentState) -> QByteArray:
         tree = ElementTree.parse(svg_path)
         root = tree.getroot()
 
@@ -0,0 +1,375 @@
+import hashlib
+import os
+import struct
+import threading
+import time
+import uuid
+from typing import List, Optional, Tuple
+
+from models.thumbnail_renderer import Thumbnail, RENDERER_VERSION
+
+
+class ThumbnailCacheManager:
+    """
+    Persistent cache of rendered thumbnails, shared by all running instances of the application.
+
+    Entries are keyed by path, size and modification time of the document and by the render parameters, so a changed
+    file or renderer misses. Pixels are kept raw behind a small header, a hit needs no decoding. Files are written
+    aside and renamed, so readers never see partial entries. Once the cache grows over `max_cache_bytes`, least
+    recently used entries (by modification time, refreshed on every hit) are removed by whichever instance holds the
+    eviction lock.
+    """
+
+    is_enabled: bool = True
+    cache_directory: str = os.path.join(os.path.expanduser("~"), ".cache", "pdf_merger", "thumbnails")
+    max_cache_bytes: int = 128 * 1024 * 1024
+    # Eviction goes below the budget, so it does not run again after every write
+    eviction_ratio: float = 0.9
+    # Lock of an instance that died during eviction is taken over after this many seconds
+    stale_lock_seconds: float = 60.0
+
+    entry_suffix: str = ".thumbnail"
+    # Magic, width, height, stride
+    header = struct.Struct("<4sIII")
+    magic: bytes = b"PMT2"
+
+    lock = threading.Lock()
+    # Size of the cache as seen by this process, measured on first write
+    estimated_bytes: Optional[int] = None
+
+    # Counters
+    number_of_hits: int = 0
+    number_of_misses: int = 0
+    number_of_evictions: int = 0
+
+    @classmethod
+    def load(cls, document_path: str, limit_width: int, limit_height: int, page_index: int = 0,
+             is_counted: bool = True) -> Optional[Thumbnail]:
+        """
+        Cached thumbnail of a page, or None if there is none for the current version of the document.
+
+        :param is_counted: whether the lookup counts as a hit or a miss, probes for derivation do not
+        """
+
+        if not cls.is_enabled:
+            return None
+
+        try:
+            entry_path = cls.entry_path(document_path, limit_width, limit_height, page_index)
+
+            with open(entry_path, "rb") as f:
+                data = f.read()
+
+            # Refresh recency for LRU
+            os.utime(entry_path)
+        except OSError:
+            if is_counted:
+                cls.count(is_hit=False)
+
+            return None
+
+        thumbnail = cls.decode(data)
+
+        if is_counted:
+            cls.count(is_hit=thumbnail is not None)
+
+        return thumbnail
+
+    @classmethod
+    def store(cls, document_path: str, limit_width: int, limit_height: int, thumbnail: Thumbnail,
+              page_index: int = 0) -> None:
+        if not cls.is_enabled:
+            return
+
+        header = cls.header.pack(cls.magic, thumbnail.width, thumbnail.height, thumbnail.stride)
+
+        try:
+            entry_path = cls.entry_path(document_path, limit_width, limit_height, page_index)
+            os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+
+            # Written aside and renamed, other instances may read the entry at the same time
+            temporary_path = f"{entry_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+            with open(temporary_path, "wb") as f:
+                f.write(header)
+
+                # Samples in a shared memory block are followed by the rest of the block
+                with memoryview(thumbnail.samples)[:thumbnail.stride * thumbnail.height] as samples:
+                    f.write(samples)
+
+            # An entry stored again replaces its previous file, whose bytes are already counted
+            try:
+                previous_entry_size = os.path.getsize(entry_path)
+            except FileNotFoundError:
+                previous_entry_size = 0
+
+            os.replace(temporary_path, entry_path)
+        except OSError as e:
+            print(f"[!] Thumbnail is not cached: {e}")
+            return
+
+        entry_size = cls.header.size + thumbnail.stride * thumbnail.height
+
+        # Scanned outside the lock, at worst two threads scan at the same time
+        scanned_bytes = sum(entry_size for entry_path, entry_time, entry_size in cls.scan_entries()) \
+            if cls.estimated_bytes is None else None
+
+        with cls.lock:
+            if cls.estimated_bytes is None:
+                cls.estimated_bytes = scanned_bytes if scanned_bytes is not None else entry_size
+            else:
+                cls.estimated_bytes += entry_size - previous_entry_size
+
+            is_over_budget = cls.estimated_bytes > cls.max_cache_bytes
+
+        if is_over_budget:
+            cls.evict()
+
+    @classmethod
+    def evict(cls) -> None:
+        """
+        Remove least recently used entries until the cache fits `eviction_ratio` of its budget.
+
+        Only one instance evicts at a time, the others skip eviction while the lock file exists.
+        """
+
+        lock_path = os.path.join(cls.cache_directory, ".eviction.lock")
+        lock_token = cls.acquire_lock_file(lock_path)
+
+        if lock_token is None:
+            return
+
+        try:
+            entries = sorted(cls.scan_entries(), key=lambda entry: entry[1])
+            total_bytes = sum(entry_size for entry_path, entry_time, entry_size in entries)
+            target_bytes = int(cls.max_cache_bytes * cls.eviction_ratio)
+            number_of_evictions = 0
+
+            for entry_path, entry_time, entry_size in entries:
+                if total_bytes <= target_bytes:
+                    break
+
+                try:
+                    os.remove(entry_path)
+                except OSError:
+                    # Removed by another instance in the meantime
+                    pass
+
+                total_bytes -= entry_size
+                number_of_evictions += 1
+
+            with cls.lock:
+                cls.estimated_bytes = total_bytes
+                cls.number_of_evictions += number_of_evictions
+        finally:
+            cls.release_lock_file(lock_path, lock_token)
+
+    @classmethod
+    def clear(cls) -> None:
+        for entry_path, entry_time, entry_size in cls.scan_entries():
+            try:
+                os.remove(entry_path)
+            except OSError:
+                pass
+
+        with cls.lock:
+            cls.estimated_bytes = 0
+
+    # <editor-fold desc="[+] Entries">
+
+    @classmethod
+    def entry_path(cls, document_path: str, limit_width: int, limit_height: int, page_index: int) -> str:
+        absolute_path = os.path.abspath(document_path)
+        stat_result = os.stat(absolute_path)
+
+        key = f"{absolute_path}|{stat_result.st_size}|{stat_result.st_mtime_ns}|" \
+              f"{limit_width}x{limit_height}|{page_index}|{RENDERER_VERSION}"
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+        # Two-level layout keeps directories small
+        return os.path.join(cls.cache_directory, digest[:2], digest + cls.entry_suffix)
+
+    @classmethod
+    def decode(cls, data: bytes) -> Optional[Thumbnail]:
+        if len(data) < cls.header.size:
+            return None
+
+        magic, width, height, stride = cls.header.unpack_from(data)
+
+        if magic != cls.magic or len(data) != cls.header.size + stride * height:
+            return None
+
+        # A view, not a copy, of the pixels behind the header
+        return Thumbnail(width, height, stride, memoryview(data)[cls.header.size:])
+
+    @classmethod
+    def scan_entries(cls) -> List[Tuple[str, float, int]]:
+        """
+        Path, modification time and size of all entries. Temporary files abandoned by crashed writers are removed.
+        """
+
+        entries = list()
+
+        if not os.path.isdir(cls.cache_directory):
+            return entries
+
+        for directory_entry in os.scandir(cls.cache_directory):
+            if not directory_entry.is_dir():
+                continue
+
+            for file_entry in os.scandir(directory_entry.path):
+                try:
+                    stat_result = file_entry.stat()
+
+                    if file_entry.name.endswith(".tmp") and time.time() - stat_result.st_mtime > cls.stale_lock_seconds:
+                        os.remove(file_entry.path)
+                except OSError:
+                    continue
+
+                if not file_entry.name.endswith(cls.entry_suffix):
+                    continue
+
+                entries.append((file_entry.path, stat_result.st_mtime, stat_result.st_size))
+
+        return entries
+
+    # </editor-fold>
+
+    # <editor-fold desc="[+] Lock file">
+
+    @classmethod
+    def acquire_lock_file(cls, lock_path: str) -> Optional[str]:
+        """
+        Create the lock file atomically, taking over a stale one.
+
+        :return: token written into the lock file, needed to release it, or None if another instance holds the lock
+        """
+
+        os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+        lock_token = f"{os.getpid()} {time.time()} {uuid.uuid4().hex}"
+
+        for attempt in range(2):
+            try:
+                file_descriptor = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                holder_token = cls.read_lock_file(lock_path)
+
+                if holder_token is None or not cls.is_lock_stale(lock_path, holder_token):
+                    return None
+
+                # Other instances may take over the same stale lock, only one of them removes it
+                cls.remove_lock_file(lock_path, holder_token)
+                continue
+            except OSError:
+                return None
+
+            with os.fdopen(file_descriptor, "w") as f:
+                f.write(lock_token)
+
+            return lock_token
+
+        return None
+
+    @classmethod
+    def release_lock_file(cls, lock_path: str, lock_token: str) -> None:
+        cls.remove_lock_file(lock_path, lock_token)
+
+    @staticmethod
+    def read_lock_file(lock_path: str) -> Optional[str]:
+        try:
+            with open(lock_path, "r") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    @classmethod
+    def is_lock_stale(cls, lock_path: str, holder_token: str) -> bool:
+        """
+        A lock is stale once its holder has exited or it is older than `stale_lock_seconds`.
+        """
+
+        try:
+            pid_text, time_text, unique_text = holder_token.split()
+            process_id, lock_time = int(pid_text), float(time_text)
+        except ValueError:
+            # Being written right now, or its holder died before writing, only the age tells
+            try:
+                process_id, lock_time = None, os.path.getmtime(lock_path)
+            except OSError:
+                return False
+
+        if time.time() - lock_time > cls.stale_lock_seconds:
+            return True
+
+        return process_id is not None and not cls.is_process_alive(process_id)
+
+    @staticmethod
+    def is_process_alive(process_id: int) -> bool:
+        # Signal 0 only checks for the process on POSIX, on Windows `os.kill` would terminate it
+        if os.name == "nt":
+            return True
+
+        try:
+            os.kill(process_id, 0)
+        except ProcessLookupError:
+            return False
+        except OSError:
+            # Exists, but belongs to another user
+            return True
+
+        return True
+
+    @staticmethod
+    def remove_lock_file(lock_path: str, expected_token: str) -> bool:
+        """
+        Remove the lock file only if it still holds `expected_token`.
+
+        The file is first renamed aside, which succeeds for one instance only, and checked there. A lock created
+        by another instance in the meantime is put back.
+
+        :return: whether the expected lock was removed
+        """
+
+        claimed_path = f"{lock_path}.{os.getpid()}.{threading.get_ident()}.claimed"
+
+        try:
+            os.rename(lock_path, claimed_path)
+        except OSError:
+            # Already removed or taken over
+            return False
+
+        try:
+            with open(claimed_path, "r") as f:
+                claimed_token = f.read()
+
+            if claimed_token != expected_token:
+                try:
+                    # Unlike a rename, a link never replaces a lock that was created since
+                    os.link(claimed_path, lock_path)
+                except OSError:
+                    pass
+
+                return False
+
+            return True
+        except OSError:
+            return False
+        finally:
+            try:
+                os.remove(claimed_path)
+            except OSError:
+                pass
+
+    # </editor-fold>
+
+    # <editor-fold desc="[+] Counters">
+
+    @classmethod
+    def count(cls, is_hit: bool) -> None:
+        with cls.lock:
+            if is_hit:
+                cls.number_of_hits += 1
+            else:
+                cls.number_of_misses += 1
+
+    # </editor-fold>
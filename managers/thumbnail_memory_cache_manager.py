@@ -0,0 +1,184 @@
+import os
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
+
+from PyQt5.QtGui import QPixmap
+
+
+# Path, modification time and size of the document
+DocumentKey = Tuple[str, int, int]
+# Document key, page index, limit width and limit height
+ThumbnailKey = Tuple[DocumentKey, int, int, int]
+
+
+class ThumbnailMemoryCacheManager:
+    """
+    Process-wide cache of preview pixmaps shared by all document components.
+
+    Least recently used pixmaps are dropped once more than `max_cache_bytes` are held. Labels share pixmaps with the
+    cache instead of copying them, so a pixmap that is both shown and cached is counted once; an evicted pixmap lives
+    on only while a component near the viewport still shows it. Pages other than the first one (scrubbing) are
+    limited to `max_pages_per_document` per document on top of that. Used from the GUI thread only, `QPixmap` may
+    not be used from other threads anyway.
+    """
+
+    max_cache_bytes: int = 64 * 1024 * 1024
+    max_pages_per_document: int = 16
+
+    thumbnails: Dict[ThumbnailKey, QPixmap] = OrderedDict()
+    # Cached boxes of every page, to derive smaller tiers from larger ones
+    boxes: Dict[Tuple[DocumentKey, int], Set[Tuple[int, int]]] = dict()
+    # Cached pages other than the first one of every document, least recently used first
+    pages: Dict[DocumentKey, Dict[int, None]] = dict()
+    cached_bytes: int = 0
+
+    # Counters
+    number_of_hits: int = 0
+    number_of_misses: int = 0
+    number_of_evictions: int = 0
+
+    @classmethod
+    def get(cls, document_path: str, limit_width: int, limit_height: int, page_index: int = 0) -> Optional[QPixmap]:
+        thumbnail_key = cls.make_key(document_path, limit_width, limit_height, page_index)
+        pixmap = cls.thumbnails.get(thumbnail_key, None) if thumbnail_key is not None else None
+
+        if pixmap is None:
+            cls.number_of_misses += 1
+            return None
+
+        cls.number_of_hits += 1
+        cls.touch(thumbnail_key)
+
+        return pixmap
+
+    @classmethod
+    def contains(cls, document_path: str, limit_width: int, limit_height: int, page_index: int = 0) -> bool:
+        # Not counted and not refreshed, for prefetching
+        return cls.make_key(document_path, limit_width, limit_height, page_index) in cls.thumbnails
+
+    @classmethod
+    def get_larger(cls, document_path: str, limit_width: int, limit_height: int,
+                   page_index: int = 0) -> Optional[QPixmap]:
+        """
+        Smallest cached pixmap of the page rendered for a box that contains the given one, to be scaled down.
+        """
+
+        thumbnail_key = cls.make_key(document_path, limit_width, limit_height, page_index)
+
+        if thumbnail_key is None:
+            return None
+
+        larger_boxes = [box for box in cls.boxes.get(thumbnail_key[:2], ())
+                        if box[0] >= limit_width and box[1] >= limit_height]
+
+        if not larger_boxes:
+            return None
+
+        larger_key = thumbnail_key[:2] + min(larger_boxes)
+        cls.touch(larger_key)
+
+        return cls.thumbnails[larger_key]
+
+    @classmethod
+    def put(cls, document_path: str, limit_width: int, limit_height: int, pixmap: QPixmap,
+            page_index: int = 0) -> None:
+        thumbnail_key = cls.make_key(document_path, limit_width, limit_height, page_index)
+
+        if thumbnail_key is None:
+            return
+
+        cls.remove(thumbnail_key)
+
+        cls.thumbnails[thumbnail_key] = pixmap
+        cls.boxes.setdefault(thumbnail_key[:2], set()).add(thumbnail_key[2:])
+        cls.cached_bytes += cls.pixmap_bytes(pixmap)
+
+        if page_index != 0:
+            document_pages = cls.pages.setdefault(thumbnail_key[0], OrderedDict())
+            document_pages[page_index] = None
+            document_pages.move_to_end(page_index)
+
+            while len(document_pages) > cls.max_pages_per_document:
+                cls.remove_page(thumbnail_key[0], next(iter(document_pages)))
+
+        cls.evict()
+
+    @classmethod
+    def evict(cls) -> None:
+        while cls.cached_bytes > cls.max_cache_bytes and cls.thumbnails:
+            cls.remove(next(iter(cls.thumbnails)))
+            cls.number_of_evictions += 1
+
+    @classmethod
+    def clear(cls) -> None:
+        cls.thumbnails.clear()
+        cls.boxes.clear()
+        cls.pages.clear()
+        cls.cached_bytes = 0
+
+    @classmethod
+    def number_of_thumbnails(cls) -> int:
+        return len(cls.thumbnails)
+
+    # <editor-fold desc="[+] Entries">
+
+    @classmethod
+    def touch(cls, thumbnail_key: ThumbnailKey) -> None:
+        cls.thumbnails.move_to_end(thumbnail_key)
+
+        document_pages = cls.pages.get(thumbnail_key[0], None)
+
+        if document_pages is not None and thumbnail_key[1] in document_pages:
+            document_pages.move_to_end(thumbnail_key[1])
+
+    @classmethod
+    def remove(cls, thumbnail_key: ThumbnailKey) -> None:
+        pixmap = cls.thumbnails.pop(thumbnail_key, None)
+
+        if pixmap is None:
+            return
+
+        cls.cached_bytes -= cls.pixmap_bytes(pixmap)
+
+        page_boxes = cls.boxes[thumbnail_key[:2]]
+        page_boxes.discard(thumbnail_key[2:])
+
+        if page_boxes:
+            return
+
+        del cls.boxes[thumbnail_key[:2]]
+
+        # Last box of the page is gone
+        document_pages = cls.pages.get(thumbnail_key[0], None)
+
+        if document_pages is not None:
+            document_pages.pop(thumbnail_key[1], None)
+
+            if not document_pages:
+                del cls.pages[thumbnail_key[0]]
+
+    @classmethod
+    def remove_page(cls, document_key: DocumentKey, page_index: int) -> None:
+        for box in list(cls.boxes.get((document_key, page_index), ())):
+            cls.remove((document_key, page_index) + box)
+            cls.number_of_evictions += 1
+
+        cls.pages.get(document_key, dict()).pop(page_index, None)
+
+    @staticmethod
+    def make_key(document_path: str, limit_width: int, limit_height: int,
+                 page_index: int) -> Optional[ThumbnailKey]:
+        absolute_path = os.path.abspath(document_path)
+
+        try:
+            stat_result = os.stat(absolute_path)
+        except OSError:
+            return None
+
+        return (absolute_path, stat_result.st_mtime_ns, stat_result.st_size), page_index, limit_width, limit_height
+
+    @staticmethod
+    def pixmap_bytes(pixmap: QPixmap) -> int:
+        return pixmap.width() * pixmap.height() * pixmap.depth() // 8
+
+    # </editor-fold>
@@ -0,0 +1,159 @@
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Optional, Callable
+
+from models.merge_backends.merge_backend_selector import MergeBackendSelector
+from models.merge_engine import MergeEngine
+from models.merge_job import MergeJob, MergeSource
+from models.page_selection import PageSelection
+
+
+class BatchMergeResult:
+    """
+    Outcome of one job of a batch.
+    """
+
+    def __init__(self, job_index: int, output_path: str, error_message: Optional[str] = None,
+                 elapsed_seconds: float = 0.0):
+        self.job_index = job_index
+        self.output_path = output_path
+        self.error_message = error_message
+        self.elapsed_seconds = elapsed_seconds
+
+    @property
+    def is_successful(self) -> bool:
+        return self.error_message is None
+
+
+def run_merge_job(job_index: int, merge_job: MergeJob) -> BatchMergeResult:
+    """
+    Entry point of a pool worker. Defined at module level, so it can be pickled.
+    """
+
+    start_time = time.perf_counter()
+
+    try:
+        output_path = MergeEngine().run(merge_job)
+    except Exception as e:
+        return BatchMergeResult(job_index, merge_job.output_path, f"{type(e).__name__}: {e}",
+                                time.perf_counter() - start_time)
+
+    return BatchMergeResult(job_index, output_path, None, time.perf_counter() - start_time)
+
+
+class BatchMergeRunner:
+    """
+    Runs many independent merge jobs on a process pool. Qt is never imported, so it can run without a display.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, overwrite: bool = False):
+        self.max_workers = max_workers if max_workers is not None else (os.cpu_count() or 1)
+        self.overwrite = overwrite
+
+    # <editor-fold desc="[+] Manifest">
+
+    @classmethod
+    def load_manifest(cls, manifest_path: str, is_compacted: bool = False,
+                      backend_name: str = "auto") -> List[MergeJob]:
+        """
+        Read merge jobs from a JSON manifest.
+
+        The manifest is either a list of jobs or an object with a `jobs` list. Every job has an `inputs` list
+        and an `output` name, and optionally a `compact` flag, a `backend` name and a number of `workers`. An input is a path or an object with `path`
+        and `pages` (for example `"1-2, 5"`). Relative paths are resolved against the directory of the manifest.
+        Jobs stream their output unless the backend cannot, then they are merged in memory.
+
+        :param manifest_path: path to the manifest file
+        :param is_compacted: default for jobs without a `compact` flag
+        :param backend_name: default for jobs without a `backend`
+        :return: list of jobs in manifest order
+        """
+
+        with open(manifest_path, "r") as f:
+            manifest = json.load(f)
+
+        job_specs = manifest["jobs"] if isinstance(manifest, dict) else manifest
+        base_directory = os.path.dirname(os.path.abspath(manifest_path))
+
+        merge_jobs = list()
+
+        for job_index, job_spec in enumerate(job_specs):
+            if not job_spec.get("inputs"):
+                raise ValueError(f"Job {job_index} of '{manifest_path}' has no inputs")
+
+            sources = [cls.load_source(input_spec, base_directory) for input_spec in job_spec["inputs"]]
+
+            output_path = MergeJob.normalize_output_path(job_spec.get("output", ""))
+            output_path = os.path.join(base_directory, output_path)
+
+            job_backend_name = job_spec.get("backend", backend_name)
+
+            merge_jobs.append(MergeJob(sources, output_path,
+                                       is_streaming=MergeBackendSelector.is_streaming_supported(job_backend_name),
+                                       is_compacted=job_spec.get("compact", is_compacted),
+                                       backend_name=job_backend_name,
+                                       number_of_workers=job_spec.get("workers", 1)))
+
+        return merge_jobs
+
+    @staticmethod
+    def load_source(input_spec, base_directory: str) -> MergeSource:
+        if isinstance(input_spec, str):
+            return MergeSource(os.path.join(base_directory, input_spec))
+
+        page_selection = input_spec.get("pages", "")
+
+        # Fail on load, not in the middle of a batch
+        PageSelection.parse(page_selection)
+
+        return MergeSource(os.path.join(base_directory, input_spec["path"]), page_selection=page_selection)
+
+    # </editor-fold>
+
+    def run(self, merge_jobs: List[MergeJob],
+            result_callback: Optional[Callable[[BatchMergeResult], None]] = None) -> List[BatchMergeResult]:
+        """
+        Run all jobs in parallel and return their results in manifest order.
+
+        Jobs are distributed over the pool, a batch with a single job runs it in parallel chunks instead.
+        """
+
+        results: List[Optional[BatchMergeResult]] = [None] * len(merge_jobs)
+        pending_jobs = list()
+
+        for job_index, merge_job in enumerate(merge_jobs):
+            if not self.overwrite and os.path.isfile(merge_job.output_path):
+                results[job_index] = BatchMergeResult(job_index, merge_job.output_path, "File exists")
+                self.report_result(results[job_index], result_callback)
+            else:
+                pending_jobs.append((job_index, merge_job))
+
+        # A single job gets all workers for a parallel merge of its own
+        if len(pending_jobs) == 1:
+            job_index, merge_job = pending_jobs[0]
+            merge_job = merge_job.derive(merge_job.sources, merge_job.output_path,
+                                         number_of_workers=max(merge_job.number_of_workers, self.max_workers))
+
+            results[job_index] = run_merge_job(job_index, merge_job)
+            self.report_result(results[job_index], result_callback)
+
+        elif pending_jobs:
+            max_workers = max(1, min(self.max_workers, len(pending_jobs)))
+
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = [executor.submit(run_merge_job, job_index, merge_job)
+                           for job_index, merge_job in pending_jobs]
+
+                for future in as_completed(futures):
+                    result = future.result()
+                    results[result.job_index] = result
+                    self.report_result(result, result_callback)
+
+        return results
+
+    @staticmethod
+    def report_result(result: BatchMergeResult, result_callback: Optional[Callable[[BatchMergeResult], None]]):
+        if result_callback is not None:
+            result_callback(result)
@@ -0,0 +1,317 @@
+import itertools
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+class DocumentCollection:
+    """
+    Ordered documents with stable ids, shared by the merge viewmodel and the document panels.
+
+    Ids are kept in blocks of at most `max_block_size`, the position of a document is the number of ids in the
+    blocks before its own plus its place in its block. Blocks know their index, and a Fenwick tree over their sizes
+    counts the ids before a block, so looking up, moving and removing a document cost O(log n + max_block_size) and
+    no following document is renumbered. Only splitting, merging or dropping a block renumbers the blocks after it,
+    which takes at least `max_block_size` / 4 changes of a block.
+    """
+
+    max_block_size: int = 256
+
+    def __init__(self):
+        self.blocks: List[List[int]] = list()
+        # Index of every block by its identity, lists are not hashable
+        self.block_indexes: Dict[int, int] = dict()
+        # Fenwick tree over the sizes of the blocks, 1-based
+        self.block_size_tree: List[int] = [0]
+        # Block of every id, and the document behind it
+        self.id_blocks: Dict[int, List[int]] = dict()
+        self.documents: Dict[int, object] = dict()
+        self.id_counter = itertools.count()
+
+    def __len__(self) -> int:
+        # Placed ids, a moved document is out of its block for a moment
+        return len(self.id_blocks)
+
+    def __iter__(self) -> Iterator:
+        for block in self.blocks:
+            for document_id in block:
+                yield self.documents[document_id]
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return list(itertools.islice(self.iterate_from(position.start or 0),
+                                         max(0, (len(self) if position.stop is None else position.stop)
+                                             - (position.start or 0))))
+
+        block, block_position = self.locate(position)
+
+        return self.documents[block[block_position]]
+
+    # <editor-fold desc="[+] Changes">
+
+    def append(self, document, document_id: Optional[int] = None) -> int:
+        """
+        Add a document at the end and return its id, a new one unless an unused `document_id` is given.
+        """
+
+        if document_id is None:
+            document_id = next(self.id_counter)
+
+        # Appended blocks keep a quarter free, the first moves into a long list do not split every block
+        if not self.blocks or len(self.blocks[-1]) >= self.max_block_size * 3 // 4:
+            self.append_block(list())
+
+        self.blocks[-1].append(document_id)
+        self.add_block_size(len(self.blocks) - 1, 1)
+        self.id_blocks[document_id] = self.blocks[-1]
+        self.documents[document_id] = document
+
+        return document_id
+
+    def extend(self, documents: Iterable) -> List[int]:
+        return [self.append(document) for document in documents]
+
+    def remove(self, document_id: int) -> int:
+        """
+        Remove a document and return the position it had.
+        """
+
+        position = self.index(document_id)
+
+        self.take(document_id)
+        del self.documents[document_id]
+
+        return position
+
+    def move(self, document_id: int, destination_position: int) -> int:
+        """
+        Move a document so it ends up at `destination_position` and return the position it had.
+        """
+
+        position = self.index(document_id)
+
+        self.take(document_id)
+        self.insert(destination_position, document_id)
+
+        return position
+
+    def move_many(self, document_ids: List[int], destination_position: int) -> List[int]:
+        """
+        Move documents together, in the given order, so the first ends up at `destination_position` and the others
+        follow it. Return the positions they had.
+        """
+
+        positions = [self.index(document_id) for document_id in document_ids]
+
+        for document_id in document_ids:
+            self.take(document_id)
+
+        destination_position = min(max(0, destination_position), len(self))
+
+        for offset, document_id in enumerate(document_ids):
+            self.insert(destination_position + offset, document_id)
+
+        return positions
+
+    # </editor-fold>
+
+    # <editor-fold desc="[+] Lookups">
+
+    def get(self, document_id: int):
+        return self.documents[document_id]
+
+    def index(self, document_id: int) -> int:
+        """
+        Current position of a document.
+        """
+
+        block = self.id_blocks[document_id]
+
+        return self.count_before(self.block_indexes[id(block)]) + block.index(document_id)
+
+    def ids_between(self, first_position: int, last_position: int) -> List[int]:
+        """
+        Ids from `first_position` to `last_position`, both included.
+        """
+
+        first_position = max(0, first_position)
+        last_position = min(last_position, len(self) - 1)
+        document_ids = list()
+
+        if first_position > last_position:
+            return document_ids
+
+        block_index, block_position = self.find_block(first_position)
+        number_of_ids = last_position - first_position + 1
+
+        for block in itertools.islice(self.blocks, block_index, None):
+            document_ids.extend(block[block_position:block_position + number_of_ids - len(document_ids)])
+            block_position = 0
+
+            if len(document_ids) == number_of_ids:
+                break
+
+        return document_ids
+
+    def iterate_from(self, position: int) -> Iterator:
+        if position >= len(self):
+            return
+
+        block_index, block_position = self.find_block(max(0, position))
+
+        for document_id in self.blocks[block_index][block_position:]:
+            yield self.documents[document_id]
+
+        for block in itertools.islice(self.blocks, block_index + 1, None):
+            for document_id in block:
+                yield self.documents[document_id]
+
+    # </editor-fold>
+
+    # <editor-fold desc="[+] Blocks">
+
+    def locate(self, position: int):
+        """
+        Block holding a position and the position within the block.
+        """
+
+        if position < 0:
+            position += len(self)
+
+        if not 0 <= position < len(self):
+            raise IndexError(f"Position out of range: {position}")
+
+        block_index, block_position = self.find_block(position)
+
+        return self.blocks[block_index], block_position
+
+    def take(self, document_id: int) -> None:
+        # Out of its block, the document itself is kept
+        block = self.id_blocks.pop(document_id)
+        block.remove(document_id)
+        block_index = self.block_indexes[id(block)]
+        self.add_block_size(block_index, -1)
+
+        if not block:
+            self.remove_block(block_index)
+            return
+
+        # Small neighbours are merged, so the number of blocks follows the number of documents
+        if block_index + 1 < len(self.blocks) \
+                and len(block) + len(self.blocks[block_index + 1]) <= self.max_block_size // 2:
+            next_block = self.blocks[block_index + 1]
+
+            for next_document_id in next_block:
+                self.id_blocks[next_document_id] = block
+
+            block.extend(next_block)
+            self.add_block_size(block_index, len(next_block))
+            self.remove_block(block_index + 1)
+
+    def insert(self, position: int, document_id: int) -> None:
+        position = min(max(0, position), len(self))
+
+        if position == len(self):
+            if not self.blocks or len(self.blocks[-1]) >= self.max_block_size:
+                self.append_block(list())
+
+            block_index, block_position = len(self.blocks) - 1, len(self.blocks[-1])
+        else:
+            block_index, block_position = self.find_block(position)
+
+        block = self.blocks[block_index]
+        block.insert(block_position, document_id)
+        self.add_block_size(block_index, 1)
+        self.id_blocks[document_id] = block
+
+        if len(block) > self.max_block_size:
+            self.split_block(block_index)
+
+    def split_block(self, block_index: int) -> None:
+        block = self.blocks[block_index]
+
+        second_half = block[len(block) // 2:]
+        del block[len(block) // 2:]
+        self.blocks.insert(block_index + 1, second_half)
+
+        for document_id in second_half:
+            self.id_blocks[document_id] = second_half
+
+        self.index_blocks(block_index)
+
+    def append_block(self, block: List[int]) -> None:
+        self.block_indexes[id(block)] = len(self.blocks)
+        self.blocks.append(block)
+
+        # A new last node covers the block and the nodes it sums up
+        tree_index = len(self.block_size_tree)
+        self.block_size_tree.append(len(block) + self.count_before(tree_index - 1)
+                                    - self.count_before(tree_index - (tree_index & -tree_index)))
+
+    def remove_block(self, block_index: int) -> None:
+        del self.block_indexes[id(self.blocks.pop(block_index))]
+
+        # No other node sums up the last one
+        if block_index == len(self.blocks):
+            self.block_size_tree.pop()
+        else:
+            self.index_blocks(block_index)
+
+    def index_blocks(self, first_block_index: int) -> None:
+        """
+        Renumber blocks from `first_block_index` on and rebuild the tree of block sizes, after blocks were inserted or
+        removed.
+        """
+
+        self.block_indexes.update(zip(map(id, itertools.islice(self.blocks, first_block_index, None)),
+                                      itertools.count(first_block_index)))
+
+        # A node sums up the blocks after the node its index without the lowest set bit ends with
+        counts = list(itertools.accumulate(map(len, self.blocks), initial=0))
+        self.block_size_tree = [counts[tree_index] - counts[tree_index & (tree_index - 1)]
+                                for tree_index in range(len(counts))]
+
+    # </editor-fold>
+
+    # <editor-fold desc="[+] Block sizes">
+
+    def add_block_size(self, block_index: int, delta: int) -> None:
+        tree_index = block_index + 1
+
+        while tree_index < len(self.block_size_tree):
+            self.block_size_tree[tree_index] += delta
+            tree_index += tree_index & -tree_index
+
+    def count_before(self, block_index: int) -> int:
+        """
+        Number of ids in the blocks before `block_index`.
+        """
+
+        count = 0
+        tree_index = block_index
+
+        while tree_index > 0:
+            count += self.block_size_tree[tree_index]
+            tree_index -= tree_index & -tree_index
+
+        return count
+
+    def find_block(self, position: int) -> Tuple[int, int]:
+        """
+        Index of the block holding a position, between 0 and the number of ids, and the position within the block.
+        """
+
+        block_index = 0
+        step = 1 << (len(self.block_size_tree) - 1).bit_length()
+
+        # Descends the tree, skipping whole nodes that end before the position
+        while step:
+            tree_index = block_index + step
+
+            if tree_index < len(self.block_size_tree) and self.block_size_tree[tree_index] <= position:
+                block_index = tree_index
+                position -= self.block_size_tree[tree_index]
+
+            step >>= 1
+
+        return block_index, position
+
+    # </editor-fold>
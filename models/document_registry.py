@@ -0,0 +1,255 @@
+import heapq
+import os
+import sys
+from array import array
+from typing import Dict, List, Optional
+
+from models.preflight import PreflightReport
+
+
+class DocumentRegistry:
+    """
+    Data of all documents of a session in columns indexed by document id, instead of one object per document.
+
+    Directories are interned, a path is kept as the index of its directory and its file name. Names equal to the
+    stem of the file name, empty page selections and error messages are not stored at all. Preflight results are
+    kept as numbers and rebuilt into a `PreflightReport` when read.
+
+    Ids are row indexes. A removed document stays readable until its id is given back with `release`, so tasks
+    that still run for it do not fail. Released rows drop their file name and are reused by later documents,
+    released rows at the end of the columns are dropped. `memory_footprint` stays under `memory_envelope`, which
+    counts only rows in use, for file names up to about 100 characters.
+    """
+
+    # Budget of every row in use, of every released row waiting to be reused, and of the empty registry
+    max_bytes_per_document: int = 160
+    max_bytes_per_free_row: int = 72
+    min_envelope_bytes: int = 64 * 1024
+
+    # Flags
+    is_included_flag: int = 1
+    is_removed_flag: int = 2
+    is_checked_flag: int = 4
+    is_encrypted_flag: int = 8
+    needs_password_flag: int = 16
+    is_repaired_flag: int = 32
+    is_released_flag: int = 64
+
+    def __init__(self):
+        # Interned directories, with a trailing separator
+        self.directories: List[str] = list()
+        self.directory_indexes: Dict[str, int] = dict()
+
+        # Columns
+        self.path_directories = array("I")
+        self.file_names: List[str] = list()
+        self.flags = bytearray()
+        self.page_counts = array("i")
+        self.file_sizes = array("q")
+
+        # Sparse columns, most documents have no entry
+        self.names: Dict[int, str] = dict()
+        self.page_selections: Dict[int, str] = dict()
+        self.error_messages: Dict[int, str] = dict()
+
+        # Released rows, negated ids in a heap, so the last row is on top
+        self.free_ids: List[int] = list()
+        # Ids given back by `release` from any thread, collected by `reclaim_released_rows`
+        self.released_ids: List[int] = list()
+
+        self.number_of_documents = 0
+
+    def __len__(self) -> int:
+        return self.number_of_documents
+
+    @property
+    def number_of_rows(self) -> int:
+        # Removed and released documents included
+        return len(self.file_names)
+
+    @property
+    def number_of_free_rows(self) -> int:
+        return len(self.free_ids)
+
+    def add(self, document_path: str, document_name: Optional[str] = None, is_included: bool = True,
+            page_selection: str = "") -> int:
+        """
+        Register a document and return its id, the id of a released document if there is one.
+        """
+
+        # Split by hand, so the path is rebuilt exactly as it was given
+        separator_index = max(document_path.rfind("/"), document_path.rfind(os.sep))
+        directory, file_name = document_path[:separator_index + 1], document_path[separator_index + 1:]
+
+        if directory not in self.directory_indexes:
+            self.directory_indexes[directory] = len(self.directories)
+            self.directories.append(directory)
+
+        self.reclaim_released_rows()
+
+        if self.free_ids:
+            document_id = -heapq.heappop(self.free_ids)
+
+            self.path_directories[document_id] = self.directory_indexes[directory]
+            self.file_names[document_id] = file_name
+            self.flags[document_id] = self.is_included_flag if is_included else 0
+            self.page_counts[document_id] = 0
+            self.file_sizes[document_id] = 0
+        else:
+            document_id = len(self.file_names)
+
+            self.path_directories.append(self.directory_indexes[directory])
+            self.file_names.append(file_name)
+            self.flags.append(self.is_included_flag if is_included else 0)
+            self.page_counts.append(0)
+            self.file_sizes.append(0)
+
+        if document_name is not None and document_name != os.path.splitext(file_name)[0]:
+            self.names[document_id] = document_name
+
+        if page_selection:
+            self.page_selections[document_id] = page_selection
+
+        self.number_of_documents += 1
+
+        return document_id
+
+    def remove(self, document_id: int) -> None:
+        if self.flags[document_id] & self.is_removed_flag:
+            return
+
+        self.flags[document_id] |= self.is_removed_flag
+        self.names.pop(document_id, None)
+        self.page_selections.pop(document_id, None)
+        self.error_messages.pop(document_id, None)
+
+        self.number_of_documents -= 1
+
+    def release(self, document_id: int) -> None:
+        """
+        Give back the id of a removed document once nothing refers to it, its row is reused by a later document.
+
+        Safe to call from any thread, the row is reclaimed by the next `add` or `reclaim_released_rows`.
+        """
+
+        self.released_ids.append(document_id)
+
+    def reclaim_released_rows(self) -> None:
+        while self.released_ids:
+            document_id = self.released_ids.pop()
+
+            # Ids of documents that were not removed are kept
+            if self.flags[document_id] & (self.is_removed_flag | self.is_released_flag) != self.is_removed_flag:
+                continue
+
+            self.flags[document_id] |= self.is_released_flag
+            self.file_names[document_id] = ""
+            heapq.heappush(self.free_ids, -document_id)
+
+        # The last row is the largest free id
+        number_of_rows = len(self.file_names)
+
+        while self.free_ids and -self.free_ids[0] == number_of_rows - 1:
+            heapq.heappop(self.free_ids)
+            number_of_rows -= 1
+
+        # Cut at once, arrays give memory back only when resized
+        if number_of_rows < len(self.file_names):
+            for column in (self.path_directories, self.file_names, self.flags, self.page_counts, self.file_sizes):
+                del column[number_of_rows:]
+
+    def contains(self, document_id: int) -> bool:
+        return 0 <= document_id < len(self.flags) and not self.flags[document_id] & self.is_removed_flag
+
+    # <editor-fold desc="[+] Fields">
+
+    def path(self, document_id: int) -> str:
+        return self.directories[self.path_directories[document_id]] + self.file_names[document_id]
+
+    def name(self, document_id: int) -> str:
+        document_name = self.names.get(document_id, None)
+
+        return document_name if document_name is not None else os.path.splitext(self.file_names[document_id])[0]
+
+    def is_included(self, document_id: int) -> bool:
+        return bool(self.flags[document_id] & self.is_included_flag)
+
+    def set_included(self, document_id: int, is_included: bool) -> None:
+        self.set_flag(document_id, self.is_included_flag, is_included)
+
+    def page_selection(self, document_id: int) -> str:
+        return self.page_selections.get(document_id, "")
+
+    def set_page_selection(self, document_id: int, page_selection: str) -> None:
+        if page_selection:
+            self.page_selections[document_id] = page_selection
+        else:
+            self.page_selections.pop(document_id, None)
+
+    def page_count(self, document_id: int) -> Optional[int]:
+        # Read from its column, without building a report
+        return self.page_counts[document_id] if self.flags[document_id] & self.is_checked_flag else None
+
+    def preflight(self, document_id: int) -> Optional[PreflightReport]:
+        flags = self.flags[document_id]
+
+        if not flags & self.is_checked_flag:
+            return None
+
+        return PreflightReport(self.path(document_id), self.error_messages.get(document_id, None),
+                               self.page_counts[document_id], bool(flags & self.is_encrypted_flag),
+                               bool(flags & self.needs_password_flag), bool(flags & self.is_repaired_flag),
+                               self.file_sizes[document_id])
+
+    def set_preflight(self, document_id: int, preflight_report: PreflightReport) -> None:
+        self.page_counts[document_id] = preflight_report.page_count
+        self.file_sizes[document_id] = preflight_report.file_size
+
+        if preflight_report.error_message is not None:
+            self.error_messages[document_id] = preflight_report.error_message
+        else:
+            self.error_messages.pop(document_id, None)
+
+        self.set_flag(document_id, self.is_checked_flag, True)
+        self.set_flag(document_id, self.is_encrypted_flag, preflight_report.is_encrypted)
+        self.set_flag(document_id, self.needs_password_flag, preflight_report.needs_password)
+        self.set_flag(document_id, self.is_repaired_flag, preflight_report.is_repaired)
+
+    def set_flag(self, document_id: int, flag: int, is_set: bool) -> None:
+        if is_set:
+            self.flags[document_id] |= flag
+        else:
+            self.flags[document_id] &= ~flag & 0xFF
+
+    # </editor-fold>
+
+    def memory_footprint(self) -> int:
+        """
+        Bytes held by the registry, its columns and the strings only it refers to.
+        """
+
+        footprint = sys.getsizeof(self) + sys.getsizeof(self.directory_indexes)
+
+        for column in (self.directories, self.path_directories, self.file_names, self.flags, self.page_counts,
+                       self.file_sizes, self.released_ids):
+            footprint += sys.getsizeof(column)
+
+        for sparse_column in (self.names, self.page_selections, self.error_messages):
+            footprint += sys.getsizeof(sparse_column) + sum(map(sys.getsizeof, sparse_column.values()))
+
+        footprint += sum(map(sys.getsizeof, self.directories))
+        # Released rows share the empty string
+        footprint += sum(map(sys.getsizeof, filter(None, self.file_names)))
+        footprint += sys.getsizeof(self.free_ids) + sum(map(sys.getsizeof, self.free_ids))
+
+        return footprint
+
+    def memory_envelope(self) -> int:
+        """
+        Bytes `memory_footprint` is expected to stay under, see `max_bytes_per_document` and `max_bytes_per_free_row`.
+        """
+
+        number_of_free_rows = self.number_of_free_rows
+
+        return self.min_envelope_bytes + (self.number_of_rows - number_of_free_rows) * self.max_bytes_per_document \
+            + number_of_free_rows * self.max_bytes_per_free_row
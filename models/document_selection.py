@@ -0,0 +1,95 @@
+from typing import List, Optional, Set
+
+from models.document_collection import DocumentCollection
+
+
+class DocumentSelection:
+    """
+    Selected documents of a panel, kept by id so they stay selected while documents move.
+
+    Presses and clicks follow the usual rules: a toggle press flips one document, an extending press selects the range
+    from the last toggled or pressed document, a plain press selects only the pressed document unless it is already
+    selected, then the selection is kept for a drag and collapses on click. Changes return the ids whose state changed,
+    so only their components are restyled.
+    """
+
+    def __init__(self, document_collection: DocumentCollection):
+        self.document_collection = document_collection
+        self.selected_ids: Set[int] = set()
+        # Start of ranges selected by extending presses
+        self.anchor_id: Optional[int] = None
+
+    def __contains__(self, document_id: int) -> bool:
+        return document_id in self.selected_ids
+
+    def __len__(self) -> int:
+        return len(self.selected_ids)
+
+    # <editor-fold desc="[+] Presses">
+
+    def press(self, document_id: int, is_toggled: bool = False, is_extended: bool = False) -> Set[int]:
+        if is_toggled:
+            return self.toggle(document_id)
+
+        if is_extended:
+            return self.select_range(document_id)
+
+        if document_id in self.selected_ids:
+            return set()
+
+        return self.select_only(document_id)
+
+    def click(self, document_id: int, is_toggled: bool = False, is_extended: bool = False) -> Set[int]:
+        # Handled by the press already
+        if is_toggled or is_extended:
+            return set()
+
+        return self.select_only(document_id)
+
+    # </editor-fold>
+
+    # <editor-fold desc="[+] Changes">
+
+    def select_only(self, document_id: int) -> Set[int]:
+        changed_ids = self.selected_ids ^ {document_id}
+
+        self.selected_ids = {document_id}
+        self.anchor_id = document_id
+
+        return changed_ids
+
+    def toggle(self, document_id: int) -> Set[int]:
+        self.selected_ids ^= {document_id}
+        self.anchor_id = document_id
+
+        return {document_id}
+
+    def select_range(self, document_id: int) -> Set[int]:
+        if self.anchor_id is None:
+            return self.select_only(document_id)
+
+        anchor_position = self.document_collection.index(self.anchor_id)
+        position = self.document_collection.index(document_id)
+
+        range_ids = set(self.document_collection.ids_between(min(anchor_position, position),
+                                                             max(anchor_position, position)))
+        changed_ids = self.selected_ids ^ range_ids
+
+        self.selected_ids = range_ids
+
+        return changed_ids
+
+    def discard(self, document_id: int) -> None:
+        self.selected_ids.discard(document_id)
+
+        if self.anchor_id == document_id:
+            self.anchor_id = None
+
+    # </editor-fold>
+
+    def ordered_ids(self) -> List[int]:
+        """
+        Selected ids in the order of the collection.
+        """
+
+        return sorted(self.selected_ids, key=self.document_collection.index)
@@ -0,0 +1,148 @@
+import os
+from typing import ContextManager
+
+import fitz
+
+from interfaces.i_merge_backend import IMergeBackend
+from models.merge_job import MergeJob, MergeSource
+from models.page_selection import PageSelection
+
+
+class FitzMergeBackend(IMergeBackend):
+    """
+    Merge backend based on PyMuPDF. Supports streaming output, shared document pools and compaction.
+    """
+
+    # garbage=4 drops unused objects and merges identical objects, comparing stream contents as well,
+    # so resources embedded by every input (fonts, images, ICC profiles, form XObjects) are written once
+    compact_save_options = dict(garbage=4, deflate=True, deflate_images=True, deflate_fonts=True)
+
+    @property
+    def backend_name(self) -> str:
+        return "fitz"
+
+    @property
+    def is_streaming_supported(self) -> bool:
+        return True
+
+    def merge(self, merge_engine, merge_job: MergeJob, part_path: str) -> None:
+        if merge_job.is_streaming:
+            self.merge_streaming(merge_engine, merge_job, part_path)
+
+            # The incremental file is valid as it is, only compaction needs the whole output
+            if merge_job.is_compacted:
+                merge_engine.check_cancelled()
+                self.compact(part_path, part_path + merge_engine.compact_suffix)
+        else:
+            self.merge_in_memory(merge_engine, merge_job, part_path)
+
+    def merge_in_memory(self, merge_engine, merge_job: MergeJob, part_path: str) -> None:
+        """
+        Build the whole output in memory and save it once.
+        """
+
+        pdf_merged = fitz.open()
+
+        try:
+            for document_index, source in enumerate(merge_job.sources):
+                self.insert_source(merge_engine, pdf_merged, source, document_index, merge_job.number_of_sources)
+
+            merge_engine.check_cancelled()
+
+            if merge_job.is_compacted:
+                pdf_merged.save(part_path, **self.compact_save_options)
+            else:
+                pdf_merged.save(part_path)
+
+        finally:
+            pdf_merged.close()
+
+    def merge_streaming(self, merge_engine, merge_job: MergeJob, part_path: str) -> None:
+        """
+        Copy sources window by window and append each window to the output file with an incremental save.
+
+        After every flush the output is closed and reopened, so objects of already written pages are dropped
+        from memory. Each input is closed right after it is copied (or returned to the pool, which caps open
+        handles), so the number of open files does not grow with the number of sources.
+
+        Memory is bounded by the objects of one window of `MergeJob.window_size` sources plus the xref and
+        the page tree of the output, which are reloaded on every reopen and grow with the number of pages only.
+        Every incremental save appends the page tree and the xref again, so the file is larger than a single save.
+        """
+
+        pdf_merged = fitz.open()
+        is_saved = False
+        window_start = 0
+
+        try:
+            while window_start < merge_job.number_of_sources:
+                window = merge_job.sources[window_start:window_start + merge_job.window_size]
+
+                for document_index, source in enumerate(window, start=window_start):
+                    self.insert_source(merge_engine, pdf_merged, source, document_index,
+                                       merge_job.number_of_sources)
+
+                merge_engine.check_cancelled()
+
+                # Flush the window to disk
+                if not is_saved:
+                    pdf_merged.save(part_path)
+                    is_saved = True
+                else:
+                    pdf_merged.saveIncr()
+
+                # Reopen, only the document structure is loaded back
+                pdf_merged.close()
+                pdf_merged = fitz.open(part_path)
+
+                window_start += len(window)
+
+        finally:
+            pdf_merged.close()
+
+    def compact(self, part_path: str, compact_path: str) -> None:
+        """
+        Rewrite a streamed output in full, with duplicate objects merged and streams compressed.
+
+        Merging duplicates compares every object with every other, so the whole object graph of the output is
+        loaded and peak memory grows with the size of the output, unlike the streaming merge itself.
+        """
+
+        with fitz.open(part_path) as pdf_merged:
+            pdf_merged.save(compact_path, **self.compact_save_options)
+
+        os.replace(compact_path, part_path)
+
+    def insert_source(self, merge_engine, pdf_merged: fitz.Document, source: MergeSource,
+                      document_index: int, number_of_documents: int) -> None:
+        """
+        Copy the selected pages of one source into the output, reporting progress after every page.
+
+        Only selected pages are passed to `insert_pdf`, so objects referenced solely by other pages are never copied.
+        """
+
+        merge_engine.check_cancelled()
+
+        with self.open_source(merge_engine, source.document_path) as pdf_to_insert:
+            page_selection = PageSelection(source.page_selection)
+            page_indexes = [page_index
+                            for from_page, to_page in page_selection.to_page_ranges(pdf_to_insert.page_count)
+                            for page_index in range(from_page, to_page + 1)]
+            number_of_pages = len(page_indexes)
+
+            # Copy page by page to report progress, the graft map is kept until the last page
+            for position, page_index in enumerate(page_indexes):
+                merge_engine.check_cancelled()
+
+                pdf_merged.insert_pdf(pdf_to_insert, from_page=page_index, to_page=page_index,
+                                      final=(position == number_of_pages - 1))
+
+                merge_engine.report_page(document_index, number_of_documents, source, position, number_of_pages)
+
+    @staticmethod
+    def open_source(merge_engine, document_path: str) -> ContextManager[fitz.Document]:
+        if merge_engine.document_pool is not None:
+            return merge_engine.document_pool.lease(document_path)
+
+        # Closed on exit from the `with` block
+        return fitz.open(document_path)
@@ -0,0 +1,284 @@
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import fitz
+
+from interfaces.i_merge_backend import IMergeBackend
+from models.merge_backends.fitz_merge_backend import FitzMergeBackend
+from models.merge_backends.pypdf2_merge_backend import PyPDF2MergeBackend
+from models.merge_job import MergeJob, MergeSource
+
+
+# Coarse (file count, average size, average page count) buckets
+InputProfile = Tuple[int, int, int]
+
+
+class MergeBackendSelector:
+    """
+    Registry of merge backends and a calibration benchmark that picks the faster one for an input profile.
+
+    A job names its backend in `MergeJob.backend_name`, `"auto"` lets the selector decide. Streaming jobs only go to
+    backends that support streaming. The first job of every profile merges a sample of its own inputs with each
+    backend, in alternating runs until enough time was measured, and the fastest one per page is remembered in
+    memory and in `calibration_path`. Another backend replaces the default only when it is clearly faster, so timer
+    noise does not decide for good.
+
+    `calibration_path` defaults to the `PDF_MERGER_CALIBRATION_PATH` environment variable, so worker processes
+    inherit it; an empty value keeps calibration results in memory only.
+    """
+
+    backends: Dict[str, IMergeBackend] = {
+        backend.backend_name: backend for backend in (FitzMergeBackend(), PyPDF2MergeBackend())
+    }
+    default_backend_name: str = "fitz"
+    auto_backend_name: str = "auto"
+
+    # Calibration
+    calibration_path_variable: str = "PDF_MERGER_CALIBRATION_PATH"
+    calibration_path: Optional[str] = os.environ.get(
+        calibration_path_variable, os.path.join(os.path.expanduser("~"), ".cache", "pdf_merger", "merge_backends.json")
+    ) or None
+    calibration_sample_size: int = 8
+    calibration_page_selection: str = "1-16"
+    # Runs stop once every backend was measured this long, the median run decides
+    calibration_min_seconds: float = 0.25
+    calibration_min_runs: int = 3
+    calibration_max_runs: int = 15
+    # Fraction by which another backend must beat the default
+    calibration_margin: float = 0.2
+    calibrated_backends: Dict[InputProfile, str] = dict()
+    is_calibration_loaded: bool = False
+    lock = threading.Lock()
+
+    @classmethod
+    def backend_names(cls) -> List[str]:
+        return [cls.auto_backend_name] + list(cls.backends.keys())
+
+    @classmethod
+    def select(cls, merge_job: MergeJob, document_pool=None, progress_callback: Optional[Callable] = None,
+               is_cancelled: Optional[Callable[[], bool]] = None) -> IMergeBackend:
+        """
+        Resolve the backend of a job.
+
+        :param progress_callback: receives progress of the calibration, if one runs
+        :param is_cancelled: polled by the calibration, if one runs
+        :raises ValueError: if the job names an unknown backend, or one that cannot stream a streaming job
+        :raises MergeCancelledError: if the job was cancelled during the calibration
+        """
+
+        if merge_job.backend_name != cls.auto_backend_name:
+            if merge_job.backend_name not in cls.backends:
+                raise ValueError(f"Unknown merge backend: '{merge_job.backend_name}'")
+
+            if merge_job.is_streaming and not cls.is_streaming_supported(merge_job.backend_name):
+                raise ValueError(f"Merge backend '{merge_job.backend_name}' keeps the whole output in memory, "
+                                 f"it cannot run a streaming job")
+
+            return cls.backends[merge_job.backend_name]
+
+        backend_names = [backend_name for backend_name, merge_backend in cls.backends.items()
+                         if merge_backend.is_streaming_supported or not merge_job.is_streaming]
+
+        if len(backend_names) == 1:
+            return cls.backends[backend_names[0]]
+
+        input_profile = cls.measure_profile(merge_job.sources, document_pool)
+
+        with cls.lock:
+            cls.load_calibration()
+            backend_name = cls.calibrated_backends.get(input_profile, None)
+
+        if backend_name is None:
+            backend_name = cls.calibrate(merge_job.sources, backend_names, progress_callback, is_cancelled)
+
+            with cls.lock:
+                cls.calibrated_backends[input_profile] = backend_name
+                cls.save_calibration()
+
+        return cls.backends.get(backend_name, cls.backends[cls.default_backend_name])
+
+    @classmethod
+    def is_streaming_supported(cls, backend_name: str) -> bool:
+        """
+        Whether jobs with `backend_name` can stream, `"auto"` always picks a backend that can.
+        """
+
+        if backend_name == cls.auto_backend_name:
+            return True
+
+        merge_backend = cls.backends.get(backend_name, None)
+
+        return merge_backend is not None and merge_backend.is_streaming_supported
+
+    # <editor-fold desc="[+] Profile">
+
+    @classmethod
+    def measure_profile(cls, sources: List[MergeSource], document_pool=None) -> InputProfile:
+        """
+        Bucket file count, average file size and average page count on a logarithmic scale.
+
+        Sizes come from all files, page counts from the calibration sample only.
+        """
+
+        average_size = sum(os.path.getsize(source.document_path) for source in sources) / max(1, len(sources))
+
+        sample = cls.take_sample(sources)
+        page_counts = [cls.count_pages(source.document_path, document_pool) for source in sample]
+        average_page_count = sum(page_counts) / max(1, len(page_counts))
+
+        return cls.bucket(len(sources)), cls.bucket(average_size), cls.bucket(average_page_count)
+
+    @staticmethod
+    def bucket(value: float) -> int:
+        # Every bucket spans a factor of four
+        return int(math.log2(value + 1)) // 2
+
+    @classmethod
+    def take_sample(cls, sources: List[MergeSource]) -> List[MergeSource]:
+        step = max(1, len(sources) // cls.calibration_sample_size)
+        return sources[::step][:cls.calibration_sample_size]
+
+    @staticmethod
+    def count_pages(document_path: str, document_pool=None) -> int:
+        if document_pool is not None:
+            with document_pool.lease(document_path) as pdf_document:
+                return pdf_document.page_count
+
+        with fitz.open(document_path) as pdf_document:
+            return pdf_document.page_count
+
+    # </editor-fold>
+
+    # <editor-fold desc="[+] Calibration">
+
+    @classmethod
+    def calibrate(cls, sources: List[MergeSource], backend_names: List[str],
+                  progress_callback: Optional[Callable] = None,
+                  is_cancelled: Optional[Callable[[], bool]] = None) -> str:
+        """
+        Merge a sample of the inputs with every backend of `backend_names` and return the name of the fastest one
+        per page.
+
+        Backends run in turns, so a change of load affects all of them. All of them open the sample from files and
+        merge it in memory, pooled handles would favour the fitz backend.
+        """
+
+        # Imported here, the engine module imports this one
+        from models.merge_engine import MergeEngine, MergeCancelledError, MergeProgress
+
+        sample = [MergeSource(source.document_path, source.document_name, cls.calibration_page_selection)
+                  for source in cls.take_sample(sources)]
+
+        # Seconds per page of every run
+        run_seconds_per_page: Dict[str, List[float]] = {backend_name: list() for backend_name in backend_names}
+        measured_seconds: Dict[str, float] = {backend_name: 0.0 for backend_name in backend_names}
+
+        with tempfile.TemporaryDirectory() as directory:
+            for run_index in range(cls.calibration_max_runs):
+                for backend_name in list(run_seconds_per_page):
+                    output_path = os.path.join(directory, f"{backend_name}.pdf")
+                    merge_job = MergeJob(sample, output_path, is_streaming=False, backend_name=backend_name)
+                    copied_pages = list()
+
+                    def on_progress(merge_progress: MergeProgress, backend_name=backend_name):
+                        copied_pages.append(merge_progress)
+
+                        if progress_callback is not None:
+                            progress_callback(MergeProgress(
+                                merge_progress.document_index, merge_progress.number_of_documents,
+                                f"Calibrating '{backend_name}': {merge_progress.document_name}",
+                                merge_progress.page_index, merge_progress.number_of_pages))
+
+                    start_time = time.perf_counter()
+
+                    try:
+                        MergeEngine(on_progress, is_cancelled).run(merge_job)
+                    except MergeCancelledError:
+                        raise
+                    except Exception as e:
+                        print(f"[!] Calibration of '{backend_name}' failed: {e}")
+                        del run_seconds_per_page[backend_name]
+                        continue
+
+                    seconds = time.perf_counter() - start_time
+                    measured_seconds[backend_name] += seconds
+                    run_seconds_per_page[backend_name].append(seconds / max(1, len(copied_pages)))
+
+                if run_index + 1 >= cls.calibration_min_runs and all(
+                        measured_seconds[backend_name] >= cls.calibration_min_seconds
+                        for backend_name in run_seconds_per_page):
+                    break
+
+        if not run_seconds_per_page:
+            return cls.default_backend_name
+
+        median_seconds_per_page = {backend_name: sorted(seconds_per_page)[len(seconds_per_page) // 2]
+                                   for backend_name, seconds_per_page in run_seconds_per_page.items()}
+        fastest_backend_name = min(median_seconds_per_page, key=median_seconds_per_page.get)
+        default_seconds_per_page = median_seconds_per_page.get(cls.default_backend_name, None)
+
+        if default_seconds_per_page is not None and median_seconds_per_page[fastest_backend_name] \
+                > default_seconds_per_page * (1 - cls.calibration_margin):
+            return cls.default_backend_name
+
+        return fastest_backend_name
+
+    @classmethod
+    def set_calibration_path(cls, calibration_path: Optional[str]) -> None:
+        """
+        Keep calibration results in another file, or in memory only if `calibration_path` is None.
+
+        Worker processes started afterwards use the same file.
+        """
+
+        with cls.lock:
+            cls.calibration_path = calibration_path or None
+            cls.calibrated_backends = dict()
+            cls.is_calibration_loaded = False
+
+        os.environ[cls.calibration_path_variable] = calibration_path or ""
+
+    @classmethod
+    def load_calibration(cls) -> None:
+        if cls.is_calibration_loaded:
+            return
+
+        cls.is_calibration_loaded = True
+
+        if cls.calibration_path is None or not os.path.isfile(cls.calibration_path):
+            return
+
+        try:
+            with open(cls.calibration_path, "r") as f:
+                for profile_text, backend_name in json.load(f).items():
+                    cls.calibrated_backends[tuple(int(value) for value in profile_text.split(","))] = backend_name
+        except (OSError, ValueError) as e:
+            print(f"[!] Calibration is not loaded: {e}")
+
+    @classmethod
+    def save_calibration(cls) -> None:
+        if cls.calibration_path is None:
+            return
+
+        calibration = {",".join(str(value) for value in input_profile): backend_name
+                       for input_profile, backend_name in cls.calibrated_backends.items()}
+
+        try:
+            os.makedirs(os.path.dirname(cls.calibration_path), exist_ok=True)
+
+            # Written aside and renamed, other processes may read the file at the same time
+            temporary_path = f"{cls.calibration_path}.{os.getpid()}.tmp"
+
+            with open(temporary_path, "w") as f:
+                json.dump(calibration, f, indent=4)
+
+            os.replace(temporary_path, cls.calibration_path)
+        except OSError as e:
+            print(f"[!] Calibration is not saved: {e}")
+
+    # </editor-fold>
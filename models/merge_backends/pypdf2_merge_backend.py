@@ -0,0 +1,197 @@
+import hashlib
+import io
+from typing import Dict, Set
+
+from PyPDF2 import PdfReader, PdfWriter
+from PyPDF2.generic import StreamObject, DictionaryObject, ArrayObject, IndirectObject
+
+from interfaces.i_merge_backend import IMergeBackend
+from models.merge_job import MergeJob
+from models.page_selection import PageSelection
+
+
+class PyPDF2MergeBackend(IMergeBackend):
+    """
+    Merge backend based on PyPDF2. Pure Python, with low per-file overhead, which suits many tiny inputs.
+
+    PyPDF2 can only write the output at once and keeps every input until then, so the backend does not support
+    streaming jobs and `MergeBackendSelector` refuses it for them. Inputs are read into memory and their files are
+    closed right away, which keeps the number of open files flat. Compaction deduplicates identical streams by
+    content hash, it does not recompress them. Only the public API of PyPDF2 is used.
+    """
+
+    @property
+    def backend_name(self) -> str:
+        return "pypdf2"
+
+    @property
+    def is_streaming_supported(self) -> bool:
+        return False
+
+    def merge(self, merge_engine, merge_job: MergeJob, part_path: str) -> None:
+        pdf_writer = PdfWriter()
+
+        for document_index, source in enumerate(merge_job.sources):
+            merge_engine.check_cancelled()
+
+            with open(source.document_path, "rb") as f:
+                pdf_reader = PdfReader(io.BytesIO(f.read()))
+
+            if pdf_reader.is_encrypted and not pdf_reader.decrypt(""):
+                raise ValueError(f"'{source.document_path}' is encrypted")
+
+            page_selection = PageSelection(source.page_selection)
+            page_indexes = [page_index
+                            for from_page, to_page in page_selection.to_page_ranges(len(pdf_reader.pages))
+                            for page_index in range(from_page, to_page + 1)]
+
+            for position, page_index in enumerate(page_indexes):
+                merge_engine.check_cancelled()
+
+                pdf_writer.add_page(pdf_reader.pages[page_index])
+
+                merge_engine.report_page(document_index, merge_job.number_of_sources, source,
+                                         position, len(page_indexes))
+
+            # Clone map is keyed by id() of the reader, a later reader may reuse the id once this one is freed
+            pdf_writer.reset_translation(pdf_reader)
+
+        merge_engine.check_cancelled()
+
+        if merge_job.is_compacted:
+            pdf_writer = self.deduplicate_streams(pdf_writer)
+
+        with open(part_path, "wb") as f:
+            pdf_writer.write(f)
+
+    # <editor-fold desc="[+] Deduplication">
+
+    def deduplicate_streams(self, pdf_writer: PdfWriter) -> PdfWriter:
+        """
+        Point all references to identical streams (same dictionary and same data) at one copy.
+
+        Streams are reached from the pages. A writer writes every object it holds, so the pages are cloned into a new
+        writer, which copies only the objects they still reference.
+
+        :return: writer without the duplicates, `pdf_writer` itself if there were none
+        """
+
+        if not self.replace_duplicate_streams(pdf_writer):
+            return pdf_writer
+
+        buffer = io.BytesIO()
+        pdf_writer.write(buffer)
+        buffer.seek(0)
+
+        compact_writer = PdfWriter()
+
+        for page in PdfReader(buffer).pages:
+            compact_writer.add_page(page)
+
+        return compact_writer
+
+    def replace_duplicate_streams(self, pdf_writer: PdfWriter) -> int:
+        """
+        :return: number of replaced references
+        """
+
+        canonical_references: Dict[bytes, IndirectObject] = dict()
+        # Object numbers of duplicates, with the reference that replaces them
+        replacements: Dict[int, IndirectObject] = dict()
+        visited_numbers: Set[int] = set()
+        number_of_replacements = 0
+
+        # Iterative, page trees and annotations refer back to their parents
+        containers = list(pdf_writer.pages)
+
+        while containers:
+            container = containers.pop()
+            entries = list(container.items()) if isinstance(container, DictionaryObject) else list(enumerate(container))
+
+            for key, value in entries:
+                if not isinstance(value, IndirectObject):
+                    if isinstance(value, (DictionaryObject, ArrayObject)):
+                        containers.append(value)
+                    continue
+
+                replacement = replacements.get(value.idnum, None)
+
+                if replacement is not None:
+                    container[key] = replacement
+                    number_of_replacements += 1
+                    continue
+
+                if value.idnum in visited_numbers:
+                    continue
+
+                visited_numbers.add(value.idnum)
+                pdf_object = value.get_object()
+
+                if isinstance(pdf_object, StreamObject):
+                    canonical_reference = canonical_references.setdefault(self.stream_digest(pdf_object), value)
+
+                    if canonical_reference.idnum != value.idnum:
+                        replacements[value.idnum] = canonical_reference
+                        container[key] = canonical_reference
+                        number_of_replacements += 1
+                        continue
+
+                if isinstance(pdf_object, (DictionaryObject, ArrayObject)):
+                    containers.append(pdf_object)
+
+        return number_of_replacements
+
+    def stream_digest(self, stream_object: StreamObject) -> bytes:
+        """
+        Hash the data of a stream and its dictionary.
+
+        Indirect values of the dictionary (color spaces, soft masks, decode parameters) are hashed by content,
+        not by object number, so copies of a resource taken from different inputs get the same digest.
+        """
+
+        digest = hashlib.sha256()
+        self.update_digest(digest, stream_object, set())
+
+        return digest.digest()
+
+    def update_digest(self, digest, pdf_object, resolved_numbers: Set[int]) -> None:
+        """
+        :param resolved_numbers: object numbers being hashed, a reference back to one of them is hashed by number
+        """
+
+        if isinstance(pdf_object, IndirectObject):
+            if pdf_object.idnum in resolved_numbers:
+                digest.update(f"R{pdf_object.idnum};".encode("utf-8"))
+                return
+
+            resolved_numbers.add(pdf_object.idnum)
+            self.update_digest(digest, pdf_object.get_object(), resolved_numbers)
+            resolved_numbers.discard(pdf_object.idnum)
+
+        elif isinstance(pdf_object, DictionaryObject):
+            digest.update(b"<<")
+
+            # Length depends on the encoding of the data, which is hashed decoded
+            for key in sorted(key for key in pdf_object.keys() if key != "/Length"):
+                digest.update(f"{key};".encode("utf-8"))
+                self.update_digest(digest, pdf_object.raw_get(key), resolved_numbers)
+
+            digest.update(b">>")
+
+            if isinstance(pdf_object, StreamObject):
+                data = pdf_object.get_data()
+                digest.update(f"stream{len(data)};".encode("utf-8"))
+                digest.update(data)
+
+        elif isinstance(pdf_object, ArrayObject):
+            digest.update(b"[")
+
+            for value in pdf_object:
+                self.update_digest(digest, value, resolved_numbers)
+
+            digest.update(b"]")
+
+        else:
+            digest.update(f"{pdf_object!r};".encode("utf-8"))
+
+    # </editor-fold>
@@ -0,0 +1,218 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Optional
+
+from interfaces.i_merge_backend import IMergeBackend
+from models.merge_backends.merge_backend_selector import MergeBackendSelector
+from models.merge_job import MergeJob, MergeSource
+
+
+class MergeCancelledError(Exception):
+    """
+    Raised inside `MergeEngine.run` when the job has been cancelled.
+    """
+    pass
+
+
+class MergeProgress:
+    """
+    A snapshot of merge progress, reported after every copied page.
+    """
+
+    def __init__(self, document_index: int, number_of_documents: int, document_name: str,
+                 page_index: int, number_of_pages: int):
+        self.document_index = document_index
+        self.number_of_documents = number_of_documents
+        self.document_name = document_name
+        self.page_index = page_index
+        self.number_of_pages = number_of_pages
+
+    @property
+    def fraction(self) -> float:
+        if self.number_of_documents == 0:
+            return 1.0
+
+        document_fraction = (self.page_index + 1) / self.number_of_pages if self.number_of_pages > 0 else 1.0
+
+        return (self.document_index + document_fraction) / self.number_of_documents
+
+
+def run_chunk_job(merge_job: MergeJob, cancel_event) -> str:
+    """
+    Entry point of a chunk worker process. Defined at module level, so it can be pickled.
+    """
+
+    return MergeEngine(is_cancelled=cancel_event.is_set).run(merge_job)
+
+
+class MergeEngine:
+    """
+    Merge core shared by the GUI and headless callers. It does not depend on Qt.
+    """
+
+    part_suffix: str = ".part"
+    compact_suffix: str = ".compact"
+
+    # Parallel merge is used only when every worker gets at least this many sources
+    min_sources_per_chunk: int = 32
+
+    def __init__(self, progress_callback: Optional[Callable[[MergeProgress], None]] = None,
+                 is_cancelled: Optional[Callable[[], bool]] = None, document_pool=None):
+        """
+        :param progress_callback: called after every copied page
+        :param is_cancelled: polled between pages
+        :param document_pool: optional pool with `lease(path)` (see `DocumentPoolManager`), inputs are
+            borrowed from it instead of being opened and closed by the engine
+        """
+
+        self.progress_callback = progress_callback
+        self.is_cancelled = is_cancelled
+        self.document_pool = document_pool
+
+    def run(self, merge_job: MergeJob) -> str:
+        """
+        Merge all sources of the job and save the result.
+
+        Output is written to a temporary `.part` file next to the target and renamed once complete,
+        so a cancelled or failed job never leaves a truncated PDF behind.
+
+        :param merge_job: job to run
+        :return: path of the saved file
+        :raises MergeCancelledError: if the job has been cancelled before the output was saved
+        """
+
+        part_path = merge_job.output_path + self.part_suffix
+        compact_path = part_path + self.compact_suffix
+
+        try:
+            merge_backend = MergeBackendSelector.select(merge_job, self.document_pool, self.progress_callback,
+                                                       self.is_cancelled)
+            number_of_chunks = self.count_chunks(merge_job)
+
+            if number_of_chunks > 1:
+                self.merge_parallel(merge_job, merge_backend, part_path, number_of_chunks)
+            else:
+                merge_backend.merge(self, merge_job, part_path)
+
+            os.replace(part_path, merge_job.output_path)
+
+        except BaseException:
+            for path in (part_path, compact_path):
+                if os.path.isfile(path):
+                    os.remove(path)
+            raise
+
+        return merge_job.output_path
+
+    # <editor-fold desc="[+] Parallel merge">
+
+    def count_chunks(self, merge_job: MergeJob) -> int:
+        return min(merge_job.number_of_workers, merge_job.number_of_sources // self.min_sources_per_chunk)
+
+    def merge_parallel(self, merge_job: MergeJob, merge_backend: IMergeBackend, part_path: str,
+                       number_of_chunks: int) -> None:
+        """
+        Merge contiguous chunks of sources in worker processes, then combine the intermediate files in order.
+
+        Chunks are contiguous and combined in chunk order, so pages come out in the same order as in a serial merge.
+        Progress counts finished chunks first and then documents of the combine step.
+        """
+
+        sources = merge_job.sources
+        chunk_bounds = [(chunk_index * len(sources) // number_of_chunks,
+                         (chunk_index + 1) * len(sources) // number_of_chunks)
+                        for chunk_index in range(number_of_chunks)]
+        number_of_steps = 2 * number_of_chunks
+
+        # Intermediate files are kept on the file system of the output
+        intermediate_directory = tempfile.mkdtemp(prefix=".merge_",
+                                                  dir=os.path.dirname(os.path.abspath(merge_job.output_path)))
+        intermediate_paths = [os.path.join(intermediate_directory, f"{chunk_index:05d}.pdf")
+                              for chunk_index in range(number_of_chunks)]
+
+        # Spawned workers do not inherit threads or Qt state of the parent
+        context = multiprocessing.get_context("spawn")
+
+        try:
+            with context.Manager() as manager:
+                cancel_event = manager.Event()
+
+                with ProcessPoolExecutor(max_workers=number_of_chunks, mp_context=context) as executor:
+                    futures = list()
+
+                    for (chunk_start, chunk_end), intermediate_path in zip(chunk_bounds, intermediate_paths):
+                        # Compaction is done once, on the combined output
+                        chunk_job = merge_job.derive(sources[chunk_start:chunk_end], intermediate_path,
+                                                     is_compacted=False, backend_name=merge_backend.backend_name,
+                                                     number_of_workers=1)
+                        futures.append(executor.submit(run_chunk_job, chunk_job, cancel_event))
+
+                    pending_futures = set(futures)
+                    number_of_finished_chunks = 0
+
+                    try:
+                        while pending_futures:
+                            done_futures, pending_futures = wait(pending_futures, timeout=0.1,
+                                                                 return_when=FIRST_COMPLETED)
+
+                            for future in done_futures:
+                                # Raises errors of the worker
+                                future.result()
+
+                                self.report_progress(MergeProgress(number_of_finished_chunks, number_of_steps,
+                                                                   "Merging parts", 0, 1))
+                                number_of_finished_chunks += 1
+
+                            self.check_cancelled()
+
+                    except BaseException:
+                        # Stop running chunks, drop queued ones
+                        cancel_event.set()
+
+                        for future in futures:
+                            future.cancel()
+
+                        raise
+
+            # Combine intermediates in chunk order
+            def report_combine_progress(merge_progress: MergeProgress):
+                self.report_progress(MergeProgress(number_of_chunks + merge_progress.document_index, number_of_steps,
+                                                   merge_progress.document_name, merge_progress.page_index,
+                                                   merge_progress.number_of_pages))
+
+            combine_job = merge_job.derive([MergeSource(intermediate_path, f"Part {chunk_index + 1}")
+                                            for chunk_index, intermediate_path in enumerate(intermediate_paths)],
+                                           merge_job.output_path, number_of_workers=1)
+            combine_engine = MergeEngine(report_combine_progress, self.is_cancelled, self.document_pool)
+
+            merge_backend.merge(combine_engine, combine_job, part_path)
+
+        finally:
+            if self.document_pool is not None:
+                for intermediate_path in intermediate_paths:
+                    self.document_pool.discard(intermediate_path)
+
+            shutil.rmtree(intermediate_directory, ignore_errors=True)
+
+    # </editor-fold>
+
+    def check_cancelled(self) -> None:
+        if self.is_cancelled is not None and self.is_cancelled():
+            raise MergeCancelledError()
+
+    def report_progress(self, merge_progress: MergeProgress) -> None:
+        if self.progress_callback is not None:
+            self.progress_callback(merge_progress)
+
+    def report_page(self, document_index: int, number_of_documents: int, source: MergeSource,
+                    position: int, number_of_pages: int) -> None:
+        """
+        Shortcut for backends, reports that page `position` of `number_of_pages` selected pages has been copied.
+        """
+
+        if self.progress_callback is not None:
+            self.progress_callback(MergeProgress(document_index, number_of_documents, source.document_name,
+                                                 position, number_of_pages))
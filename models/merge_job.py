@@ -0,0 +1,80 @@
+import os.path
+from typing import List
+
+from pathvalidate import validate_filename, ValidationError
+
+
+class MergeSource:
+    """
+    A single input of a merge job.
+    """
+
+    def __init__(self, document_path: str, document_name: str = None, page_selection: str = ""):
+        self.document_path = document_path
+        self.document_name = document_name if document_name is not None \
+            else os.path.splitext(os.path.basename(document_path))[0]
+        # Pages to copy, as typed by the user (empty means all pages)
+        self.page_selection = page_selection
+
+
+class MergeJob:
+    """
+    A description of one merge: ordered inputs and the name of the output file.
+
+    The class is free of Qt on purpose, so it can be built both by `MergeViewModel` and by headless callers.
+    """
+
+    default_output_path: str = "MIXED.pdf"
+    default_window_size: int = 16
+
+    def __init__(self, sources: List[MergeSource], output_path: str,
+                 is_streaming: bool = True, window_size: int = default_window_size, is_compacted: bool = False,
+                 backend_name: str = "auto", number_of_workers: int = 1):
+        self.sources = sources
+        self.output_path = output_path
+        # Streaming merge flushes output to disk after every window of sources, only one window is kept in memory
+        self.is_streaming = is_streaming
+        self.window_size = max(1, window_size)
+        # Compacted output has duplicate objects (fonts, images, form XObjects) merged and streams compressed
+        self.is_compacted = is_compacted
+        # Name of a registered merge backend, "auto" picks the fastest for the inputs
+        self.backend_name = backend_name
+        # More than one worker splits a large job into chunks merged in parallel processes
+        self.number_of_workers = max(1, number_of_workers)
+
+    @property
+    def number_of_sources(self) -> int:
+        return len(self.sources)
+
+    def derive(self, sources: List[MergeSource], output_path: str, **overrides) -> "MergeJob":
+        """
+        Copy of the job options for other sources and output.
+        """
+
+        options = dict(is_streaming=self.is_streaming, window_size=self.window_size,
+                       is_compacted=self.is_compacted, backend_name=self.backend_name,
+                       number_of_workers=self.number_of_workers)
+        options.update(overrides)
+
+        return MergeJob(sources, output_path, **options)
+
+    @classmethod
+    def normalize_output_path(cls, pdf_filename: str) -> str:
+        """
+        Apply default name and `.pdf` extension to the user provided output name.
+        """
+
+        if pdf_filename == "":
+            pdf_filename = cls.default_output_path
+
+        try:
+            validate_filename(pdf_filename)
+        except ValidationError as e:
+            print(f"{e}\n")
+
+        name, ext = os.path.splitext(pdf_filename)
+
+        if ext != ".pdf":
+            pdf_filename = name + ".pdf"
+
+        return pdf_filename
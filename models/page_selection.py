@@ -0,0 +1,91 @@
+from typing import List, Tuple, Optional
+
+
+class PageSelection:
+    """
+    A parsed page selection, such as `1-2, 5, 10-`.
+
+    Page numbers are 1-based and inclusive, as they are shown to the user. A range may omit its start or its end.
+    An empty selection means all pages.
+    """
+
+    def __init__(self, selection_text: str = ""):
+        self.selection_text = selection_text.strip()
+        self.ranges: List[Tuple[Optional[int], Optional[int]]] = self.parse(self.selection_text)
+
+    @property
+    def is_all_pages(self) -> bool:
+        return not self.ranges
+
+    @staticmethod
+    def parse(selection_text: str) -> List[Tuple[Optional[int], Optional[int]]]:
+        """
+        Parse a selection into a list of `(first, last)` page numbers, `None` stands for an open end.
+
+        :raises ValueError: if the selection is malformed
+        """
+
+        ranges = list()
+
+        for part in selection_text.replace(";", ",").split(","):
+            part = part.strip()
+
+            if not part:
+                continue
+
+            if "-" in part:
+                first_text, _, last_text = part.partition("-")
+                first = PageSelection.parse_page_number(first_text) if first_text.strip() else None
+                last = PageSelection.parse_page_number(last_text) if last_text.strip() else None
+
+                if first is not None and last is not None and first > last:
+                    raise ValueError(f"Range '{part}' is reversed")
+            else:
+                first = last = PageSelection.parse_page_number(part)
+
+            ranges.append((first, last))
+
+        return ranges
+
+    @staticmethod
+    def parse_page_number(page_text: str) -> int:
+        page_text = page_text.strip()
+
+        if not page_text.isdigit() or int(page_text) < 1:
+            raise ValueError(f"'{page_text}' is not a page number")
+
+        return int(page_text)
+
+    @classmethod
+    def is_valid(cls, selection_text: str) -> bool:
+        try:
+            cls.parse(selection_text)
+        except ValueError:
+            return False
+
+        return True
+
+    def to_page_ranges(self, number_of_pages: int) -> List[Tuple[int, int]]:
+        """
+        Resolve the selection against a document.
+
+        :param number_of_pages: page count of the document
+        :return: 0-based inclusive `(from_page, to_page)` runs in selection order, pages past the end are dropped
+        """
+
+        if self.is_all_pages:
+            return [(0, number_of_pages - 1)] if number_of_pages > 0 else []
+
+        page_ranges = list()
+
+        for first, last in self.ranges:
+            from_page = (first if first is not None else 1) - 1
+            to_page = min((last if last is not None else number_of_pages), number_of_pages) - 1
+
+            if from_page <= to_page:
+                page_ranges.append((from_page, to_page))
+
+        return page_ranges
+
+    def number_of_selected_pages(self, number_of_pages: int) -> int:
+        return sum(to_page - from_page + 1 for from_page, to_page in self.to_page_ranges(number_of_pages))
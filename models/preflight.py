@@ -0,0 +1,102 @@
+import os
+from typing import Optional
+
+import fitz
+
+
+class PreflightReport:
+    """
+    Result of checking one input before it is previewed or merged.
+    """
+
+    def __init__(self, document_path: str, error_message: Optional[str] = None, page_count: int = 0,
+                 is_encrypted: bool = False, needs_password: bool = False, is_repaired: bool = False,
+                 file_size: int = 0):
+        self.document_path = document_path
+        self.error_message = error_message
+        self.page_count = page_count
+        self.is_encrypted = is_encrypted
+        self.needs_password = needs_password
+        self.is_repaired = is_repaired
+        self.file_size = file_size
+
+    @property
+    def is_mergeable(self) -> bool:
+        return self.error_message is None and not self.needs_password and self.page_count > 0
+
+    @property
+    def summary(self) -> str:
+        """
+        Short human readable description, used as a tooltip.
+        """
+
+        if self.error_message is not None:
+            return f"Unreadable: {self.error_message}"
+
+        if self.needs_password:
+            return "Encrypted, password required"
+
+        if self.page_count == 0:
+            return "No pages"
+
+        notes = [f"{self.page_count} page{'s' if self.page_count != 1 else ''}"]
+
+        if self.is_encrypted:
+            notes.append("encrypted")
+
+        if self.is_repaired:
+            notes.append("damaged, repaired on open")
+
+        return ", ".join(notes)
+
+
+def preflight_document(document_path: str, document_pool=None) -> PreflightReport:
+    """
+    Check that a file is a PDF that can be parsed and merged.
+
+    Cheap file checks run without any lock, so several files can be checked concurrently. Parsing goes through
+    `document_pool` (see `DocumentPoolManager`) when it is given, which leaves the parsed document in the pool
+    for previews and the merge.
+
+    :param document_path: file to check
+    :param document_pool: optional pool with `lease(path)`
+    :return: report, never raises for a bad file
+    """
+
+    try:
+        file_size = os.path.getsize(document_path)
+
+        if file_size == 0:
+            return PreflightReport(document_path, "File is empty")
+
+        with open(document_path, "rb") as f:
+            header = f.read(1024)
+
+        if b"%PDF-" not in header:
+            return PreflightReport(document_path, "Not a PDF file", file_size=file_size)
+
+        if document_pool is not None:
+            with document_pool.lease(document_path) as pdf_document:
+                return inspect_document(document_path, pdf_document, file_size)
+
+        with fitz.open(document_path) as pdf_document:
+            return inspect_document(document_path, pdf_document, file_size)
+
+    except Exception as e:
+        return PreflightReport(document_path, str(e))
+
+
+def inspect_document(document_path: str, pdf_document: fitz.Document, file_size: int) -> PreflightReport:
+    report = PreflightReport(document_path, None, 0, pdf_document.is_encrypted, pdf_document.needs_pass,
+                             pdf_document.is_repaired, file_size)
+
+    if report.needs_password:
+        return report
+
+    report.page_count = pdf_document.page_count
+
+    # Loading the first page catches a broken page tree
+    if report.page_count > 0:
+        pdf_document.load_page(0)
+
+    return report
@@ -0,0 +1,113 @@
+import sys
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, Optional, Tuple
+
+import fitz
+
+
+# Part of cache keys, changes whenever the output of the renderer changes
+RENDERER_VERSION = 2
+
+# Shared memory blocks of the caller mapped by this worker process, by name
+mapped_blocks: Dict[str, SharedMemory] = dict()
+
+
+class Thumbnail:
+    """
+    Rendered preview of a page as raw RGB pixels, independent of Qt so it can be made on any thread.
+
+    Rows are `stride` bytes long and are not padded to a multiple of four.
+    """
+
+    def __init__(self, width: int, height: int, stride: int, samples, shared_memory: Optional[SharedMemory] = None):
+        self.width = width
+        self.height = height
+        self.stride = stride
+        # Bytes-like, wrapped by QImage without a copy, may go on past `stride` * `height` bytes
+        self.samples = samples
+        # Block mapped by `samples`, reused by the rasterizer pool once the thumbnail is gone
+        self.shared_memory = shared_memory
+
+
+def render_thumbnail(document_path: str, limit_width: int = 112, limit_height: int = 112, page_index: int = 0,
+                     document_pool=None) -> Thumbnail:
+    """
+    Render a page scaled to fit into `limit_width` x `limit_height`, keeping its aspect ratio.
+
+    PyMuPDF is used through `document_pool` (see `DocumentPoolManager`) when it is given.
+    """
+
+    if document_pool is not None:
+        with document_pool.lease(document_path) as pdf_document:
+            return render_page(pdf_document[page_index], limit_width, limit_height)
+
+    with fitz.open(document_path) as pdf_document:
+        return render_page(pdf_document[page_index], limit_width, limit_height)
+
+
+def render_page(page: fitz.Page, limit_width: int, limit_height: int) -> Thumbnail:
+    pix = rasterize_page(page, limit_width, limit_height)
+
+    # The only copy, out of MuPDF while the document is still leased
+    return Thumbnail(pix.width, pix.height, pix.stride, pix.samples)
+
+
+def rasterize_page(page: fitz.Page, limit_width: int, limit_height: int) -> fitz.Pixmap:
+    """
+    Rasterize a page straight at the scale of the thumbnail, so the cost follows the thumbnail and not the page.
+    """
+
+    scale = min(limit_width / page.rect.width, limit_height / page.rect.height)
+
+    # No alpha channel, the page is opaque anyway
+    return page.get_pixmap(matrix=fitz.Matrix(scale, scale), alpha=False)
+
+
+def render_thumbnail_to_shared_memory(document_path: str, block_name: str, limit_width: int, limit_height: int,
+                                      page_index: int = 0, document_pool=None) -> Tuple[int, int, int]:
+    """
+    Render a thumbnail in a worker process into the shared memory block `block_name` of the caller.
+
+    Only the geometry travels back. Blocks stay mapped once used, so a reused block is written without creating,
+    mapping and faulting in new pages.
+
+    :return: width, height and stride
+    """
+
+    if document_pool is not None:
+        with document_pool.lease(document_path) as pdf_document:
+            return rasterize_to_shared_memory(pdf_document[page_index], block_name, limit_width, limit_height)
+
+    with fitz.open(document_path) as pdf_document:
+        return rasterize_to_shared_memory(pdf_document[page_index], block_name, limit_width, limit_height)
+
+
+def rasterize_to_shared_memory(page: fitz.Page, block_name: str, limit_width: int,
+                               limit_height: int) -> Tuple[int, int, int]:
+    pix = rasterize_page(page, limit_width, limit_height)
+    size = pix.stride * pix.height
+    shared_memory = map_block(block_name)
+
+    if size > shared_memory.size:
+        raise ValueError(f"Thumbnail of {size} bytes does not fit a block of {shared_memory.size} bytes")
+
+    # The only copy, straight from MuPDF
+    shared_memory.buf[:size] = pix.samples_mv
+
+    return pix.width, pix.height, pix.stride
+
+
+def map_block(block_name: str) -> SharedMemory:
+    shared_memory = mapped_blocks.get(block_name, None)
+
+    if shared_memory is None:
+        # The caller tracks and unlinks its blocks. Before 3.13 attaching registers the name again, with the resource
+        # tracker spawned workers share with the caller, which already holds it.
+        if sys.version_info >= (3, 13):
+            shared_memory = SharedMemory(block_name, track=False)
+        else:
+            shared_memory = SharedMemory(block_name)
+
+        mapped_blocks[block_name] = shared_memory
+
+    return shared_memory
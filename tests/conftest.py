@@ -0,0 +1,19 @@
+import pytest
+
+from managers.thumbnail_cache_manager import ThumbnailCacheManager
+from models.merge_backends.merge_backend_selector import MergeBackendSelector
+
+
+@pytest.fixture(autouse=True)
+def isolated_calibration(tmp_path, monkeypatch):
+    # Calibration results stay within a test, never in the home directory, in worker processes neither
+    monkeypatch.setenv(MergeBackendSelector.calibration_path_variable, str(tmp_path / "merge_backends.json"))
+    monkeypatch.setattr(MergeBackendSelector, "calibration_path", str(tmp_path / "merge_backends.json"))
+    monkeypatch.setattr(MergeBackendSelector, "calibrated_backends", dict())
+    monkeypatch.setattr(MergeBackendSelector, "is_calibration_loaded", False)
+
+
+@pytest.fixture(autouse=True)
+def isolated_thumbnail_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(ThumbnailCacheManager, "cache_directory", str(tmp_path / "thumbnails"))
+    monkeypatch.setattr(ThumbnailCacheManager, "estimated_bytes", None)
@@ -0,0 +1,131 @@
+import itertools
+import random
+
+import pytest
+
+from models.document_collection import DocumentCollection
+
+
+@pytest.fixture
+def document_collection():
+    # Small blocks, so a few documents already split and merge them
+    document_collection = DocumentCollection()
+    document_collection.max_block_size = 4
+    document_collection.extend(f"document {index}" for index in range(10))
+
+    return document_collection
+
+
+def check_blocks(document_collection: DocumentCollection) -> None:
+    assert all(0 < len(block) <= document_collection.max_block_size for block in document_collection.blocks)
+    assert sum(map(len, document_collection.blocks)) == len(document_collection)
+
+    for block in document_collection.blocks:
+        assert all(document_collection.id_blocks[document_id] is block for document_id in block)
+
+    # Block indexes and the tree of block sizes follow the blocks
+    number_of_blocks = len(document_collection.blocks)
+    assert len(document_collection.block_indexes) == number_of_blocks
+    assert [document_collection.block_indexes[id(block)] for block in document_collection.blocks] == \
+           list(range(number_of_blocks))
+    assert [document_collection.count_before(block_index) for block_index in range(number_of_blocks + 1)] == \
+           list(itertools.accumulate(map(len, document_collection.blocks), initial=0))
+
+
+def test_insert_splits_full_block(document_collection):
+    document_collection.move(9, 1)
+    document_collection.move(8, 1)
+
+    assert [document_collection.index(document_id) for document_id in (0, 8, 9, 1)] == [0, 1, 2, 3]
+    assert max(map(len, document_collection.blocks)) <= 4
+    check_blocks(document_collection)
+
+
+def test_take_merges_small_neighbours(document_collection):
+    # Blocks of 0-2, 3-5, 6-8 and 9. A shrunk block takes in its next one once both fit half a block, an emptied
+    # block is dropped.
+    for document_id in (4, 5, 7, 8, 3):
+        document_collection.remove(document_id)
+
+    assert document_collection.blocks == [[0, 1, 2], [6, 9]]
+    assert list(document_collection) == [f"document {index}" for index in (0, 1, 2, 6, 9)]
+    check_blocks(document_collection)
+
+
+def test_positions_span_blocks(document_collection):
+    assert document_collection[5] == "document 5"
+    assert document_collection[3:7] == [f"document {index}" for index in range(3, 7)]
+    assert list(document_collection.iterate_from(8)) == ["document 8", "document 9"]
+    assert document_collection.locate(4) == (document_collection.blocks[1], 1)
+
+
+def test_random_moves_match_list():
+    document_collection = DocumentCollection()
+    document_collection.max_block_size = 4
+    expected_ids = document_collection.extend(range(40))
+    random_generator = random.Random(7)
+
+    for _ in range(500):
+        document_id = random_generator.choice(expected_ids)
+        destination_position = random_generator.randint(0, len(expected_ids) - 1)
+
+        assert document_collection.move(document_id, destination_position) == expected_ids.index(document_id)
+        expected_ids.remove(document_id)
+        expected_ids.insert(destination_position, document_id)
+
+        if random_generator.random() < 0.05 and len(expected_ids) > 10:
+            removed_id = random_generator.choice(expected_ids)
+            assert document_collection.remove(removed_id) == expected_ids.index(removed_id)
+            expected_ids.remove(removed_id)
+
+        assert [document_collection.index(document_id) for document_id in expected_ids] == \
+               list(range(len(expected_ids)))
+        check_blocks(document_collection)
+
+    assert list(document_collection) == [document_collection.get(document_id) for document_id in expected_ids]
+
+
+def test_move_many_keeps_given_order(document_collection):
+    positions = document_collection.move_many([7, 2, 8], 1)
+
+    assert positions == [7, 2, 8]
+    assert document_collection.ids_between(0, len(document_collection) - 1) == [0, 7, 2, 8, 1, 3, 4, 5, 6, 9]
+    check_blocks(document_collection)
+
+
+def test_move_many_clamps_destination(document_collection):
+    document_collection.move_many([0, 1], 100)
+
+    assert document_collection.ids_between(7, 9) == [9, 0, 1]
+    check_blocks(document_collection)
+
+
+def test_ids_between_spans_blocks(document_collection):
+    assert document_collection.ids_between(3, 8) == [3, 4, 5, 6, 7, 8]
+    assert document_collection.ids_between(4, 4) == [4]
+    assert document_collection.ids_between(9, 20) == [9]
+
+
+def test_random_group_moves_match_list():
+    document_collection = DocumentCollection()
+    document_collection.max_block_size = 4
+    expected_ids = document_collection.extend(range(40))
+    random_generator = random.Random(7)
+
+    for _ in range(500):
+        document_ids = random_generator.sample(expected_ids, random_generator.randint(1, 5))
+        destination_position = random_generator.randint(0, len(expected_ids) - len(document_ids))
+
+        document_collection.move_many(document_ids, destination_position)
+        remaining_ids = [document_id for document_id in expected_ids if document_id not in document_ids]
+        expected_ids = remaining_ids[:destination_position] + document_ids + remaining_ids[destination_position:]
+
+        if random_generator.random() < 0.05 and len(expected_ids) > 10:
+            removed_id = random_generator.choice(expected_ids)
+            assert document_collection.remove(removed_id) == expected_ids.index(removed_id)
+            expected_ids.remove(removed_id)
+
+        assert document_collection.ids_between(0, len(expected_ids) - 1) == expected_ids
+        check_blocks(document_collection)
+
+    assert document_collection[5:9] == [document_collection.get(document_id) for document_id in expected_ids[5:9]]
@@ -0,0 +1,63 @@
+import threading
+
+import fitz
+import pytest
+
+from managers.document_pool_manager import DocumentPoolManager
+
+
+@pytest.fixture
+def pdf_paths(tmp_path):
+    paths = list()
+
+    for index in range(2):
+        path = str(tmp_path / f"{index}.pdf")
+
+        with fitz.open() as pdf_document:
+            pdf_document.new_page()
+            pdf_document.save(path)
+
+        paths.append(path)
+
+    yield paths
+
+    DocumentPoolManager.clear()
+
+
+def lease_in_thread(document_path: str) -> threading.Event:
+    is_leased = threading.Event()
+
+    def run():
+        with DocumentPoolManager.lease(document_path):
+            is_leased.set()
+
+    threading.Thread(target=run, daemon=True).start()
+
+    return is_leased
+
+
+def test_lease_does_not_block_other_documents(pdf_paths):
+    with DocumentPoolManager.lease(pdf_paths[0]):
+        assert lease_in_thread(pdf_paths[1]).wait(5)
+
+
+def test_lease_blocks_the_same_document_until_returned(pdf_paths):
+    with DocumentPoolManager.lease(pdf_paths[0]):
+        is_leased = lease_in_thread(pdf_paths[0])
+
+        assert not is_leased.wait(0.2)
+
+    assert is_leased.wait(5)
+
+
+def test_failed_open_is_not_kept(tmp_path):
+    path = str(tmp_path / "broken.pdf")
+
+    with open(path, "wb") as f:
+        f.write(b"not a pdf")
+
+    with pytest.raises(Exception):
+        with DocumentPoolManager.lease(path):
+            pass
+
+    assert all(document_key[0] != path for document_key in DocumentPoolManager.documents)
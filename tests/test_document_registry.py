@@ -0,0 +1,135 @@
+from models.document_registry import DocumentRegistry
+from models.preflight import PreflightReport
+
+
+def test_paths_are_rebuilt_from_interned_directories():
+    document_registry = DocumentRegistry()
+    document_paths = ["/documents/invoice.pdf", "/documents/receipt.pdf", "/archive/invoice.pdf", "notes.pdf"]
+    document_ids = [document_registry.add(document_path) for document_path in document_paths]
+
+    assert [document_registry.path(document_id) for document_id in document_ids] == document_paths
+    assert document_registry.directories == ["/documents/", "/archive/", ""]
+
+
+def test_only_custom_names_are_stored():
+    document_registry = DocumentRegistry()
+    default_id = document_registry.add("/documents/invoice.pdf", "invoice")
+    custom_id = document_registry.add("/documents/invoice.pdf", "March invoice", page_selection="1-2")
+
+    assert document_registry.name(default_id) == "invoice"
+    assert document_registry.name(custom_id) == "March invoice"
+    assert document_registry.names == {custom_id: "March invoice"}
+    assert document_registry.page_selection(default_id) == ""
+    assert document_registry.page_selection(custom_id) == "1-2"
+
+
+def test_preflight_is_rebuilt_from_columns():
+    document_registry = DocumentRegistry()
+    document_id = document_registry.add("/documents/invoice.pdf")
+
+    assert document_registry.preflight(document_id) is None
+
+    document_registry.set_preflight(document_id, PreflightReport("/documents/invoice.pdf", "Damaged xref", 7,
+                                                                 is_encrypted=True, is_repaired=True,
+                                                                 file_size=2048))
+    preflight_report = document_registry.preflight(document_id)
+
+    assert (preflight_report.error_message, preflight_report.page_count, preflight_report.file_size) == \
+           ("Damaged xref", 7, 2048)
+    assert (preflight_report.is_encrypted, preflight_report.needs_password, preflight_report.is_repaired) == \
+           (True, False, True)
+    assert document_registry.is_included(document_id)
+
+
+def test_page_count_is_read_without_report():
+    document_registry = DocumentRegistry()
+    document_id = document_registry.add("/documents/invoice.pdf")
+
+    assert document_registry.page_count(document_id) is None
+
+    document_registry.set_preflight(document_id, PreflightReport("/documents/invoice.pdf", page_count=7))
+
+    assert document_registry.page_count(document_id) == 7
+    assert document_registry.preflight(document_id).page_count == 7
+
+
+def test_removed_rows_stay_readable():
+    document_registry = DocumentRegistry()
+    document_ids = [document_registry.add(f"/documents/invoice_{index}.pdf") for index in range(3)]
+
+    document_registry.remove(document_ids[1])
+    document_registry.remove(document_ids[1])
+
+    assert len(document_registry) == 2 and document_registry.number_of_rows == 3
+    assert not document_registry.contains(document_ids[1])
+    assert document_registry.path(document_ids[1]) == "/documents/invoice_1.pdf"
+
+
+def test_released_rows_are_reused_and_trimmed():
+    document_registry = DocumentRegistry()
+    document_ids = [document_registry.add(f"/documents/invoice_{index}.pdf") for index in range(4)]
+
+    # Not removed, the id is kept
+    document_registry.release(document_ids[0])
+
+    for document_id in document_ids[1:3]:
+        document_registry.remove(document_id)
+        document_registry.release(document_id)
+
+    reused_id = document_registry.add("/archive/receipt.pdf", "March receipt")
+
+    assert reused_id == document_ids[2] and document_registry.number_of_rows == 4
+    assert document_registry.path(reused_id) == "/archive/receipt.pdf"
+    assert document_registry.name(reused_id) == "March receipt"
+    assert document_registry.preflight(reused_id) is None and document_registry.contains(reused_id)
+    assert document_registry.path(document_ids[0]) == "/documents/invoice_0.pdf"
+
+    document_registry.remove(document_ids[3])
+    document_registry.release(document_ids[3])
+    document_registry.reclaim_released_rows()
+
+    # Released rows at the end are dropped, the one before the reused row is kept for reuse
+    assert document_registry.number_of_rows == 3 and document_registry.number_of_free_rows == 1
+    assert len(document_registry) == 2
+
+
+def test_footprint_stays_inside_envelope():
+    document_registry = DocumentRegistry()
+
+    for index in range(20000):
+        document_id = document_registry.add(f"/home/user/Documents/Scanned contracts/contract_{index:06d}.pdf",
+                                            page_selection="1-3" if index % 10 == 0 else "")
+        document_registry.set_preflight(document_id, PreflightReport("", page_count=index % 50 + 1))
+
+        if index % 4 == 0:
+            document_registry.remove(document_id)
+
+    assert document_registry.memory_footprint() <= document_registry.memory_envelope()
+
+
+def test_envelope_follows_documents_in_use():
+    document_registry = DocumentRegistry()
+    document_ids = [document_registry.add(f"/home/user/Documents/Scanned contracts/contract_{index:06d}.pdf")
+                    for index in range(20000)]
+
+    # Every other document released, the rows stay for reuse
+    for document_id in document_ids[::2]:
+        document_registry.remove(document_id)
+        document_registry.release(document_id)
+
+    document_registry.reclaim_released_rows()
+
+    assert document_registry.number_of_free_rows == 10000
+    assert document_registry.memory_footprint() <= document_registry.memory_envelope()
+    assert document_registry.memory_envelope() < DocumentRegistry.min_envelope_bytes \
+        + 20000 * DocumentRegistry.max_bytes_per_document * 3 // 4
+
+    for document_id in document_ids[1::2]:
+        document_registry.remove(document_id)
+        document_registry.release(document_id)
+
+    document_registry.reclaim_released_rows()
+
+    assert document_registry.number_of_rows == 0
+    assert document_registry.memory_footprint() <= document_registry.memory_envelope() \
+        == DocumentRegistry.min_envelope_bytes
@@ -0,0 +1,56 @@
+import os
+
+import fitz
+import pytest
+
+from models.merge_engine import MergeEngine
+from models.merge_job import MergeJob, MergeSource
+
+
+@pytest.fixture(scope="module")
+def one_page_paths(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("inputs")
+    paths = list()
+
+    for index in range(200):
+        path = str(directory / f"{index:04d}.pdf")
+
+        with fitz.open() as pdf_document:
+            pdf_document.new_page().insert_text((72, 72), f"Page {index}")
+            pdf_document.save(path)
+
+        paths.append(path)
+
+    return paths
+
+
+def merge(paths, output_path, **options) -> int:
+    MergeEngine().run(MergeJob([MergeSource(path) for path in paths], output_path, backend_name="fitz", **options))
+
+    return os.path.getsize(output_path)
+
+
+def test_streaming_output_keeps_all_pages(one_page_paths, tmp_path):
+    # Small windows, so there are many incremental saves
+    output_path = str(tmp_path / "streaming.pdf")
+
+    merge(one_page_paths, output_path, is_streaming=True, window_size=4)
+
+    with fitz.open(output_path) as pdf_merged:
+        assert pdf_merged.page_count == len(one_page_paths)
+        assert pdf_merged.load_page(len(one_page_paths) - 1).get_text().strip() == f"Page {len(one_page_paths) - 1}"
+
+
+def test_streaming_compacted_output_is_not_larger_than_in_memory_output(one_page_paths, tmp_path):
+    output_path = str(tmp_path / "compacted.pdf")
+
+    streaming_size = merge(one_page_paths, output_path, is_streaming=True, is_compacted=True, window_size=4)
+    in_memory_size = merge(one_page_paths, str(tmp_path / "in_memory.pdf"), is_streaming=False, is_compacted=True)
+
+    # Compaction drops the page trees and xrefs left behind by incremental saves
+    assert streaming_size <= in_memory_size * 1.05
+
+    with fitz.open(output_path) as pdf_merged:
+        assert pdf_merged.page_count == len(one_page_paths)
+
+    assert not os.path.exists(output_path + MergeEngine.part_suffix)
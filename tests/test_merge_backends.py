@@ -0,0 +1,198 @@
+import os
+
+import fitz
+import pytest
+
+from models.merge_backends.merge_backend_selector import MergeBackendSelector
+from models.merge_engine import MergeCancelledError, MergeEngine
+from models.merge_job import MergeJob, MergeSource
+
+
+@pytest.fixture
+def pdf_paths(tmp_path):
+    paths = list()
+
+    for index in range(4):
+        path = str(tmp_path / f"{index}.pdf")
+
+        with fitz.open() as pdf_document:
+            for page_index in range(3):
+                pdf_document.new_page().insert_text((72, 72), f"Document {index}, page {page_index}")
+
+            pdf_document.save(path)
+
+        paths.append(path)
+
+    return paths
+
+
+def page_texts(path: str):
+    with fitz.open(path) as pdf_document:
+        return [page.get_text().strip() for page in pdf_document]
+
+
+@pytest.mark.parametrize("is_streaming", [False, True])
+def test_backends_copy_the_same_pages(pdf_paths, tmp_path, is_streaming):
+    sources = [MergeSource(pdf_paths[0]), MergeSource(pdf_paths[1], page_selection="3, 1"),
+               MergeSource(pdf_paths[2], page_selection="2-"), MergeSource(pdf_paths[0], page_selection="2")]
+    merged_texts = dict()
+
+    for backend_name in MergeBackendSelector.backends:
+        output_path = str(tmp_path / f"{backend_name}.pdf")
+        MergeEngine().run(MergeJob(sources, output_path, window_size=2, backend_name=backend_name,
+                                   is_streaming=is_streaming and MergeBackendSelector.is_streaming_supported(
+                                       backend_name)))
+        merged_texts[backend_name] = page_texts(output_path)
+
+    assert merged_texts["fitz"] == merged_texts["pypdf2"]
+    assert merged_texts["fitz"][:4] == ["Document 0, page 0", "Document 0, page 1", "Document 0, page 2",
+                                        "Document 1, page 2"]
+    assert len(merged_texts["fitz"]) == 3 + 2 + 2 + 1
+
+
+def test_unknown_backend_is_rejected(pdf_paths, tmp_path):
+    output_path = str(tmp_path / "merged.pdf")
+
+    with pytest.raises(ValueError):
+        MergeEngine().run(MergeJob([MergeSource(path) for path in pdf_paths], output_path, backend_name="unknown"))
+
+    assert not os.path.exists(output_path)
+
+
+def test_streaming_job_is_refused_by_in_memory_backend(pdf_paths, tmp_path):
+    output_path = str(tmp_path / "merged.pdf")
+
+    with pytest.raises(ValueError):
+        MergeEngine().run(MergeJob([MergeSource(path) for path in pdf_paths], output_path, is_streaming=True,
+                                   backend_name="pypdf2"))
+
+    assert not os.path.exists(output_path)
+
+
+def test_auto_selection_of_streaming_job_is_not_calibrated(pdf_paths, tmp_path):
+    merge_job = MergeJob([MergeSource(path) for path in pdf_paths], str(tmp_path / "merged.pdf"), is_streaming=True)
+
+    assert MergeBackendSelector.select(merge_job).is_streaming_supported
+    assert not MergeBackendSelector.calibrated_backends
+
+
+def test_auto_selection_is_calibrated_once(pdf_paths, tmp_path):
+    sources = [MergeSource(path) for path in pdf_paths]
+
+    MergeEngine().run(MergeJob(sources, str(tmp_path / "first.pdf"), is_streaming=False))
+    calibrated_backends = dict(MergeBackendSelector.calibrated_backends)
+    MergeEngine().run(MergeJob(sources, str(tmp_path / "second.pdf"), is_streaming=False))
+
+    assert len(calibrated_backends) == 1
+    assert MergeBackendSelector.calibrated_backends == calibrated_backends
+    assert set(calibrated_backends.values()) <= set(MergeBackendSelector.backends)
+    assert os.path.isfile(MergeBackendSelector.calibration_path)
+
+
+def test_calibration_without_path_is_not_saved(pdf_paths, tmp_path):
+    MergeBackendSelector.set_calibration_path(None)
+
+    MergeEngine().run(MergeJob([MergeSource(path) for path in pdf_paths], str(tmp_path / "merged.pdf"),
+                               is_streaming=False))
+
+    assert len(MergeBackendSelector.calibrated_backends) == 1
+    assert not os.path.exists(str(tmp_path / "merge_backends.json"))
+    assert os.environ[MergeBackendSelector.calibration_path_variable] == ""
+
+
+@pytest.fixture
+def uncalibrated_selector(monkeypatch):
+    monkeypatch.setattr(MergeBackendSelector, "calibration_path", None)
+    monkeypatch.setattr(MergeBackendSelector, "calibrated_backends", dict())
+    monkeypatch.setattr(MergeBackendSelector, "calibration_min_runs", 1)
+    monkeypatch.setattr(MergeBackendSelector, "calibration_min_seconds", 0.0)
+
+
+def test_calibration_reports_progress(pdf_paths, tmp_path, uncalibrated_selector):
+    progress = list()
+    output_path = str(tmp_path / "merged.pdf")
+
+    MergeEngine(progress.append).run(MergeJob([MergeSource(path) for path in pdf_paths], output_path,
+                                              is_streaming=False))
+
+    assert any(merge_progress.document_name.startswith("Calibrating") for merge_progress in progress)
+    assert len(MergeBackendSelector.calibrated_backends) == 1
+
+
+def test_calibration_can_be_cancelled(pdf_paths, tmp_path, uncalibrated_selector):
+    output_path = str(tmp_path / "merged.pdf")
+
+    with pytest.raises(MergeCancelledError):
+        MergeEngine(is_cancelled=lambda: True).run(MergeJob([MergeSource(path) for path in pdf_paths], output_path,
+                                                            is_streaming=False))
+
+    assert not MergeBackendSelector.calibrated_backends
+    assert not os.path.exists(output_path)
+
+
+def test_pypdf2_compaction_drops_duplicate_streams(tmp_path):
+    # Every input embeds the same font file
+    font_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                             "assets", "fonts", "roboto", "Roboto-Medium.ttf")
+    paths = list()
+
+    for index in range(4):
+        path = str(tmp_path / f"{index}.pdf")
+
+        with fitz.open() as pdf_document:
+            page = pdf_document.new_page()
+            page.insert_font(fontname="F0", fontfile=font_path)
+            page.insert_text((72, 72), f"Invoice {index}", fontname="F0")
+            pdf_document.save(path)
+
+        paths.append(path)
+
+    sizes = list()
+
+    for is_compacted in (False, True):
+        output_path = str(tmp_path / f"merged_{is_compacted}.pdf")
+        MergeEngine().run(MergeJob([MergeSource(path) for path in paths], output_path, is_streaming=False,
+                                   backend_name="pypdf2", is_compacted=is_compacted))
+
+        assert page_texts(output_path) == [f"Invoice {index}" for index in range(4)]
+        sizes.append(os.path.getsize(output_path))
+
+    # The embedded font is kept only once
+    assert sizes[1] < sizes[0] / 2
+
+
+def test_pypdf2_compaction_drops_duplicate_images_with_soft_masks(tmp_path):
+    # Every input embeds the same image, its soft mask is an indirect object of the image dictionary
+    pixmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 128, 128), True)
+    pixmap.set_rect(pixmap.irect, (200, 40, 40, 128))
+    image_data = pixmap.tobytes("png")
+    paths = list()
+
+    for index in range(4):
+        path = str(tmp_path / f"{index}.pdf")
+
+        with fitz.open() as pdf_document:
+            page = pdf_document.new_page()
+            page.insert_image(fitz.Rect(72, 72, 200, 200), stream=image_data)
+            page.insert_text((72, 250), f"Image {index}")
+            pdf_document.save(path)
+
+        paths.append(path)
+
+    sizes = list()
+
+    for is_compacted in (False, True):
+        output_path = str(tmp_path / f"merged_{is_compacted}.pdf")
+        MergeEngine().run(MergeJob([MergeSource(path) for path in paths], output_path, is_streaming=False,
+                                   backend_name="pypdf2", is_compacted=is_compacted))
+
+        assert page_texts(output_path) == [f"Image {index}" for index in range(4)]
+        sizes.append(os.path.getsize(output_path))
+
+    with fitz.open(str(tmp_path / "merged_True.pdf")) as pdf_merged:
+        image_numbers = {image[0] for page in pdf_merged for image in page.get_images()}
+        soft_mask_numbers = {image[1] for page in pdf_merged for image in page.get_images()}
+
+    assert len(image_numbers) == 1
+    assert len(soft_mask_numbers) == 1
+    assert sizes[1] < sizes[0]
@@ -0,0 +1,130 @@
+import os
+
+import fitz
+import pytest
+
+from models.merge_backends.merge_backend_selector import MergeBackendSelector
+from models.merge_engine import MergeCancelledError, MergeEngine
+from models.merge_job import MergeJob, MergeSource
+
+
+def make_documents(directory, number_of_documents: int):
+    """
+    Documents of one to three pages, every page shows its document and page number.
+    """
+
+    paths = list()
+
+    for index in range(number_of_documents):
+        path = str(directory / f"{index:03d}.pdf")
+
+        with fitz.open() as pdf_document:
+            for page_index in range(index % 3 + 1):
+                pdf_document.new_page().insert_text((72, 72), f"{index}.{page_index}")
+
+            pdf_document.save(path)
+
+        paths.append(path)
+
+    return paths
+
+
+def page_texts(path: str):
+    with fitz.open(path) as pdf_document:
+        return [page.get_text().strip() for page in pdf_document]
+
+
+@pytest.fixture
+def pdf_paths(tmp_path):
+    return make_documents(tmp_path, 10)
+
+
+@pytest.mark.parametrize("is_streaming", [False, True])
+def test_merge_keeps_page_order(pdf_paths, tmp_path, is_streaming):
+    output_path = str(tmp_path / "merged.pdf")
+
+    MergeEngine().run(MergeJob([MergeSource(path) for path in pdf_paths], output_path,
+                               is_streaming=is_streaming, window_size=3))
+
+    assert page_texts(output_path) == [f"{index}.{page_index}"
+                                       for index in range(len(pdf_paths)) for page_index in range(index % 3 + 1)]
+    assert not os.path.exists(output_path + MergeEngine.part_suffix)
+
+
+def test_cancelled_merge_leaves_no_output(pdf_paths, tmp_path):
+    output_path = str(tmp_path / "merged.pdf")
+    progress = list()
+
+    with pytest.raises(MergeCancelledError):
+        MergeEngine(progress.append, lambda: len(progress) >= 5).run(
+            MergeJob([MergeSource(path) for path in pdf_paths], output_path, window_size=3))
+
+    assert not os.path.exists(output_path)
+    assert not os.path.exists(output_path + MergeEngine.part_suffix)
+
+
+def test_merge_copies_selected_pages(pdf_paths, tmp_path):
+    output_path = str(tmp_path / "merged.pdf")
+    # Documents 2, 5 and 8 have three pages
+    sources = [MergeSource(pdf_paths[2], page_selection="3, 1"), MergeSource(pdf_paths[5], page_selection="2-"),
+               MergeSource(pdf_paths[8], page_selection="5-9"), MergeSource(pdf_paths[0])]
+
+    MergeEngine().run(MergeJob(sources, output_path))
+
+    assert page_texts(output_path) == ["2.2", "2.0", "5.1", "5.2", "0.0"]
+
+
+@pytest.fixture
+def chunked_engine(monkeypatch):
+    # Small chunks, so a few documents are already split between workers
+    monkeypatch.setattr(MergeEngine, "min_sources_per_chunk", 4)
+
+
+def mixed_sources(paths):
+    page_selections = ("", "2-", "1", "3, 1", "")
+
+    return [MergeSource(path, page_selection=page_selections[index % len(page_selections)])
+            for index, path in enumerate(paths)]
+
+
+def intermediate_directories(directory):
+    return [name for name in os.listdir(directory) if name.startswith(".merge_")]
+
+
+@pytest.mark.parametrize("backend_name", ["fitz", "pypdf2"])
+def test_parallel_merge_matches_serial_merge(tmp_path, chunked_engine, backend_name):
+    input_directory = tmp_path / "inputs"
+    input_directory.mkdir()
+    sources = mixed_sources(make_documents(input_directory, 22))
+
+    serial_path = str(tmp_path / "serial.pdf")
+    parallel_path = str(tmp_path / "parallel.pdf")
+    is_streaming = MergeBackendSelector.is_streaming_supported(backend_name)
+    parallel_job = MergeJob(sources, parallel_path, is_streaming=is_streaming, backend_name=backend_name,
+                            number_of_workers=3)
+
+    assert MergeEngine().count_chunks(parallel_job) == 3
+
+    MergeEngine().run(MergeJob(sources, serial_path, is_streaming=is_streaming, backend_name=backend_name))
+    MergeEngine().run(parallel_job)
+
+    assert page_texts(parallel_path) == page_texts(serial_path)
+    assert len(page_texts(parallel_path)) > len(sources)
+    assert not intermediate_directories(tmp_path)
+
+
+def test_cancelled_parallel_merge_removes_intermediates(tmp_path, chunked_engine):
+    input_directory = tmp_path / "inputs"
+    input_directory.mkdir()
+    sources = mixed_sources(make_documents(input_directory, 22))
+    output_path = str(tmp_path / "parallel.pdf")
+    progress = list()
+
+    # Cancelled once the first chunk is done
+    with pytest.raises(MergeCancelledError):
+        MergeEngine(progress.append, lambda: bool(progress)).run(
+            MergeJob(sources, output_path, backend_name="fitz", number_of_workers=3))
+
+    assert not os.path.exists(output_path)
+    assert not os.path.exists(output_path + MergeEngine.part_suffix)
+    assert not intermediate_directories(tmp_path)
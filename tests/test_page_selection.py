@@ -0,0 +1,80 @@
+import json
+
+import pytest
+
+from models.batch_merge_runner import BatchMergeRunner
+from models.page_selection import PageSelection
+
+
+@pytest.mark.parametrize("selection_text, ranges", [
+    ("", []),
+    ("   ", []),
+    ("4", [(4, 4)]),
+    (" 1 - 3 ", [(1, 3)]),
+    ("1-2, 5, 10-", [(1, 2), (5, 5), (10, None)]),
+    ("-3", [(None, 3)]),
+    ("-", [(None, None)]),
+    ("2;7", [(2, 2), (7, 7)]),
+    ("1,, 2 ,", [(1, 1), (2, 2)]),
+    ("3-3", [(3, 3)]),
+])
+def test_parse(selection_text, ranges):
+    assert PageSelection.parse(selection_text) == ranges
+    assert PageSelection.is_valid(selection_text)
+
+
+@pytest.mark.parametrize("selection_text", [
+    "3-1",      # Reversed
+    "0",        # Pages start at 1
+    "0-2",
+    "a",
+    "1-b",
+    "1.5",
+    "1 2",
+    "-2-3",
+    "+2",
+])
+def test_malformed_selection_is_invalid(selection_text):
+    assert not PageSelection.is_valid(selection_text)
+
+    with pytest.raises(ValueError):
+        PageSelection.parse(selection_text)
+
+
+@pytest.mark.parametrize("selection_text, number_of_pages, page_ranges", [
+    ("", 10, [(0, 9)]),
+    ("", 0, []),
+    ("1-2, 5, 10-", 10, [(0, 1), (4, 4), (9, 9)]),
+    ("5, 1-2", 10, [(4, 4), (0, 1)]),
+    ("-3", 10, [(0, 2)]),
+    ("8-20", 10, [(7, 9)]),
+    ("12", 10, []),
+    ("11-", 10, []),
+    ("2, 2", 3, [(1, 1), (1, 1)]),
+])
+def test_to_page_ranges(selection_text, number_of_pages, page_ranges):
+    page_selection = PageSelection(selection_text)
+
+    assert page_selection.to_page_ranges(number_of_pages) == page_ranges
+    assert page_selection.number_of_selected_pages(number_of_pages) == \
+           sum(to_page - from_page + 1 for from_page, to_page in page_ranges)
+
+
+def test_manifest_inputs_take_pages(tmp_path):
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_text(json.dumps([
+        {"inputs": ["a.pdf", {"path": "b.pdf", "pages": "2-3, 1"}], "output": "out"}
+    ]))
+
+    merge_job, = BatchMergeRunner.load_manifest(str(manifest_path))
+
+    assert [source.page_selection for source in merge_job.sources] == ["", "2-3, 1"]
+    assert merge_job.sources[1].document_path == str(tmp_path / "b.pdf")
+
+
+def test_manifest_with_malformed_pages_is_rejected(tmp_path):
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_text(json.dumps([{"inputs": [{"path": "a.pdf", "pages": "3-1"}], "output": "out"}]))
+
+    with pytest.raises(ValueError):
+        BatchMergeRunner.load_manifest(str(manifest_path))
@@ -0,0 +1,39 @@
+import pytest
+
+from managers.preview_manager import PreviewManager
+
+
+@pytest.fixture
+def preview_manager(monkeypatch):
+    # Requests are queued without starting tasks
+    monkeypatch.setattr(PreviewManager, "pending", dict())
+    monkeypatch.setattr(PreviewManager, "queue", list())
+
+    return PreviewManager
+
+
+def test_cancel_keeps_other_documents_and_kept_pages(preview_manager):
+    first_item, second_item = object(), object()
+
+    for page_index in range(4):
+        preview_manager.push((first_item, page_index), 112, 112, preview_manager.default_priority)
+
+    preview_manager.push((second_item, 0), 112, 112, preview_manager.default_priority)
+    preview_manager.cancel(first_item, kept_page_indexes=[2])
+
+    assert preview_manager.take_next_request()[:2] == (first_item, 2)
+    assert preview_manager.take_next_request()[:2] == (second_item, 0)
+    assert preview_manager.take_next_request() is None
+    assert preview_manager.pending == dict()
+
+
+def test_prioritized_request_is_taken_first(preview_manager):
+    first_item, second_item = object(), object()
+
+    preview_manager.push((first_item, 0), 112, 112, preview_manager.default_priority)
+    preview_manager.push((second_item, 0), 112, 112, preview_manager.default_priority)
+    preview_manager.prioritize([second_item])
+
+    assert preview_manager.take_next_request()[0] is second_item
+    assert preview_manager.take_next_request()[0] is first_item
+    assert preview_manager.take_next_request() is None
@@ -0,0 +1,39 @@
+import fitz
+import pytest
+
+from managers.thumbnail_cache_manager import ThumbnailCacheManager
+from models.thumbnail_renderer import render_thumbnail
+from workers.preview_worker import PreviewTask
+
+
+@pytest.fixture
+def thumbnail_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(ThumbnailCacheManager, "cache_directory", str(tmp_path / "thumbnails"))
+    monkeypatch.setattr(ThumbnailCacheManager, "estimated_bytes", None)
+    monkeypatch.setattr(ThumbnailCacheManager, "number_of_hits", 0)
+    monkeypatch.setattr(ThumbnailCacheManager, "number_of_misses", 0)
+
+
+def test_larger_boxes_keep_device_pixel_ratio():
+    assert PreviewTask.larger_boxes(64, 64) == [112, 224]
+    # Small at a ratio of 2, or medium at 8/7
+    assert PreviewTask.larger_boxes(128, 128) == [224, 256, 448]
+    assert PreviewTask.larger_boxes(224, 224) == [392, 448, 784]
+
+
+def test_derivation_probes_are_not_misses(tmp_path, thumbnail_cache):
+    document_path = str(tmp_path / "document.pdf")
+
+    with fitz.open() as pdf_document:
+        pdf_document.new_page().insert_text((72, 72), "Derived")
+        pdf_document.save(document_path)
+
+    preview_task = PreviewTask(None, None)
+
+    assert preview_task.derive_thumbnail(document_path, 64, 64, 0) is None
+
+    ThumbnailCacheManager.store(document_path, 224, 224, render_thumbnail(document_path, 224, 224), 0)
+    thumbnail = preview_task.derive_thumbnail(document_path, 64, 64, 0)
+
+    assert thumbnail is not None and max(thumbnail.width, thumbnail.height) == 64
+    assert ThumbnailCacheManager.number_of_misses == 0
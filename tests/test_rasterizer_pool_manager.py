@@ -0,0 +1,52 @@
+import gc
+from multiprocessing.shared_memory import SharedMemory
+
+import fitz
+import pytest
+
+from managers.rasterizer_pool_manager import RasterizerPoolManager
+from models.thumbnail_renderer import render_thumbnail
+
+
+@pytest.fixture
+def document_path(tmp_path):
+    path = str(tmp_path / "document.pdf")
+
+    with fitz.open() as pdf_document:
+        pdf_document.new_page().insert_text((72, 72), "Rasterized")
+        pdf_document.save(path)
+
+    yield path
+
+    RasterizerPoolManager.shutdown()
+
+
+def test_worker_thumbnail_matches_in_process_render(document_path):
+    thumbnail = RasterizerPoolManager.render(document_path, 224, 224)
+
+    assert RasterizerPoolManager.is_enabled
+    expected_thumbnail = render_thumbnail(document_path, 224, 224)
+    size = expected_thumbnail.stride * expected_thumbnail.height
+
+    assert (thumbnail.width, thumbnail.height, thumbnail.stride) == \
+           (expected_thumbnail.width, expected_thumbnail.height, expected_thumbnail.stride)
+    assert bytes(thumbnail.samples[:size]) == bytes(expected_thumbnail.samples)
+
+
+def test_blocks_are_reused_and_unlinked_on_shutdown(document_path):
+    thumbnail = RasterizerPoolManager.render(document_path, 224, 224)
+    block_name = thumbnail.shared_memory.name
+
+    # Still used by the first thumbnail
+    assert RasterizerPoolManager.render(document_path, 224, 224).shared_memory.name != block_name
+
+    del thumbnail
+    gc.collect()
+
+    assert RasterizerPoolManager.render(document_path, 224, 224).shared_memory.name in RasterizerPoolManager.blocks
+    assert len(RasterizerPoolManager.blocks) == 2
+
+    RasterizerPoolManager.shutdown()
+
+    with pytest.raises(FileNotFoundError):
+        SharedMemory(name=block_name)
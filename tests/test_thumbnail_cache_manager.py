@@ -0,0 +1,133 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import fitz
+import pytest
+
+from managers.thumbnail_cache_manager import ThumbnailCacheManager
+from models.thumbnail_renderer import render_thumbnail
+
+
+@pytest.fixture
+def pdf_path(tmp_path):
+    path = str(tmp_path / "document.pdf")
+
+    with fitz.open() as pdf_document:
+        pdf_document.new_page().insert_text((72, 72), "Page")
+        pdf_document.save(path)
+
+    return path
+
+
+def test_stored_thumbnail_is_loaded(pdf_path):
+    thumbnail = render_thumbnail(pdf_path, 64, 64)
+    ThumbnailCacheManager.store(pdf_path, 64, 64, thumbnail)
+
+    cached_thumbnail = ThumbnailCacheManager.load(pdf_path, 64, 64)
+
+    assert (cached_thumbnail.width, cached_thumbnail.height) == (thumbnail.width, thumbnail.height)
+    assert bytes(cached_thumbnail.samples) == bytes(thumbnail.samples)
+    assert ThumbnailCacheManager.load(pdf_path, 32, 32) is None
+
+
+def test_changed_document_misses(pdf_path):
+    ThumbnailCacheManager.store(pdf_path, 64, 64, render_thumbnail(pdf_path, 64, 64))
+
+    with fitz.open() as pdf_document:
+        pdf_document.new_page(width=200, height=100)
+        pdf_document.save(pdf_path)
+
+    assert ThumbnailCacheManager.load(pdf_path, 64, 64) is None
+
+
+def test_least_recently_used_entries_are_evicted(pdf_path, monkeypatch):
+    thumbnail = render_thumbnail(pdf_path, 32, 32)
+    entry_size = ThumbnailCacheManager.header.size + len(bytes(thumbnail.samples))
+    monkeypatch.setattr(ThumbnailCacheManager, "max_cache_bytes", entry_size * 3)
+
+    for page_index in range(3):
+        ThumbnailCacheManager.store(pdf_path, 32, 32, thumbnail, page_index)
+        entry_path = ThumbnailCacheManager.entry_path(pdf_path, 32, 32, page_index)
+        os.utime(entry_path, (page_index, page_index))
+
+    ThumbnailCacheManager.store(pdf_path, 32, 32, thumbnail, 3)
+
+    assert ThumbnailCacheManager.load(pdf_path, 32, 32, 0) is None
+    assert ThumbnailCacheManager.load(pdf_path, 32, 32, 3) is not None
+    assert len(ThumbnailCacheManager.scan_entries()) < 4
+    assert sum(entry_size for entry_path, entry_time, entry_size in ThumbnailCacheManager.scan_entries()) \
+        <= ThumbnailCacheManager.max_cache_bytes
+
+
+def test_stored_again_entry_is_counted_once(pdf_path):
+    thumbnail = render_thumbnail(pdf_path, 32, 32)
+    ThumbnailCacheManager.store(pdf_path, 32, 32, thumbnail)
+    estimated_bytes = ThumbnailCacheManager.estimated_bytes
+
+    for _ in range(3):
+        ThumbnailCacheManager.store(pdf_path, 32, 32, thumbnail)
+
+    assert ThumbnailCacheManager.estimated_bytes == estimated_bytes
+    assert estimated_bytes == sum(entry_size for entry_path, entry_time, entry_size
+                                  in ThumbnailCacheManager.scan_entries())
+
+
+def exited_process_id() -> int:
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+
+    return process.pid
+
+
+def test_lock_of_live_holder_is_kept(tmp_path):
+    lock_path = str(tmp_path / ".eviction.lock")
+    lock_token = ThumbnailCacheManager.acquire_lock_file(lock_path)
+
+    assert lock_token is not None
+    assert ThumbnailCacheManager.acquire_lock_file(lock_path) is None
+
+    ThumbnailCacheManager.release_lock_file(lock_path, lock_token)
+
+    assert not os.path.exists(lock_path)
+
+
+def test_stale_lock_is_taken_over_once(tmp_path):
+    lock_path = str(tmp_path / ".eviction.lock")
+
+    with open(lock_path, "w") as f:
+        f.write(f"{exited_process_id()} {time.time()} stale")
+
+    lock_tokens = list()
+    barrier = threading.Barrier(8)
+
+    def acquire():
+        barrier.wait()
+        lock_tokens.append(ThumbnailCacheManager.acquire_lock_file(lock_path))
+
+    threads = [threading.Thread(target=acquire) for _ in range(8)]
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    acquired_tokens = [lock_token for lock_token in lock_tokens if lock_token is not None]
+
+    assert len(acquired_tokens) == 1
+    assert ThumbnailCacheManager.read_lock_file(lock_path) == acquired_tokens[0]
+
+
+def test_release_keeps_lock_of_another_holder(tmp_path):
+    lock_path = str(tmp_path / ".eviction.lock")
+    holder_token = f"{os.getpid()} {time.time()} other"
+
+    with open(lock_path, "w") as f:
+        f.write(holder_token)
+
+    ThumbnailCacheManager.release_lock_file(lock_path, f"{os.getpid()} {time.time()} mine")
+
+    assert ThumbnailCacheManager.read_lock_file(lock_path) == holder_token
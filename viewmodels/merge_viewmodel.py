@@ -1,43 +1,81 @@
 import os.path
-from typing import List, Dict, Iterator
+from typing import List, Dict, Iterator, Optional, Set
 from pathlib import Path
 
-from PyPDF2 import PdfWriter, PdfReader
-from PyQt5.QtCore import QObject, Qt
+from PyQt5.QtCore import QObject, Qt, QThread, QThreadPool, pyqtSlot
 from PyQt5.QtWidgets import QApplication
 
 from pathvalidate import validate_filepath, ValidationError, validate_filename
-import fitz
 
 from enums.message_type import MessageType
 from interfaces.i_viewmodel import IViewModel, IViewModelMeta
+from managers.document_pool_manager import DocumentPoolManager
 from managers.message_manager import MessageManager
+from models.document_collection import DocumentCollection
+from models.document_registry import DocumentRegistry
+from models.merge_backends.merge_backend_selector import MergeBackendSelector
+from models.merge_engine import MergeProgress
+from models.merge_job import MergeJob, MergeSource
+from models.preflight import PreflightReport
+from workers.merge_worker import MergeWorker
+from workers.preflight_worker import PreflightTask, PreflightSignals
 
 
 class DocumentItem:
-    __document_index: int = -1
+    """
+    View of one document of a `DocumentRegistry`, its data is kept in the columns of the registry.
+    """
 
-    def __init__(self, document_name: str, document_path: str, document_is_included: bool = True):
-        self.document_index = DocumentItem.increase_index()
-        self.document_name = document_name
-        self.document_path = document_path
-        self.document_is_included = document_is_included
+    __slots__ = ("document_registry", "document_id")
 
-    # <editor-fold desc="[+] Index operations">
+    def __init__(self, document_registry: DocumentRegistry, document_id: int):
+        self.document_registry = document_registry
+        # Stable id in the registry and in `DocumentCollection`, positions are looked up there
+        self.document_id = document_id
 
-    @classmethod
-    def increase_index(cls) -> int:
-        cls.__document_index += 1
-        return cls.__document_index
+    def __del__(self):
+        # Tasks and signals hold the item, not its id, so a removed document's id is reused only after they finish
+        self.document_registry.release(self.document_id)
 
-    @classmethod
-    def decrease_index(cls) -> int:
-        cls.__document_index -= 1
-        return cls.__document_index
+    # <editor-fold desc="[+] Properties">
 
-    @classmethod
-    def number_of_documents(cls) -> int:
-        return cls.__document_index + 1
+    @property
+    def document_name(self) -> str:
+        return self.document_registry.name(self.document_id)
+
+    @property
+    def document_path(self) -> str:
+        return self.document_registry.path(self.document_id)
+
+    @property
+    def document_is_included(self) -> bool:
+        return self.document_registry.is_included(self.document_id)
+
+    @document_is_included.setter
+    def document_is_included(self, value: bool) -> None:
+        self.document_registry.set_included(self.document_id, value)
+
+    @property
+    def document_page_selection(self) -> str:
+        return self.document_registry.page_selection(self.document_id)
+
+    @document_page_selection.setter
+    def document_page_selection(self, value: str) -> None:
+        self.document_registry.set_page_selection(self.document_id, value)
+
+    @property
+    def document_page_count(self) -> Optional[int]:
+        # None until the preflight check has finished, cheaper than the whole report
+        return self.document_registry.page_count(self.document_id)
+
+    @property
+    def document_preflight(self) -> Optional[PreflightReport]:
+        # None until the preflight check has finished
+        return self.document_registry.preflight(self.document_id)
+
+    @document_preflight.setter
+    def document_preflight(self, value: PreflightReport) -> None:
+        self.document_registry.set_preflight(self.document_id, value)
 
     # </editor-fold>
 
@@ -46,99 +84,259 @@ class MergeViewModel(QObject, IViewModel, metaclass=IViewModelMeta):
     def __init__(self):
         super().__init__()
 
-        self.document_item_list: List[DocumentItem] = list()
+        # Data of documents, and their order shared with the document panel
+        self.document_registry = DocumentRegistry()
+        self.document_collection = DocumentCollection()
+        # Number of documents of every path, the pooled handle of a path is closed with its last document
+        self.document_path_counts: Dict[str, int] = dict()
+
+        # Background merge
+        self.merge_thread: Optional[QThread] = None
+        self.merge_worker: Optional[MergeWorker] = None
+
+        # Preflight checks of added documents
+        self.preflight_thread_pool = QThreadPool()
+        self.preflight_thread_pool.setMaxThreadCount(max(2, QThread.idealThreadCount()))
+        self.preflight_signals = PreflightSignals()
+        self.preflight_signals.finished.connect(self.on_document_preflighted)
+        # Documents whose check is still running
+        self.pending_preflight_ids: Set[int] = set()
+
+        # Merge requested while included documents were still checked, it starts once their checks finish
+        self.pending_merge_options: Optional[dict] = None
+        self.awaited_preflight_ids: Set[int] = set()
+
+        # Document data outgrew its envelope, checked again after every removal until it fits
+        self.is_memory_exceeded = False
 
     def on_pdf_paths_selected(self, pdf_paths: List[str]):
         # Set cursor to waiting
         QApplication.setOverrideCursor(Qt.WaitCursor)
 
-        number_of_documents_before_addition = DocumentItem.number_of_documents()
         added_items = list()
 
         for pdf_path in pdf_paths:
-            item = DocumentItem(Path(pdf_path).stem, pdf_path)
+            item = DocumentItem(self.document_registry, self.document_registry.add(pdf_path, Path(pdf_path).stem))
+            self.document_collection.append(item, item.document_id)
+            self.document_path_counts[pdf_path] = self.document_path_counts.get(pdf_path, 0) + 1
             added_items.append(item)
-            print("ADD", item.document_name, item.document_index)
-            self.document_item_list.append(item)
-
-        print(added_items)
 
         MessageManager.send(MessageType.ADD_DOCUMENT, document_items=added_items)
+        self.check_memory_footprint()
+
+        # Check new documents concurrently, results arrive through `on_document_preflighted`
+        for item in added_items:
+            self.pending_preflight_ids.add(item.document_id)
+            self.preflight_thread_pool.start(PreflightTask(item, self.preflight_signals))
 
         # Reset cursor to default
         QApplication.restoreOverrideCursor()
 
-    def remove_document(self, document_index: int):
-        #print(document_index, self.document_item_list)
+    @pyqtSlot(object, object)
+    def on_document_preflighted(self, document_item: DocumentItem, preflight_report: PreflightReport):
+        self.pending_preflight_ids.discard(document_item.document_id)
+
+        # Removed while it was checked
+        if not self.document_registry.contains(document_item.document_id):
+            return
+
+        document_item.document_preflight = preflight_report
+
+        if not preflight_report.is_mergeable:
+            print(f"[!] {document_item.document_name}: {preflight_report.summary}")
+            document_item.document_is_included = False
 
-        for document in self.document_item_list[document_index + 1:]:
-            document.document_index -= 1
+        MessageManager.send(MessageType.MERGE_VIEWMODEL__DOCUMENT_PREFLIGHTED, document_item=document_item)
 
-        self.document_item_list.pop(document_index)
-        DocumentItem.decrease_index()
+        self.on_awaited_preflight_finished(document_item.document_id)
+
+    def remove_document(self, document_id: int):
+        removed_item = self.document_collection.get(document_id)
+        document_index = self.document_collection.remove(document_id)
+        self.document_registry.remove(document_id)
+
+        # Close the pooled handle unless the same file is still in the list
+        self.document_path_counts[removed_item.document_path] -= 1
+
+        if not self.document_path_counts[removed_item.document_path]:
+            del self.document_path_counts[removed_item.document_path]
+            DocumentPoolManager.discard(removed_item.document_path)
 
         MessageManager.send(MessageType.MERGE_VIEWMODEL__DOCUMENT_REMOVED, document_index)
 
-    def merge_documents(self, pdf_filename: str):
+        self.pending_preflight_ids.discard(document_id)
+        self.on_awaited_preflight_finished(document_id)
+
+        if self.is_memory_exceeded:
+            self.check_memory_footprint()
+
+    def merge_documents(self, pdf_filename: str, is_compacted: bool = False, backend_name: str = "auto"):
         """
+        Start merging of included documents on a background thread.
 
-        :param pdf_filename:
+        Documents that failed preflight would stop the merge half way, so a merge requested while included documents
+        are still checked waits for their checks without blocking, see `on_awaited_preflight_finished`.
+
+        :param pdf_filename: name of the merged file
+        :param is_compacted: write resources shared by documents once and compress the merged file
+        :param backend_name: merge backend, "auto" picks the fastest for the documents
         :return:
         """
 
-        # Set cursor to waiting
-        QApplication.setOverrideCursor(Qt.WaitCursor)
+        if self.merge_thread is not None or self.pending_merge_options is not None:
+            print("[!] Merge is in progress")
+            return
 
-        pdf_merged = fitz.open()
+        included_document_items: List[DocumentItem] = list(filter(lambda document: document.document_is_included, self.document_collection))
 
-       # print("?X?")
+        if not any(included_document_items):
+            print("[!] No documents")
+            return
+
+        pdf_filename = MergeJob.normalize_output_path(pdf_filename)
+
+        if os.path.isfile(pdf_filename):
+            print("[!] File exists")
+            return
 
-        included_document_items: List[DocumentItem] = list(filter(lambda document: document.document_is_included, self.document_item_list))
-        print("IC", included_document_items)
+        self.pending_merge_options = dict(pdf_filename=pdf_filename, is_compacted=is_compacted,
+                                          backend_name=backend_name)
+        self.awaited_preflight_ids = {document_item.document_id for document_item in included_document_items
+                                      if document_item.document_id in self.pending_preflight_ids}
+
+        if self.awaited_preflight_ids:
+            # Cancellable while it waits
+            MessageManager.send(MessageType.MERGE_VIEWMODEL__MERGE_STARTED,
+                                number_of_documents=len(included_document_items))
+            return
+
+        self.start_pending_merge()
+
+    def on_awaited_preflight_finished(self, document_id: int):
+        if self.pending_merge_options is None or document_id not in self.awaited_preflight_ids:
+            return
+
+        self.awaited_preflight_ids.discard(document_id)
+
+        if not self.awaited_preflight_ids:
+            self.start_pending_merge()
+
+    def start_pending_merge(self):
+        merge_options = self.pending_merge_options
+        self.pending_merge_options = None
+
+        included_document_items: List[DocumentItem] = list()
+
+        for document_item in filter(lambda document: document.document_is_included, self.document_collection):
+            # Rebuilt from the registry on every read
+            preflight_report = document_item.document_preflight
+
+            if preflight_report is not None and not preflight_report.is_mergeable:
+                print(f"[!] Skipped {document_item.document_name}: {preflight_report.summary}")
+                continue
+
+            included_document_items.append(document_item)
 
         if not any(included_document_items):
             print("[!] No documents")
-            QApplication.restoreOverrideCursor()
+            MessageManager.send(MessageType.MERGE_VIEWMODEL__MERGE_FAILED, error_message="No documents")
             return
 
-        print("HI!")
-        for document_item in included_document_items:
-            pdf_to_insert = fitz.open(document_item.document_path)
-            pdf_merged.insert_pdf(pdf_to_insert)
+        merge_job = MergeJob([MergeSource(document_item.document_path, document_item.document_name,
+                                          document_item.document_page_selection)
+                              for document_item in included_document_items], merge_options["pdf_filename"],
+                             is_streaming=MergeBackendSelector.is_streaming_supported(merge_options["backend_name"]),
+                             is_compacted=merge_options["is_compacted"], backend_name=merge_options["backend_name"],
+                             number_of_workers=QThread.idealThreadCount())
+
+        # Worker lives in its own thread, signals are delivered to the GUI thread
+        self.merge_thread = QThread()
+        self.merge_worker = MergeWorker(merge_job)
+        self.merge_worker.moveToThread(self.merge_thread)
+
+        self.merge_thread.started.connect(self.merge_worker.run)
+        self.merge_worker.progress.connect(self.on_merge_progress)
+        self.merge_worker.finished.connect(self.on_merge_finished)
+        self.merge_worker.failed.connect(self.on_merge_failed)
+        self.merge_worker.cancelled.connect(self.on_merge_cancelled)
+
+        MessageManager.send(MessageType.MERGE_VIEWMODEL__MERGE_STARTED, number_of_documents=merge_job.number_of_sources)
+
+        self.merge_thread.start()
+
+    def cancel_merge(self):
+        if self.pending_merge_options is not None:
+            # Still waiting for checks, there is no worker yet
+            self.pending_merge_options = None
+            self.awaited_preflight_ids.clear()
+            MessageManager.send(MessageType.MERGE_VIEWMODEL__MERGE_CANCELLED)
+            return
 
-        if pdf_filename == "":
-            pdf_filename = "MIXED.pdf"
+        if self.merge_worker is not None:
+            self.merge_worker.cancel()
 
-        try:
-            validate_filename(pdf_filename)
-        except ValidationError as e:
-            print(f"{e}\n")
+    # <editor-fold desc="[+] Merge worker slots">
 
-        name, ext = os.path.splitext(pdf_filename)
+    @pyqtSlot(object)
+    def on_merge_progress(self, merge_progress: MergeProgress):
+        MessageManager.send(MessageType.MERGE_VIEWMODEL__MERGE_PROGRESS, merge_progress=merge_progress)
 
-        if ext != ".pdf":
-            pdf_filename = name + ".pdf"
+    @pyqtSlot(str)
+    def on_merge_finished(self, pdf_filename: str):
+        self.release_merge_worker()
+        MessageManager.send(MessageType.MERGE_VIEWMODEL__MERGE_FINISHED, pdf_filename=pdf_filename)
 
-        if os.path.isfile(pdf_filename):
-            print("[!] File exists")
-            QApplication.restoreOverrideCursor()
-            return
+    @pyqtSlot(str)
+    def on_merge_failed(self, error_message: str):
+        print(f"[!] Merge failed: {error_message}")
+        self.release_merge_worker()
+        MessageManager.send(MessageType.MERGE_VIEWMODEL__MERGE_FAILED, error_message=error_message)
 
-        pdf_merged.save(pdf_filename)
+    @pyqtSlot()
+    def on_merge_cancelled(self):
+        self.release_merge_worker()
+        MessageManager.send(MessageType.MERGE_VIEWMODEL__MERGE_CANCELLED)
 
-        # Reset cursor to default
-        QApplication.restoreOverrideCursor()
+    def release_merge_worker(self):
+        self.merge_thread.quit()
+        self.merge_thread.wait()
+
+        self.merge_worker.deleteLater()
+        self.merge_thread.deleteLater()
+
+        self.merge_worker = None
+        self.merge_thread = None
+
+    # </editor-fold>
+
+    def reorder_documents(self, document_ids: List[int], destination_index: int):
+        # Moved together, the first document ends up at `destination_index`
+        self.document_collection.move_many(document_ids, destination_index)
+
+    def memory_footprint(self) -> int:
+        """
+        Bytes held by the data of all documents of the session, see `DocumentRegistry.memory_footprint`.
+        """
+
+        return self.document_registry.memory_footprint()
+
+    def check_memory_footprint(self):
+        """
+        Report document data over its envelope to the view, and report again once it fits.
+        """
+
+        self.document_registry.reclaim_released_rows()
+
+        memory_footprint = self.memory_footprint()
+        memory_envelope = self.document_registry.memory_envelope()
+        warning_message = None
+
+        if memory_footprint > memory_envelope:
+            warning_message = f"Document data takes {memory_footprint / 2 ** 20:.1f} MB, " \
+                              f"over its envelope of {memory_envelope / 2 ** 20:.1f} MB"
+            print(f"[!] {warning_message}")
+
+        if warning_message is not None or self.is_memory_exceeded:
+            MessageManager.send(MessageType.MERGE_VIEWMODEL__MEMORY_CHECKED, warning_message=warning_message)
 
-    def reorder_documents(self, source_index, destination_index):
-        print(source_index, destination_index)
-        #for doc in self.document_item_list:
-       #     print(doc.document_name, doc.document_path)
-       # print()
-        element = self.document_item_list.pop(destination_index)
-      #  for doc in self.document_item_list:
-       #     print(doc.document_name, doc.document_path)
-       # print()
-        self.document_item_list.insert(source_index, element)
-
-        for doc in self.document_item_list:
-            print(doc.document_name, doc.document_path)
+        self.is_memory_exceeded = warning_message is not None
@@ -1,3 +1,4 @@
+import os
 from typing import List
 
 from PyQt5.QtWidgets import QSizePolicy, QVBoxLayout, QWidget, QFileDialog
@@ -6,20 +7,25 @@ from components.merge.action_panel_component import ActionPanelComponent
 from components.merge.control_panel_component import ControlPanelComponent
 from components.merge.document_component import DocumentComponent
 from components.merge.document_panel_component import DocumentPanelComponent
+from components.merge.virtual_document_panel_component import VirtualDocumentPanelComponent
 from interfaces.i_view import IViewMeta, IView
 from managers.message_manager import MessageType, MessageManager
 from viewmodels.merge_viewmodel import MergeViewModel, DocumentItem
 
 
 class MergeView(QWidget, IView, metaclass=IViewMeta):
+    # Components only for the documents around the viewport, for batches of thousands of documents
+    is_document_panel_virtual: bool = os.environ.get("PDF_MERGER_VIRTUAL_PANEL", "") not in ("", "0")
+
     def __init__(self, viewmodel: MergeViewModel):
         super().__init__()
 
         self.viewmodel = viewmodel
 
         self.control_panel = ControlPanelComponent()
-        self.document_panel = DocumentPanelComponent()
-        action_panel = ActionPanelComponent()
+        self.document_panel = VirtualDocumentPanelComponent(self.viewmodel.document_collection) \
+            if self.is_document_panel_virtual else DocumentPanelComponent(self.viewmodel.document_collection)
+        self.action_panel = ActionPanelComponent()
 
         self. control_panel.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Maximum)
 
@@ -30,7 +36,7 @@ class MergeView(QWidget, IView, metaclass=IViewMeta):
 
         layout.addWidget(self.control_panel)
         layout.addWidget(self.document_panel)
-        layout.addWidget(action_panel)
+        layout.addWidget(self.action_panel)
 
         self.control_panel.button_add_file.clicked.connect(self.on_button_add_file_clicked)
 
@@ -59,6 +65,30 @@ class MergeView(QWidget, IView, metaclass=IViewMeta):
         MessageManager.subscribe(MessageType.MERGE_VIEW__DOCUMENTS_REORDERED,
                                  self.viewmodel, self.viewmodel.reorder_documents)
 
+        MessageManager.subscribe(MessageType.ACTION_CANCEL_CLICKED,
+                                 self.viewmodel, self.viewmodel.cancel_merge)
+
+        MessageManager.subscribe(MessageType.ACTION_CANCEL_CLICKED,
+                                 self.action_panel, self.action_panel.on_merge_cancel_requested)
+
+        MessageManager.subscribe(MessageType.MERGE_VIEWMODEL__MERGE_STARTED,
+                                 self.action_panel, self.action_panel.on_merge_started)
+
+        MessageManager.subscribe(MessageType.MERGE_VIEWMODEL__MERGE_PROGRESS,
+                                 self.action_panel, self.action_panel.on_merge_progress)
+
+        MessageManager.subscribe(MessageType.MERGE_VIEWMODEL__MERGE_FINISHED,
+                                 self.action_panel, self.action_panel.on_merge_finished)
+
+        MessageManager.subscribe(MessageType.MERGE_VIEWMODEL__MERGE_FAILED,
+                                 self.action_panel, self.action_panel.on_merge_failed)
+
+        MessageManager.subscribe(MessageType.MERGE_VIEWMODEL__MERGE_CANCELLED,
+                                 self.action_panel, self.action_panel.on_merge_cancelled)
+
+        MessageManager.subscribe(MessageType.MERGE_VIEWMODEL__MEMORY_CHECKED,
+                                 self.control_panel, self.control_panel.set_memory_warning)
+
      #   MessageManager.subscribe(MessageType.DOCUMENT_REMOVE_CLICKED, self.viewmodel, self.viewmodel.remove_document)
       #  MessageManager.subscribe(MessageType.DOCUMENT_REMOVE_CLICKED, self, self.remove_document)
      #
@@ -75,9 +105,7 @@ class MergeView(QWidget, IView, metaclass=IViewMeta):
         self._viewmodel = value
 
     def add_document(self, document_items: List[DocumentItem]):
-        for document_item in document_items:
-            self.document_panel.add_document_component(document_item)
-
+        self.document_panel.add_document_components(document_items)
         self.control_panel.set_number_of_documents(self.document_panel.number_of_inner_components)
 
     def remove_document(self, document_component: DocumentComponent):
@@ -0,0 +1,55 @@
+import threading
+import time
+
+from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot
+
+from managers.document_pool_manager import DocumentPoolManager
+from models.merge_engine import MergeEngine, MergeProgress, MergeCancelledError
+from models.merge_job import MergeJob
+
+
+class MergeWorker(QObject):
+    """
+    Runs a `MergeJob` on a background `QThread` and reports back through signals.
+    """
+
+    progress = pyqtSignal(object)   # MergeProgress
+    finished = pyqtSignal(str)      # Path of merged file
+    failed = pyqtSignal(str)        # Error message
+    cancelled = pyqtSignal()
+
+    # Minimal interval between two progress signals, in seconds
+    progress_interval: float = 0.05
+
+    def __init__(self, merge_job: MergeJob):
+        super().__init__()
+
+        self.merge_job = merge_job
+        # Set from the GUI thread, read from the worker thread
+        self.cancel_event = threading.Event()
+        self.last_progress_time = 0.0
+
+    @pyqtSlot()
+    def run(self):
+        merge_engine = MergeEngine(self.on_progress, self.cancel_event.is_set, DocumentPoolManager)
+
+        try:
+            output_path = merge_engine.run(self.merge_job)
+        except MergeCancelledError:
+            self.cancelled.emit()
+        except Exception as e:
+            self.failed.emit(str(e))
+        else:
+            self.finished.emit(output_path)
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def on_progress(self, merge_progress: MergeProgress):
+        # Throttle per-page updates, but always report the end of each document
+        now = time.monotonic()
+        is_last_page = merge_progress.page_index == merge_progress.number_of_pages - 1
+
+        if is_last_page or now - self.last_progress_time >= self.progress_interval:
+            self.last_progress_time = now
+            self.progress.emit(merge_progress)
@@ -0,0 +1,28 @@
+from PyQt5.QtCore import QObject, QRunnable, pyqtSignal
+
+from managers.document_pool_manager import DocumentPoolManager
+from models.preflight import preflight_document
+
+
+class PreflightSignals(QObject):
+    """
+    Signals of preflight tasks. `QRunnable` is not a `QObject`, so tasks share this emitter.
+    """
+
+    finished = pyqtSignal(object, object)   # DocumentItem, PreflightReport
+
+
+class PreflightTask(QRunnable):
+    """
+    Checks one document on a `QThreadPool` thread.
+    """
+
+    def __init__(self, document_item, preflight_signals: PreflightSignals):
+        super().__init__()
+
+        self.document_item = document_item
+        self.preflight_signals = preflight_signals
+
+    def run(self):
+        preflight_report = preflight_document(self.document_item.document_path, DocumentPoolManager)
+        self.preflight_signals.finished.emit(self.document_item, preflight_report)
@@ -0,0 +1,104 @@
+from typing import List, Optional
+
+from PyQt5.QtCore import QObject, QRunnable, Qt, pyqtSignal
+from PyQt5.QtGui import QImage
+
+from enums.thumbnail_tier import ThumbnailTier
+from managers.rasterizer_pool_manager import RasterizerPoolManager
+from managers.thumbnail_cache_manager import ThumbnailCacheManager
+from models.thumbnail_renderer import Thumbnail
+
+
+class PreviewSignals(QObject):
+    """
+    Signals of preview tasks. `QRunnable` is not a `QObject`, so tasks share this emitter.
+    """
+
+    rendered = pyqtSignal(object, object, int, int, int)    # DocumentItem, QImage, page index, limit width, height
+    failed = pyqtSignal(object, int, str)                   # DocumentItem, page index, error message
+
+
+class PreviewTask(QRunnable):
+    """
+    Renders one preview on a `QThreadPool` thread.
+
+    The task does not own a document, it takes whichever request of `preview_manager` is the most urgent when the
+    task starts, so requests can still be reprioritized while they wait.
+    """
+
+    def __init__(self, preview_manager, preview_signals: PreviewSignals):
+        super().__init__()
+
+        self.preview_manager = preview_manager
+        self.preview_signals = preview_signals
+
+    def run(self):
+        preview_request = self.preview_manager.take_next_request()
+
+        # Cancelled in the meantime
+        if preview_request is None:
+            return
+
+        document_item, page_index, limit_width, limit_height = preview_request
+
+        document_path = document_item.document_path
+
+        try:
+            thumbnail = ThumbnailCacheManager.load(document_path, limit_width, limit_height, page_index)
+
+            if thumbnail is None:
+                thumbnail = self.derive_thumbnail(document_path, limit_width, limit_height, page_index) \
+                            or RasterizerPoolManager.render(document_path, limit_width, limit_height, page_index)
+
+                ThumbnailCacheManager.store(document_path, limit_width, limit_height, thumbnail, page_index)
+        except Exception as e:
+            self.preview_signals.failed.emit(document_item, page_index, str(e))
+            return
+
+        # QImage wraps the samples and keeps a reference to them, no copy. QPixmap must be made on the GUI thread.
+        qimage = QImage(thumbnail.samples, thumbnail.width, thumbnail.height, thumbnail.stride,
+                        QImage.Format_RGB888)
+        # Samples of a worker's thumbnail are a shared memory block, reused once the thumbnail is gone
+        qimage.thumbnail = thumbnail
+
+        self.preview_signals.rendered.emit(document_item, qimage, page_index, limit_width, limit_height)
+
+    def derive_thumbnail(self, document_path: str, limit_width: int, limit_height: int,
+                         page_index: int) -> Optional[Thumbnail]:
+        """
+        Downsample the smallest cached thumbnail of a larger tier, so the document is not opened at all.
+        """
+
+        for box in self.larger_boxes(limit_width, limit_height):
+            # A probe, not a miss of the cache
+            larger_thumbnail = ThumbnailCacheManager.load(document_path, box, box, page_index, is_counted=False)
+
+            if larger_thumbnail is None:
+                continue
+
+            qimage = QImage(larger_thumbnail.samples, larger_thumbnail.width, larger_thumbnail.height,
+                            larger_thumbnail.stride, QImage.Format_RGB888)
+            # Smooth scaling may change the format
+            qimage = qimage.scaled(limit_width, limit_height, Qt.KeepAspectRatio, Qt.SmoothTransformation) \
+                .convertToFormat(QImage.Format_RGB888)
+
+            return Thumbnail(qimage.width(), qimage.height(), qimage.bytesPerLine(),
+                             qimage.constBits().asstring(qimage.sizeInBytes()))
+
+        return None
+
+    @staticmethod
+    def larger_boxes(limit_width: int, limit_height: int) -> List[int]:
+        """
+        Boxes of the larger tiers at the device pixel ratio of the requested box, smallest first.
+
+        The ratio is not part of a request, every tier the box could belong to gives one candidate ratio (at least 1).
+        """
+
+        limit_box = max(limit_width, limit_height)
+        thumbnail_tiers = sorted(thumbnail_tier.value for thumbnail_tier in ThumbnailTier)
+        boxes = {round(larger_tier * limit_box / thumbnail_tier)
+                 for index, thumbnail_tier in enumerate(thumbnail_tiers) if limit_box >= thumbnail_tier
+                 for larger_tier in thumbnail_tiers[index + 1:]}
+
+        return sorted(box for box in boxes if box > limit_box)